@@ -1,20 +1,6 @@
 """
 Board Game Database Application
-"""
-from .utils.logger import setup_logger
-from .database import init_db
-import os
-import logging
-
-# Set up logger
-setup_logger()
-
-# Then initialize database
 
-# Initialize database and set global variables
-engine, SessionLocal = init_db()
-
-# Update the database module's globals
-from . import database
-database.engine = engine
-database.SessionLocal = SessionLocal
\ No newline at end of file
+Importing the package has no side effects: logging, the database engines
+and the dataset are set up when the app starts (see app.main).
+"""
@@ -0,0 +1,47 @@
+import base64
+import binascii
+import json
+import math
+from typing import Tuple
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(value, game_id: int) -> str:
+    """Encode the sort value and id of the last game on a page."""
+    raw = json.dumps([value, game_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str, text: bool = False) -> Tuple:
+    """
+    Decode a cursor made by encode_cursor for a sort key.
+
+    Args:
+        cursor (str): The cursor from the previous page
+        text (bool): Whether the sort key holds strings rather than numbers
+
+    Returns:
+        tuple: The sort value (None for games without one) and the game id
+
+    Raises:
+        InvalidCursor: If it doesn't decode, or its values are of the wrong
+            type for the sort key
+    """
+    try:
+        value, game_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+    # bool is an int subclass, but never a sort value or id
+    if type(game_id) is not int:
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+    if value is not None:
+        if text:
+            valid = isinstance(value, str)
+        else:
+            valid = type(value) in (int, float) and math.isfinite(value)
+        if not valid:
+            raise InvalidCursor(f"Invalid cursor: {cursor}")
+    return value, game_id
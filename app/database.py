@@ -1,16 +1,23 @@
 import logging
 import os
+import threading
 
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import URL
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from dotenv import load_dotenv
 
-logger = logging.getLogger(os.getenv("LOGGER_NAME"))
-# This creates globals that are updated during init in __init__.py
+from .metrics import DB_SESSION_SECONDS, instrument_engine, timed
+
+# Created on first use by init_engines(), not at import
 engine = None
 SessionLocal = None
+async_engine = None
+AsyncSessionLocal = None
+_init_lock = threading.Lock()
 Base = declarative_base()  # Create the declarative base
 
 # Load environment variables
@@ -18,7 +25,40 @@ load_dotenv()
 logger=logging.getLogger(os.getenv('LOGGER_NAME'))
 
 
-def init_db():
+# A local SQLite file to use instead of PostgreSQL, e.g. for development;
+# only used when set, never as a fallback for missing credentials
+SQLITE_PATH = os.getenv('SQLITE_PATH')
+
+# Connection pool settings for PostgreSQL (per engine, so per worker process)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+
+# Async drivers to use for each sync URL scheme
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def database_url():
+    """
+    The database to connect to.
+
+    DATABASE_URL wins if set, then a local SQLite file at SQLITE_PATH if
+    set; otherwise PostgreSQL from the DB_* variables.
+
+    Raises:
+        RuntimeError: If none of these is configured, rather than quietly
+            using some other database
+    """
+    if os.getenv('DATABASE_URL'):
+        return os.getenv('DATABASE_URL')
+    if SQLITE_PATH:
+        logger.info("Using SQLite at %s", SQLITE_PATH)
+        return URL.create("sqlite", database=SQLITE_PATH)
     # Load environment variables
     db_config_dict = {
         "username": os.getenv('DB_USERNAME', None),
@@ -27,20 +67,42 @@ def init_db():
         "database": os.getenv('DB_NAME', "board_game_db")
     }
 
-    print("about to log")
-    logger.debug(db_config_dict)
-    print("log complete")
-    if not ([db_config_dict["username"], db_config_dict["password"]]):
-        raise TypeError('Username and Password not specified in Environment Variables')
+    logger.debug("Database %s on %s as %s", db_config_dict["database"], db_config_dict["host"],
+                 db_config_dict["username"])
+    if not (db_config_dict["username"] and db_config_dict["password"]):
+        raise RuntimeError("No database configured: set DB_USERNAME and DB_PASSWORD (with DB_HOST and DB_NAME), "
+                           "DATABASE_URL, or SQLITE_PATH for a local SQLite file")
+    return URL.create("postgresql", **db_config_dict)
+
+
+def engine_options(db_url) -> dict:
+    """create_engine / create_async_engine keyword arguments for a URL."""
+    if make_url(db_url).get_backend_name() == 'sqlite':
+        # Sessions are used from FastAPI's threadpool
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
 
-    db_url = URL.create("postgresql", **db_config_dict)
 
+def async_database_url(db_url):
+    """The same database with its async driver (asyncpg / aiosqlite)."""
+    url = make_url(db_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def init_db():
     try:
-        db_url = URL.create("postgresql", **db_config_dict)
+        db_url = database_url()
         logger.info("Created database URL")
         
         # Create SQLAlchemy engine
-        engine = create_engine(db_url)
+        engine = create_engine(db_url, **engine_options(db_url))
+        instrument_engine(engine, 'sync')
         logger.info("Created database engine")
         
         # Create SessionLocal class
@@ -50,17 +112,70 @@ def init_db():
         return engine, SessionLocal
         
     except Exception as e:
-        logger.error(f"Database initialization error: {str(e)}")
+        logger.error("Database initialization error: %s", e)
         raise
 
+def init_async_db(db_url=None):
+    """Create the async engine and session factory used by the notes endpoints."""
+    try:
+        db_url = async_database_url(db_url or database_url())
+        async_engine = create_async_engine(db_url, **engine_options(db_url))
+        instrument_engine(async_engine.sync_engine, 'async')
+        # Objects stay usable after commit without another round trip
+        AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+        logger.info("Created async database engine")
+        return async_engine, AsyncSessionLocal
+
+    except Exception as e:
+        logger.error("Async database initialization error: %s", e)
+        raise
+
+def init_engines():
+    """
+    Create the sync and async engines and session factories, once.
+
+    Engines connect lazily, so this does no I/O; it is called at app
+    startup and by anything that needs a connection before then.
+
+    Returns:
+        Engine: The sync engine
+    """
+    global engine, SessionLocal, async_engine, AsyncSessionLocal
+    with _init_lock:
+        if engine is None:
+            new_engine, new_sessions = init_db()
+            async_engine, AsyncSessionLocal = init_async_db(new_engine.url)
+            SessionLocal = new_sessions
+            engine = new_engine
+    return engine
+
+
+async def dispose_engines():
+    """Close every pooled connection, e.g. at shutdown."""
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+
+
 # Dependency to get database session
 def get_db():
-    if SessionLocal == None:
-        raise RuntimeError('Database not initialized')
+    if SessionLocal is None:
+        init_engines()
     logger.debug('Creating new session for database')
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        logger.debug('Closing database session')
-        db.close()
+    with timed(DB_SESSION_SECONDS, 'sync'):
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            logger.debug('Closing database session')
+            db.close()
+
+
+# Dependency to get an async database session
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        init_engines()
+    with timed(DB_SESSION_SECONDS, 'async'):
+        async with AsyncSessionLocal() as db:
+            yield db
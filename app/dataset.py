@@ -0,0 +1,345 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from dotenv import load_dotenv
+
+from .cursors import decode_cursor, encode_cursor
+from .facets import VALUE_FACETS, FacetIndex, Filters
+from .metrics import INDEX_BUILD_SECONDS, timed
+from .responses import CompressedPayloads, dumps
+from .search import SearchIndex, search_response
+from .similar import SimilarityIndex, similar_response
+from .utils.snapshot import ARROW_SUFFIX, map_games_table, read_games_frame
+
+load_dotenv()
+logger = logging.getLogger(os.getenv('LOGGER_NAME'))
+
+
+class GameIndex:
+    """
+    Id -> game lookup table built once when the dataset is loaded.
+
+    Each game is stored as a pre-serialized JSON payload so the detail
+    endpoint never touches pandas on the request path; ``compressed``
+    keeps gzip/brotli copies of the payloads that have been asked for.
+    """
+
+    def __init__(self, df: pd.DataFrame, id_column: str = 'id'):
+        if 'description' not in df.columns:
+            # Keep the details endpoint contract: description is always present
+            df = df.assign(description=None)
+        # First occurrence wins, matching the old df[...].iloc[0] lookup
+        df = df[df[id_column].notna()].drop_duplicates(subset=id_column)
+        # pandas' C serializer maps NaN to null and handles numpy scalars
+        # (split on '\n' only: it is always escaped inside JSON strings)
+        lines = df.to_json(orient='records', lines=True, force_ascii=False).split('\n')
+        self._payloads: Dict[int, bytes] = {
+            int(game_id): line.encode('utf-8')
+            for game_id, line in zip(df[id_column].tolist(), lines)
+        }
+        self.compressed = CompressedPayloads()
+        logger.info("Built game index with %d entries", len(self._payloads))
+
+    def get(self, game_id: int) -> Optional[bytes]:
+        """Return the JSON payload for a game, or None if it is unknown."""
+        return self._payloads.get(game_id)
+
+    def __contains__(self, game_id: int) -> bool:
+        return game_id in self._payloads
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+
+class MappedGameIndex:
+    """
+    Id -> game lookup over a memory-mapped Arrow table.
+
+    Only the id -> row mapping lives in the worker's own memory; a game's
+    JSON is built from the shared mapping when it is first requested and
+    kept in a bounded per-worker cache.
+    """
+
+    def __init__(self, table: pa.Table, id_column: str = 'id', cache_size: int = 4096):
+        self._table = table
+        self._rows: Dict[int, int] = {}
+        for row, game_id in enumerate(table.column(id_column).to_pylist()):
+            if game_id is not None:
+                # First occurrence wins, like GameIndex
+                self._rows.setdefault(game_id, row)
+        self._serialize = lru_cache(maxsize=cache_size)(self._serialize_row)
+        self.compressed = CompressedPayloads()
+        logger.info("Built mapped game index with %d entries", len(self._rows))
+
+    def _serialize_row(self, row: int) -> bytes:
+        game = self._table.slice(row, 1).to_pylist()[0]
+        game.setdefault('description', None)
+        return dumps(game)
+
+    def get(self, game_id: int) -> Optional[bytes]:
+        """Return the JSON payload for a game, or None if it is unknown."""
+        row = self._rows.get(game_id)
+        return None if row is None else self._serialize(row)
+
+    def __contains__(self, game_id: int) -> bool:
+        return game_id in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+def compute_home_stats(df: pd.DataFrame) -> Dict:
+    """Compute the aggregates shown on the home page."""
+    return {
+        "total_games": len(df),
+        "avg_rating": f"{df['rating_average'].mean():.2f}",
+        "avg_complexity": f"{df['complexity_average'].mean():.2f}",
+        "recent_games": df.nlargest(5, 'users_rated')[['name', 'year_published', 'rating_average']].to_dict('records'),
+    }
+
+
+# Columns the app serves; everything else in the source file is skipped
+APP_COLUMNS = (
+    'id', 'name', 'year_published', 'min_players', 'max_players', 'play_time',
+    'min_age', 'users_rated', 'rating_average', 'bgg_rank', 'complexity_average',
+    'owned_users', 'mechanics', 'domains', 'mechanics_list', 'description',
+)
+
+# Long text columns that stay in the memory-mapped table for shared snapshots
+MAPPED_ONLY_COLUMNS = ('mechanics', 'domains', 'mechanics_list', 'description')
+
+# Columns the listing endpoint can sort by, and the fields returned per game
+SORT_KEYS = ('rating_average', 'name', 'users_rated', 'year_published', 'bgg_rank')
+# Sort keys holding strings; the rest are numbers
+TEXT_SORT_KEYS = ('name',)
+LISTING_FIELDS = ('id', 'name', 'year_published', 'rating_average')
+
+
+def _column_array(series: pd.Series) -> np.ndarray:
+    """Native numpy array for a column, or an object array with None for gaps."""
+    if series.notna().all():
+        return series.to_numpy()
+    return series.astype(object).where(series.notna(), None).to_numpy()
+
+
+class _SortedView:
+    """
+    One sort key in one direction, laid out for keyset pagination.
+
+    Games with a value are kept in ``order`` (row positions) with their sort
+    values and ids alongside, so np.searchsorted finds the position after a
+    cursor. Games without a value always come last, ordered by id.
+    """
+
+    def __init__(self, values: np.ndarray, ids: np.ndarray, descending: bool):
+        present = pd.notna(values)
+        self.descending = descending
+        # Descending views are stored ascending on (value, -id) and walked
+        # backwards, so ties still come out in ascending id order
+        frame = pd.DataFrame({'value': values[present], 'id': ids[present],
+                              'row': np.flatnonzero(present)})
+        frame = frame.sort_values(['value', 'id'], ascending=[True, not descending], kind='stable')
+        self.order = frame['row'].to_numpy(dtype=np.int64)
+        self.values = frame['value'].to_numpy()
+        self.ids = -frame['id'].to_numpy(dtype=np.int64) if descending else frame['id'].to_numpy(dtype=np.int64)
+        missing = np.flatnonzero(~present)
+        self.missing = missing[np.argsort(ids[missing], kind='stable')]
+        self.missing_ids = ids[self.missing].astype(np.int64)
+
+    def _position(self, value, game_id: int) -> int:
+        """Number of stored entries at or before (value, game_id)."""
+        lo = int(np.searchsorted(self.values, value, side='left'))
+        hi = int(np.searchsorted(self.values, value, side='right'))
+        if self.descending:
+            return lo + int(np.searchsorted(self.ids[lo:hi], -game_id, side='left'))
+        return lo + int(np.searchsorted(self.ids[lo:hi], game_id, side='right'))
+
+    def offset(self, cursor: Optional[Tuple]) -> int:
+        """Position in page order of the first row after the cursor."""
+        if cursor is None:
+            return 0
+        value, game_id = cursor
+        if value is None:
+            return len(self.order) + int(np.searchsorted(self.missing_ids, game_id, side='right'))
+        position = self._position(value, game_id)
+        return len(self.order) - position if self.descending else position
+
+    def walk(self) -> np.ndarray:
+        """Every row position, in page order."""
+        return np.concatenate([self.order[::-1] if self.descending else self.order, self.missing])
+
+    def rows_after(self, cursor: Optional[Tuple], limit: int) -> np.ndarray:
+        """Return up to ``limit`` row positions following the cursor."""
+        start = self.offset(cursor)
+        present = len(self.order)
+        rows = self.order[:0]
+        if start < present:
+            if self.descending:
+                rows = self.order[max(present - start - limit, 0):present - start][::-1]
+            else:
+                rows = self.order[start:start + limit]
+        remaining = limit - len(rows)
+        if remaining > 0:
+            start_missing = max(start - present, 0)
+            rows = np.concatenate([rows, self.missing[start_missing:start_missing + remaining]])
+        return rows
+
+
+class GameListing:
+    """
+    Pre-sorted views of the dataset for cursor-paginated listing.
+
+    Each page costs a binary search plus the page itself, independent of
+    how many games are in the dataset. Views are numpy arrays rather than
+    Python objects so they stay small when every worker holds a copy.
+    """
+
+    def __init__(self, df: pd.DataFrame, sort_keys=SORT_KEYS):
+        frame = df.drop_duplicates(subset='id')
+        self._fields = {field: _column_array(frame[field]) for field in LISTING_FIELDS if field in frame.columns}
+        ids = frame['id'].to_numpy(dtype=np.int64)
+        self.sort_keys = tuple(key for key in sort_keys if key in frame.columns)
+        self._values: Dict[str, np.ndarray] = {}
+        self._views: Dict[Tuple[str, bool], _SortedView] = {}
+        for key in self.sort_keys:
+            values = _column_array(frame[key])
+            self._values[key] = values
+            for descending in (False, True):
+                self._views[(key, descending)] = _SortedView(values, ids, descending)
+
+    def items(self, rows: np.ndarray) -> List[Dict]:
+        """The listing fields of the games at some row positions."""
+        columns = {field: values[rows].tolist() for field, values in self._fields.items()}
+        return [dict(zip(columns, game)) for game in zip(*columns.values())]
+
+    def page(self, sort: str, descending: bool = False, cursor: Optional[str] = None,
+             limit: int = 50, mask: Optional[np.ndarray] = None) -> Dict:
+        """
+        Return one page of games and the cursor for the next page.
+
+        With ``mask`` (a boolean per row), only the games it selects are
+        paged through; cursors work the same either way.
+
+        Raises:
+            KeyError: If ``sort`` is not one of the indexed sort keys
+            InvalidCursor: If ``cursor`` cannot be decoded
+        """
+        view = self._views[(sort, descending)]
+        cursor_key = decode_cursor(cursor, text=sort in TEXT_SORT_KEYS) if cursor else None
+        if mask is None:
+            rows = view.rows_after(cursor_key, limit)
+        else:
+            # Page through the matching rows only, in the view's order
+            walk = view.walk()
+            matching = np.flatnonzero(mask[walk])
+            start = int(np.searchsorted(matching, view.offset(cursor_key)))
+            rows = walk[matching[start:start + limit]]
+        items = self.items(rows)
+        next_cursor = None
+        if len(rows) == limit:
+            last_value = self._values[sort][rows[-1:]].tolist()[0]
+            next_cursor = encode_cursor(last_value, items[-1]['id'])
+        return {
+            "items": items,
+            "next_cursor": next_cursor,
+        }
+
+
+def filter_response(listing: GameListing, facets: FacetIndex, filters: Filters, sort: str,
+                    descending: bool, cursor: Optional[str], limit: int) -> Dict:
+    """The /games/filter body: a page of matching games, their count and the facet counts."""
+    if sort not in listing.sort_keys:
+        raise KeyError(sort)
+    result = facets.evaluate(filters)
+    page = listing.page(sort, descending=descending, cursor=cursor, limit=limit, mask=result.mask)
+    return {
+        **page,
+        "total": result.total,
+        "facets": result.counts,
+    }
+
+
+def similar_games(listing: GameListing, similarity: SimilarityIndex, game_id: int, limit: int) -> Optional[Dict]:
+    """The /game/{game_id}/similar body, or None for an unknown game."""
+    neighbours = similarity.similar(game_id, limit)
+    if neighbours is None:
+        return None
+    return similar_response(listing.items(neighbours.rows), neighbours)
+
+
+class GameDataset:
+    """
+    A loaded dataset together with every view derived from it.
+
+    Everything here is computed once at load time; reloading the data means
+    building a new GameDataset rather than mutating this one.
+
+    When loaded from an .arrow snapshot, ``table`` is the shared memory-mapped
+    data and ``df`` holds only the small columns the derived views need.
+    """
+
+    def __init__(self, df: pd.DataFrame, table: Optional[pa.Table] = None):
+        self.df = df
+        self.table = table
+        with timed(INDEX_BUILD_SECONDS, 'game'):
+            self.index = GameIndex(df) if table is None else MappedGameIndex(table)
+        self.home_stats = compute_home_stats(df)
+        with timed(INDEX_BUILD_SECONDS, 'listing'):
+            self.listing = GameListing(df)
+        facet_df = df
+        if table is not None:
+            # Mechanics and domains live in the mapped table
+            facet_df = df.assign(**{facet: table.column(facet).to_pandas()
+                                    for facet in VALUE_FACETS if facet in table.column_names})
+        with timed(INDEX_BUILD_SECONDS, 'facets'):
+            self.facets = FacetIndex(facet_df)
+        with timed(INDEX_BUILD_SECONDS, 'similarity'):
+            self.similarity = SimilarityIndex(facet_df, multi_hot=self.facets.multi_hot)
+        search_df = df
+        if table is not None:
+            # Descriptions and mechanics live in the mapped table
+            search_df = table.select([c for c in ('id', 'name', 'users_rated', 'mechanics', 'description')
+                                      if c in table.column_names]).to_pandas()
+        # Tokenizing every description is the slowest index to build; like the
+        # rest it is built here, in the reload thread, not on the first search
+        with timed(INDEX_BUILD_SECONDS, 'search'):
+            self.search_index = SearchIndex(search_df)
+
+    def search(self, query: str, limit: int = 20) -> Dict:
+        """Ranked prefix search over names, mechanics and descriptions."""
+        result = self.search_index.search(query, limit)
+        return search_response(self.listing.items(result.rows), result)
+
+    def similar(self, game_id: int, limit: int = 10) -> Optional[Dict]:
+        """The games most like ``game_id``, or None if it is unknown."""
+        return similar_games(self.listing, self.similarity, game_id, limit)
+
+    def filter(self, filters: Filters, sort: str = 'rating_average', descending: bool = True,
+               cursor: Optional[str] = None, limit: int = 50) -> Dict:
+        """
+        One page of the games matching ``filters``, with the match count and facet counts.
+
+        Raises:
+            KeyError: If ``sort`` is not one of the listing's sort keys
+            InvalidCursor: If ``cursor`` cannot be decoded
+        """
+        return filter_response(self.listing, self.facets, filters, sort, descending, cursor, limit)
+
+    @classmethod
+    def from_path(cls, path: str) -> 'GameDataset':
+        """Load a dataset CSV or snapshot with the app's columns."""
+        logger.info("Loading BGG dataset from %s...", path)
+        if path.endswith(ARROW_SUFFIX):
+            table = map_games_table(path, columns=APP_COLUMNS)
+            small_columns = [c for c in table.column_names if c not in MAPPED_ONLY_COLUMNS]
+            df = table.select(small_columns).to_pandas()
+            logger.info("Mapped %d games; in-process columns: %s", table.num_rows, df.columns)
+            return cls(df, table=table)
+        df = read_games_frame(path, columns=APP_COLUMNS)
+        logger.info("The columns in the df are: %s", df.columns)
+        return cls(df)
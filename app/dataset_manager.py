@@ -0,0 +1,215 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .metrics import DATASET_LOAD_SECONDS, DATASET_LOADED_AT, DATASET_VERSION
+
+load_dotenv()
+logger = logging.getLogger(os.getenv('LOGGER_NAME'))
+
+# Seconds between checks of the dataset file for a new version; 0 turns watching off
+DATASET_WATCH_INTERVAL = float(os.getenv('DATASET_WATCH_INTERVAL', '0'))
+
+
+def file_signature(path: Optional[str]) -> Tuple:
+    """
+    What identifies the current contents of a dataset path.
+
+    For a CSV this includes its Parquet snapshot, which is what actually
+    gets loaded when it is newer. Missing files have no signature.
+    """
+    if not path:
+        return ()
+    # Imported here: snapshot pulls in pandas and pyarrow, which app startup defers
+    from .utils.snapshot import ARROW_SUFFIX, SNAPSHOT_SUFFIX, snapshot_path
+    paths = [path]
+    if not path.endswith((SNAPSHOT_SUFFIX, ARROW_SUFFIX)):
+        paths.append(snapshot_path(path))
+    signature = []
+    for candidate in paths:
+        try:
+            stat = os.stat(candidate)
+        except FileNotFoundError:
+            continue
+        signature.append((candidate, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class DatasetVersion:
+    """
+    One published dataset and the home page rendered from it.
+
+    Requests take the manager's current version once and use only it, so a
+    request that started before a swap finishes on the old version.
+    """
+
+    __slots__ = ('number', 'dataset', 'home_page', 'path', 'loaded_at')
+
+    def __init__(self, number: int, dataset, home_page, path: Optional[str]):
+        self.number = number
+        self.dataset = dataset
+        self.home_page = home_page
+        self.path = path
+        self.loaded_at = time.time()
+
+
+class DatasetManager:
+    """
+    Holds the current DatasetVersion and replaces it without downtime.
+
+    A reload builds the new dataset and its indexes in a background thread
+    while requests keep being served from the current version, then
+    publishes it with a single reference assignment. A failed build is
+    logged and the current version stays. Reloads asked for during a build
+    are coalesced into one more build once it is done, so the newest file
+    always ends up loaded.
+
+    Args:
+        build: Called with a path; returns the (dataset, home_page) pair
+        path (str): The dataset file, or None for sources without one
+        watch_interval (float): Seconds between checks for a changed file
+    """
+
+    def __init__(self, build: Callable[[Optional[str]], Tuple[Any, Any]], path: Optional[str] = None,
+                 watch_interval: float = DATASET_WATCH_INTERVAL):
+        self._build = build
+        self.path = path
+        self.watch_interval = watch_interval
+        self._current: Optional[DatasetVersion] = None
+        self._lock = threading.Lock()
+        self._builder: Optional[threading.Thread] = None
+        self._pending = False
+        # Whether a builder thread is building or about to check _pending
+        self._running = False
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._signature: Tuple = ()
+        self._candidate: Optional[Tuple] = None
+        # Why the last background build failed, until one succeeds
+        self.last_error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether a version has been published, i.e. requests can be served."""
+        return self._current is not None
+
+    @property
+    def current(self) -> DatasetVersion:
+        """The published version; read it once per request."""
+        if self._current is None:
+            raise RuntimeError('No dataset loaded yet')
+        return self._current
+
+    def load(self) -> DatasetVersion:
+        """Build and publish a version in the calling thread, e.g. at startup."""
+        self._build_and_publish()
+        return self.current
+
+    def _build_and_publish(self):
+        signature = file_signature(self.path)
+        start = time.perf_counter()
+        try:
+            dataset, home_page = self._build(self.path)
+        except Exception:
+            DATASET_LOAD_SECONDS.labels('failure').observe(time.perf_counter() - start)
+            raise
+        finally:
+            # A file that fails to load isn't retried until it changes again
+            self._signature = signature
+        elapsed = time.perf_counter() - start
+        self.last_error = None
+        DATASET_LOAD_SECONDS.labels('success').observe(elapsed)
+        number = self._current.number + 1 if self._current is not None else 1
+        self._current = DatasetVersion(number, dataset, home_page, self.path)
+        DATASET_VERSION.set(number)
+        DATASET_LOADED_AT.set(self._current.loaded_at)
+        logger.info("Published dataset version %d from %s (built in %.2f s)", number, self.path, elapsed)
+
+    def reload(self, path: Optional[str] = None) -> bool:
+        """
+        Rebuild in the background, optionally from a new path.
+
+        Returns:
+            bool: True if a build was started, False if one was already
+            running (another build then follows it)
+        """
+        with self._lock:
+            if path is not None:
+                self.path = path
+            if self._running:
+                self._pending = True
+                return False
+            self._running = True
+            self._builder = threading.Thread(target=self._run_builds, name='dataset-reload', daemon=True)
+            self._builder.start()
+            return True
+
+    def _run_builds(self):
+        while True:
+            try:
+                self._build_and_publish()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error("Dataset reload from %s failed, keeping version %s: %s", self.path,
+                             self._current.number if self._current else None, e)
+            with self._lock:
+                if not self._pending:
+                    # Cleared under the lock, so a reload() from now on starts a new thread
+                    # instead of leaving a pending flag no thread will see
+                    self._running = False
+                    return
+                self._pending = False
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a running reload; True if none is left running."""
+        builder = self._builder
+        if builder is not None:
+            builder.join(timeout)
+            return not builder.is_alive()
+        return True
+
+    def check(self) -> bool:
+        """
+        Reload if the dataset file changed since the last build.
+
+        A change is only acted on once the file has looked the same for
+        two checks in a row, so a file that is still being written is not
+        picked up half-way.
+        """
+        signature = file_signature(self.path)
+        if not signature or signature == self._signature:
+            self._candidate = None
+            return False
+        if self._candidate != signature:
+            self._candidate = signature
+            return False
+        self._candidate = None
+        logger.info("Dataset file %s changed; reloading", self.path)
+        return self.reload()
+
+    def _watch(self):
+        while not self._stop.wait(self.watch_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error("Error checking %s for changes: %s", self.path, e)
+
+    def start_watching(self) -> bool:
+        """Start the watcher thread if there is a file and an interval."""
+        if not self.path or self.watch_interval <= 0 or self._watcher is not None:
+            return False
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name='dataset-watch', daemon=True)
+        self._watcher.start()
+        logger.info("Watching %s for changes every %s s", self.path, self.watch_interval)
+        return True
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -0,0 +1,184 @@
+import logging
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from .utils.vocabulary import MultiHot
+
+load_dotenv()
+logger = logging.getLogger(os.getenv('LOGGER_NAME'))
+
+# Comma-separated columns; a game has to have every selected value
+VALUE_FACETS = ('mechanics', 'domains')
+
+# Numeric columns filtered by range, and the bucket edges their counts use
+RANGE_FACETS = {
+    'play_time': (0, 30, 60, 90, 120, 180, 240),
+    'complexity_average': (1, 2, 3, 4, 5),
+    'year_published': (1950, 1960, 1970, 1980, 1990, 2000, 2010, 2020),
+}
+
+# Player counts reported in the players facet
+PLAYER_COUNTS = tuple(range(1, 9))
+
+Range = Tuple[Optional[float], Optional[float]]
+
+
+class Filters(NamedTuple):
+    """A combined filter; empty fields don't filter. Ranges are inclusive."""
+    mechanics: Tuple[str, ...] = ()
+    domains: Tuple[str, ...] = ()
+    players: Optional[int] = None
+    play_time: Range = (None, None)
+    complexity_average: Range = (None, None)
+    year_published: Range = (None, None)
+
+
+class FacetResult(NamedTuple):
+    mask: np.ndarray         # Which rows match every filter
+    total: int               # How many rows match
+    counts: Dict[str, Dict]  # Facet -> value or bucket -> matching games
+
+
+def bucket_labels(edges: Tuple) -> List[str]:
+    """'lo-hi' for each bucket between edges, and 'last+' for the open one."""
+    labels = [f'{lo}-{hi}' for lo, hi in zip(edges, edges[1:])]
+    return labels + [f'{edges[-1]}+']
+
+
+class FacetIndex:
+    """
+    Precomputed indexes for filtering games and counting facet values.
+
+    Each mechanic and domain has a packed bitmap of the games that have it,
+    so value filters are a few ANDs over N/8 bytes. Range columns keep their
+    rows sorted by value, so a range is two binary searches. Counts come
+    from the values' MultiHot matrices and per-row bucket numbers, never
+    from the DataFrame.
+
+    Value facet counts are over the games matching every filter (how many
+    would remain if that value were added). The players and range facets
+    leave out their own filter, so they show the spread to narrow within.
+
+    Rows are positions in ``df`` after dropping duplicate ids, the same
+    positions dataset.GameListing uses.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.drop_duplicates(subset='id').reset_index(drop=True)
+        self.size = len(df)
+        self.values: Dict[str, List[str]] = {}
+        self.multi_hot: Dict[str, MultiHot] = {}
+        self._bitmaps: Dict[str, np.ndarray] = {}
+        for facet in VALUE_FACETS:
+            if facet not in df.columns:
+                continue
+            multi_hot = MultiHot.from_joined(df[facet])
+            self.multi_hot[facet] = multi_hot
+            self.values[facet] = multi_hot.vocabulary.tolist()
+            # One bitmap row per value; a bitmap is an eighth of a bool mask
+            self._bitmaps[facet] = np.packbits(multi_hot.to_dense().T, axis=1)
+
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._numbers: Dict[str, np.ndarray] = {}
+        for column in ('min_players', 'max_players', *RANGE_FACETS):
+            if column not in df.columns:
+                continue
+            numbers = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            present = np.flatnonzero(~np.isnan(numbers))
+            order = present[np.argsort(numbers[present], kind='stable')]
+            self._numbers[column] = numbers
+            self._sorted[column] = (order, numbers[order])
+
+        self._buckets: Dict[str, np.ndarray] = {}
+        for column, edges in RANGE_FACETS.items():
+            if column in self._numbers:
+                numbers = self._numbers[column]
+                buckets = np.searchsorted(edges, numbers, side='right') - 1
+                # Below the first edge or without a value: in no bucket
+                buckets[np.isnan(numbers)] = -1
+                self._buckets[column] = buckets.astype(np.int8)
+        logger.info("Built facet index over %d games: %s", self.size,
+                    ', '.join(f'{len(v)} {f}' for f, v in self.values.items()))
+
+    def _value_mask(self, facet: str, selected: Tuple[str, ...]) -> np.ndarray:
+        """Rows that have every selected value."""
+        names = self.values.get(facet, [])
+        bits = np.full((self.size + 7) // 8, 0xFF, dtype=np.uint8)
+        for value in selected:
+            position = int(np.searchsorted(names, value)) if names else 0
+            if position == len(names) or names[position] != value:
+                # Nothing has an unknown value
+                return np.zeros(self.size, dtype=bool)
+            bits &= self._bitmaps[facet][position]
+        return np.unpackbits(bits, count=self.size).view(bool)
+
+    def _range_mask(self, column: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        """Rows whose value is within [low, high]; rows without a value never match."""
+        mask = np.zeros(self.size, dtype=bool)
+        if column not in self._sorted:
+            return mask
+        order, values = self._sorted[column]
+        start = 0 if low is None else int(np.searchsorted(values, low, side='left'))
+        end = len(values) if high is None else int(np.searchsorted(values, high, side='right'))
+        mask[order[start:end]] = True
+        return mask
+
+    def _masks(self, filters: Filters) -> Dict[str, np.ndarray]:
+        """One mask per active filter, keyed by facet."""
+        masks = {}
+        for facet in VALUE_FACETS:
+            selected = getattr(filters, facet)
+            if selected:
+                masks[facet] = self._value_mask(facet, selected)
+        if filters.players is not None:
+            masks['players'] = (self._range_mask('min_players', None, filters.players)
+                                & self._range_mask('max_players', filters.players, None))
+        for column in RANGE_FACETS:
+            low, high = getattr(filters, column)
+            if low is not None or high is not None:
+                masks[column] = self._range_mask(column, low, high)
+        return masks
+
+    def _combine(self, masks: Dict[str, np.ndarray], leave_out: Optional[str] = None) -> np.ndarray:
+        combined = np.ones(self.size, dtype=bool)
+        for facet, mask in masks.items():
+            if facet != leave_out:
+                combined &= mask
+        return combined
+
+    def _value_counts(self, facet: str, mask: np.ndarray) -> Dict[str, int]:
+        counts = self.multi_hot[facet].counts(mask)
+        # Most common first, zero counts left out
+        order = np.lexsort((np.arange(len(counts)), -counts))
+        names = self.values[facet]
+        return {names[code]: int(counts[code]) for code in order if counts[code]}
+
+    def _player_counts(self, mask: np.ndarray) -> Dict[str, int]:
+        low = self._numbers['min_players'][mask]
+        high = self._numbers['max_players'][mask]
+        players = np.array(PLAYER_COUNTS, dtype=np.float64)[:, None]
+        counts = ((low <= players) & (high >= players)).sum(axis=1)
+        return {str(n): int(count) for n, count in zip(PLAYER_COUNTS, counts)}
+
+    def _bucket_counts(self, column: str, mask: np.ndarray) -> Dict[str, int]:
+        buckets = self._buckets[column][mask]
+        edges = RANGE_FACETS[column]
+        counts = np.bincount(buckets[buckets >= 0], minlength=len(edges))
+        return dict(zip(bucket_labels(edges), counts.tolist()))
+
+    def evaluate(self, filters: Filters) -> FacetResult:
+        """Match games against a filter and count every facet's values."""
+        masks = self._masks(filters)
+        mask = self._combine(masks)
+        counts: Dict[str, Dict] = {}
+        for facet in self.multi_hot:
+            counts[facet] = self._value_counts(facet, mask)
+        if 'min_players' in self._numbers and 'max_players' in self._numbers:
+            counts['players'] = self._player_counts(self._combine(masks, leave_out='players'))
+        for column in self._buckets:
+            counts[column] = self._bucket_counts(column, self._combine(masks, leave_out=column))
+        return FacetResult(mask, int(mask.sum()), counts)
@@ -0,0 +1,301 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import case, func, or_, select, text
+from sqlalchemy.engine import Engine
+from dotenv import load_dotenv
+
+from .dataset import (LISTING_FIELDS, SORT_KEYS, TEXT_SORT_KEYS, GameListing, decode_cursor, encode_cursor,
+                      filter_response, similar_games)
+from .facets import RANGE_FACETS, VALUE_FACETS, FacetIndex, Filters
+from .metrics import INDEX_BUILD_SECONDS, timed
+from .models import SEARCH_VECTOR_SQL, BoardGame
+from .responses import dumps
+from .search import NAME_PREFIX_BONUS, SearchIndex, SearchResult, search_response, tokenize
+from .similar import SIMILAR_NUMERIC_FEATURES, SimilarityIndex
+
+load_dotenv()
+logger = logging.getLogger(os.getenv('LOGGER_NAME'))
+
+# Seconds the home page aggregates are reused before being queried again
+GAME_STATS_TTL = float(os.getenv('GAME_STATS_TTL', '60'))
+
+games = BoardGame.__table__
+
+# Detail columns, in the same order as the in-memory payloads (id is bgg_id)
+DETAIL_COLUMNS = (
+    'name', 'year_published', 'min_players', 'max_players', 'play_time', 'min_age',
+    'users_rated', 'rating_average', 'bgg_rank', 'complexity_average', 'owned_users',
+    'mechanics', 'domains',
+)
+
+
+class DatabaseGameIndex:
+    """Id -> game lookup backed by an indexed query on bgg_id."""
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._query = select(games.c.bgg_id.label('id'), *(games.c[name] for name in DETAIL_COLUMNS),
+                             games.c.description)
+
+    def get(self, game_id: int) -> Optional[bytes]:
+        """Return the JSON payload for a game, or None if it is unknown."""
+        with self._engine.connect() as connection:
+            row = connection.execute(self._query.where(games.c.bgg_id == game_id).limit(1)).mappings().first()
+        if row is None:
+            return None
+        game = dict(row)
+        mechanics = game['mechanics']
+        # Same shape as the snapshot payloads, which carry the parsed list
+        game['mechanics_list'] = [m.strip() for m in mechanics.split(',') if m.strip()] if mechanics else []
+        game['description'] = game.pop('description')
+        return dumps(game)
+
+
+class DatabaseListing:
+    """
+    Keyset-paginated listing over board_games.
+
+    Same ordering and cursors as dataset.GameListing: games with a value
+    come first by value then id, games without one come last by id. A page
+    is at most two range scans on the sort key's (column, bgg_id) index
+    (models.BoardGame has one per direction): one through the games with a
+    value from the cursor on, then, if the page isn't full yet, one through
+    the games without a value.
+    """
+
+    sort_keys = SORT_KEYS
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+
+    def page(self, sort: str, descending: bool = False, cursor: Optional[str] = None,
+             limit: int = 50) -> Dict:
+        """
+        Return one page of games and the cursor for the next page.
+
+        Raises:
+            KeyError: If ``sort`` is not one of the sort keys
+            InvalidCursor: If ``cursor`` cannot be decoded
+        """
+        if sort not in self.sort_keys:
+            raise KeyError(sort)
+        column = games.c[sort]
+        game_id = games.c.bgg_id
+        fields = [game_id.label('id') if field == 'id' else games.c[field] for field in LISTING_FIELDS]
+        value, last_id = decode_cursor(cursor, text=sort in TEXT_SORT_KEYS) if cursor else (None, None)
+        rows = []
+        with self._engine.connect() as connection:
+            if not cursor or value is not None:
+                valued = select(*fields, column.label('sort_value')).where(column.is_not(None)).order_by(
+                    column.desc() if descending else column.asc(), game_id.asc()).limit(limit)
+                if cursor:
+                    # Written as a range on the column plus a filter, so the
+                    # scan starts at the cursor's value in the index
+                    if descending:
+                        valued = valued.where(column <= value, or_(column < value, game_id > last_id))
+                    else:
+                        valued = valued.where(column >= value, or_(column > value, game_id > last_id))
+                rows = connection.execute(valued).mappings().all()
+                # Games without a value come after all the others, from the first
+                last_id = None
+            if len(rows) < limit:
+                missing = select(*fields, column.label('sort_value')).where(column.is_(None)).order_by(
+                    game_id.asc()).limit(limit - len(rows))
+                if last_id is not None:
+                    missing = missing.where(game_id > last_id)
+                rows += connection.execute(missing).mappings().all()
+        items = [{field: row[field] for field in LISTING_FIELDS} for row in rows]
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1]['sort_value'], rows[-1]['id'])
+        return {
+            "items": items,
+            "next_cursor": next_cursor,
+        }
+
+
+def _listing_items(engine: Engine, ids: List[int]) -> Dict[int, Dict]:
+    """Listing fields for some games, keyed by id."""
+    if not ids:
+        return {}
+    fields = [games.c.bgg_id.label('id') if field == 'id' else games.c[field] for field in LISTING_FIELDS]
+    with engine.connect() as connection:
+        rows = connection.execute(select(*fields).where(games.c.bgg_id.in_(ids))).mappings().all()
+    return {row['id']: dict(row) for row in rows}
+
+
+def name_starts_with(query: str):
+    """
+    Whether a game's name starts with the query, ignoring case.
+
+    LIKE wildcards in the query (% and _) are escaped, so they match only
+    themselves, as they do in the in-memory SearchIndex.
+    """
+    return func.lower(games.c.name).startswith(query.strip().lower(), autoescape=True)
+
+
+class PostgresSearch:
+    """Ranked prefix search with the tsvector GIN index on board_games."""
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._vector = text(f'({SEARCH_VECTOR_SQL})')
+
+    def search(self, query: str, limit: int = 20) -> Dict:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return search_response([], SearchResult(np.array([]), np.array([]), 0))
+        ts_query = func.to_tsquery('simple', ' & '.join(f'{token}:*' for token in tokens))
+        name_bonus = case((name_starts_with(query), NAME_PREFIX_BONUS), else_=0)
+        score = (func.ts_rank_cd(self._vector, ts_query) + name_bonus).label('score')
+        fields = [games.c.bgg_id.label('id') if field == 'id' else games.c[field] for field in LISTING_FIELDS]
+        statement = (
+            select(*fields, score, func.count().over().label('total'))
+            .where(self._vector.bool_op('@@')(ts_query))
+            .order_by(score.desc(), games.c.users_rated.desc().nulls_last())
+            .limit(limit)
+        )
+        with self._engine.connect() as connection:
+            rows = connection.execute(statement).mappings().all()
+        items = [{field: row[field] for field in LISTING_FIELDS} for row in rows]
+        total = rows[0]['total'] if rows else 0
+        return search_response(items, SearchResult(np.arange(len(rows)),
+                                                   np.array([row['score'] for row in rows]), total))
+
+
+class TableSearch:
+    """
+    In-process search over the board_games table, for databases without
+    full-text indexes (e.g. SQLite). The index is built when this is
+    created, i.e. with the rest of the dataset and off the request path.
+    """
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._index = self._build()
+
+    def _build(self) -> SearchIndex:
+        columns = [games.c.bgg_id.label('id'), games.c.name, games.c.users_rated,
+                   games.c.mechanics, games.c.description]
+        with self._engine.connect() as connection:
+            df = pd.DataFrame(connection.execute(select(*columns)).mappings().all(),
+                              columns=['id', 'name', 'users_rated', 'mechanics', 'description'])
+        with timed(INDEX_BUILD_SECONDS, 'search'):
+            return SearchIndex(df)
+
+    def search(self, query: str, limit: int = 20) -> Dict:
+        result = self._index.search(query, limit)
+        ids = self._index.ids[result.rows].tolist()
+        found = _listing_items(self._engine, ids)
+        # Games deleted since the index was built are dropped
+        keep = [position for position, game_id in enumerate(ids) if game_id in found]
+        result = result._replace(rows=result.rows[keep], scores=result.scores[keep])
+        return search_response([found[ids[position]] for position in keep], result)
+
+
+class TableViews:
+    """
+    The in-process listing, facet and similarity indexes over a snapshot
+    of the board_games table, built together on first use.
+    """
+
+    columns = tuple(dict.fromkeys((*LISTING_FIELDS, *SORT_KEYS, 'min_players', 'max_players', *RANGE_FACETS,
+                                   *VALUE_FACETS, *(column for column, _ in SIMILAR_NUMERIC_FEATURES))))
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._views = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Tuple[GameListing, FacetIndex, SimilarityIndex]:
+        if self._views is None:
+            with self._lock:
+                if self._views is None:
+                    self._views = self._build()
+        return self._views
+
+    def _build(self):
+        fields = [games.c.bgg_id.label('id') if column == 'id' else games.c[column] for column in self.columns]
+        with self._engine.connect() as connection:
+            df = pd.DataFrame(connection.execute(select(*fields).order_by(games.c.bgg_id)).mappings().all(),
+                              columns=list(self.columns))
+        with timed(INDEX_BUILD_SECONDS, 'listing'):
+            listing = GameListing(df)
+        with timed(INDEX_BUILD_SECONDS, 'facets'):
+            facets = FacetIndex(df)
+        with timed(INDEX_BUILD_SECONDS, 'similarity'):
+            similarity = SimilarityIndex(df, multi_hot=facets.multi_hot)
+        return listing, facets, similarity
+
+
+class DatabaseGames:
+    """
+    Game data served from the board_games table instead of a DataFrame.
+
+    Exposes the same ``index``, ``listing`` and ``home_stats`` as
+    dataset.GameDataset, so routes don't care which one they have. Those
+    query the database on every request, so loading new data needs no
+    restart. Filtering and similar games use in-process indexes built from
+    the table the first time they are needed; outside PostgreSQL, search
+    uses one built when this is created.
+    """
+
+    # Methods block on the database; routes run them in a thread
+    blocking = True
+
+    def __init__(self, engine: Engine, stats_ttl: float = GAME_STATS_TTL):
+        self.engine = engine
+        self.index = DatabaseGameIndex(engine)
+        self.listing = DatabaseListing(engine)
+        self._search = PostgresSearch(engine) if engine.dialect.name == 'postgresql' else TableSearch(engine)
+        self._views = TableViews(engine)
+        self._stats_ttl = stats_ttl
+        self._stats: Optional[Dict] = None
+        self._stats_at = 0.0
+
+    @property
+    def home_stats(self) -> Dict:
+        """The home page aggregates, re-queried at most every ``stats_ttl`` seconds."""
+        if self._stats is None or time.monotonic() - self._stats_at >= self._stats_ttl:
+            self._stats = self._query_home_stats()
+            self._stats_at = time.monotonic()
+        return self._stats
+
+    def search(self, query: str, limit: int = 20) -> Dict:
+        """Ranked prefix search; full-text indexed on PostgreSQL, in-process elsewhere."""
+        return self._search.search(query, limit)
+
+    def filter(self, filters: Filters, sort: str = 'rating_average', descending: bool = True,
+               cursor: Optional[str] = None, limit: int = 50) -> Dict:
+        """Faceted filtering, like GameDataset.filter, over a snapshot of the table taken on first use."""
+        listing, facets, _ = self._views.get()
+        return filter_response(listing, facets, filters, sort, descending, cursor, limit)
+
+    def similar(self, game_id: int, limit: int = 10) -> Optional[Dict]:
+        """Similar games, like GameDataset.similar, over the same snapshot as filter."""
+        listing, _, similarity = self._views.get()
+        return similar_games(listing, similarity, game_id, limit)
+
+    def _query_home_stats(self) -> Dict:
+        with self.engine.connect() as connection:
+            total, avg_rating, avg_complexity = connection.execute(select(
+                func.count(), func.avg(games.c.rating_average), func.avg(games.c.complexity_average)
+            )).one()
+            recent: List[Dict] = [dict(row) for row in connection.execute(
+                select(games.c.name, games.c.year_published, games.c.rating_average)
+                .where(games.c.users_rated.is_not(None))
+                .order_by(games.c.users_rated.desc(), games.c.bgg_id)
+                .limit(5)
+            ).mappings()]
+        return {
+            "total_games": total,
+            "avg_rating": f"{avg_rating or 0:.2f}",
+            "avg_complexity": f"{avg_complexity or 0:.2f}",
+            "recent_games": recent,
+        }
@@ -0,0 +1,62 @@
+"""
+The FastAPI app.
+
+Importing this module only wires the app together; it doesn't touch the
+database or the dataset, and doesn't import pandas. Startup work happens in
+the lifespan hook when a server (or TestClient) starts the app: the
+database is connected and its tables created, and the dataset is loaded in
+a background thread. Until that load is done /healthz answers and /readyz
+and the data routes return 503.
+"""
+import logging
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from dotenv import load_dotenv
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+
+from . import database, models
+from .routes import datasets, router
+from .utils.logger import setup_logger, stop_logger
+
+load_dotenv()
+logger = logging.getLogger(os.getenv('LOGGER_NAME'))
+
+STATIC_DIR = Path("app/static")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logger()
+    # Create database tables
+    models.Base.metadata.create_all(bind=database.init_engines())
+    # Loads in the background, so the server accepts connections (and
+    # answers /healthz) while pandas is imported and the indexes are built
+    datasets.reload()
+    datasets.start_watching()
+    logger.info("App started; loading the dataset in the background")
+    yield
+    datasets.stop_watching()
+    await database.dispose_engines()
+    stop_logger()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="Game Data Eval tool", lifespan=lifespan)
+
+    # Mount static files - ensure the directory exists
+    if not STATIC_DIR.exists():
+        STATIC_DIR.mkdir(parents=True)
+    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+
+    app.include_router(router)
+    return app
+
+
+app = create_app()
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,134 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(os.getenv('LOGGER_NAME'))
+
+# Set by the process manager when several workers serve the app; each worker
+# then writes its samples there and /metrics reports them all together
+PROMETHEUS_MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+# Request latencies span sub-millisecond index lookups to slow database pages
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUILD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# HTTP
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Time to handle a request, by route template',
+                            ['method', 'route', 'status'], buckets=LATENCY_BUCKETS)
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'Requests being handled, by route template',
+                           ['method', 'route'], multiprocess_mode='livesum')
+
+# Dataset and indexes
+DATASET_LOAD_SECONDS = Histogram('dataset_load_seconds', 'Time to build a dataset version, by outcome',
+                                 ['outcome'], buckets=BUILD_BUCKETS)
+DATASET_VERSION = Gauge('dataset_version', 'Number of the published dataset version', multiprocess_mode='max')
+DATASET_LOADED_AT = Gauge('dataset_loaded_timestamp_seconds', 'When the published dataset version was built',
+                          multiprocess_mode='max')
+INDEX_BUILD_SECONDS = Histogram('index_build_seconds', 'Time to build an in-process index', ['index'],
+                                buckets=BUILD_BUCKETS)
+
+# Database
+DB_CONNECTIONS_IN_USE = Gauge('db_connections_in_use', 'Pooled connections checked out', ['pool'],
+                              multiprocess_mode='livesum')
+DB_CONNECTION_HELD = Histogram('db_connection_held_seconds', 'Time a pooled connection stays checked out',
+                               ['pool'], buckets=LATENCY_BUCKETS)
+DB_SESSION_SECONDS = Histogram('db_session_seconds', 'Lifetime of a request-scoped database session',
+                               ['kind'], buckets=LATENCY_BUCKETS)
+
+# BGG enrichment
+BGG_REQUESTS = Counter('bgg_requests_total', 'Requests sent to the BGG API, by response status', ['status'])
+BGG_REQUEST_LATENCY = Histogram('bgg_request_duration_seconds', 'Time for one BGG API request',
+                                buckets=LATENCY_BUCKETS)
+BGG_GAMES = Counter('bgg_enriched_games_total', 'Games processed by enrichment, by result', ['result'])
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that records its latency and in-flight count.
+
+    Labels use the route's path template (/game/{game_id}), never the raw
+    URL, so the number of series stays fixed. The cost per request is a
+    couple of clock reads and two label lookups.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        method = next(iter(self.methods)) if len(self.methods) == 1 else ','.join(sorted(self.methods))
+        in_flight = REQUESTS_IN_FLIGHT.labels(method, self.path)
+        path = self.path
+
+        async def timed_handler(request: Request) -> Response:
+            status = 500
+            in_flight.inc()
+            start = time.perf_counter()
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                # Turned into a 422 by FastAPI's handler, outside the route
+                status = 422
+                raise
+            finally:
+                REQUEST_LATENCY.labels(method, path, str(status)).observe(time.perf_counter() - start)
+                in_flight.dec()
+
+        return timed_handler
+
+
+@contextmanager
+def timed(histogram: Histogram, *labels: str):
+    """Observe how long the block takes into ``histogram`` (with ``labels``)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histogram.labels(*labels) if labels else histogram).observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine, pool: str):
+    """
+    Track checked-out connections and how long each is held.
+
+    Args:
+        engine: A sync Engine (for an AsyncEngine, pass its sync_engine)
+        pool (str): Label for this engine's pool, e.g. 'sync' or 'async'
+    """
+    in_use = DB_CONNECTIONS_IN_USE.labels(pool)
+    held = DB_CONNECTION_HELD.labels(pool)
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.perf_counter()
+        in_use.inc()
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop('checked_out_at', None)
+        if checked_out_at is not None:
+            in_use.dec()
+            held.observe(time.perf_counter() - checked_out_at)
+
+
+def metrics_response() -> Response:
+    """Every metric in the Prometheus text format, across workers when running multiprocess."""
+    registry = REGISTRY
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,7 +1,20 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index, text
 from sqlalchemy.sql import func
 from .database import Base
 
+# Weighted full-text document for PostgreSQL search; queries must use the
+# same expression so the GIN index below applies. 'simple' skips stemming,
+# which keeps prefix queries predictable and matches app/search.py.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(mechanics, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+# The listing's sort keys (dataset.SORT_KEYS, not imported: models stays
+# free of the dataset's pandas imports)
+LISTING_SORT_KEYS = ('rating_average', 'name', 'users_rated', 'year_published', 'bgg_rank')
+
 class GameNote(Base):
     __tablename__ = "game_notes"
 
@@ -15,7 +28,7 @@ class BoardGame(Base):
     __tablename__ = "board_games"
 
     id = Column(Integer, primary_key=True)
-    bgg_id = Column(Integer, index=True)
+    bgg_id = Column(Integer, unique=True, index=True)
     name = Column(String(255), index=True)
     year_published = Column(Integer)
     min_players = Column(Integer)
@@ -31,3 +44,13 @@ class BoardGame(Base):
     domains = Column(Text)
     description = Column(Text) 
     note = Column(Text)
+
+    # Every listing sort key, with bgg_id as the
+    # tie-breaker keyset pagination uses. Descending pages still break ties
+    # by ascending id, which a backward scan of (key, bgg_id) can't give, so
+    # each key gets an index per direction
+    __table_args__ = (
+        *(Index(f'ix_board_games_{key}_bgg_id', key, 'bgg_id') for key in LISTING_SORT_KEYS),
+        *(Index(f'ix_board_games_{key}_desc_bgg_id', text(f'{key} DESC'), 'bgg_id') for key in LISTING_SORT_KEYS),
+        Index('ix_board_games_search', text(f'({SEARCH_VECTOR_SQL})'), postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
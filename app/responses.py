@@ -0,0 +1,142 @@
+import gzip
+import json
+import logging
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+load_dotenv()
+logger = logging.getLogger(os.getenv('LOGGER_NAME'))
+
+# Bodies smaller than this go out uncompressed; headers would eat the gain
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '512'))
+
+# Compressed copies of immutable payloads kept per index / page
+COMPRESSED_CACHE_SIZE = int(os.getenv('COMPRESSED_CACHE_SIZE', '8192'))
+
+# Levels for payloads compressed once and reused, and for per-response bodies
+STORED_LEVELS = {'br': 9, 'gzip': 9}
+DYNAMIC_LEVELS = {'br': 4, 'gzip': 6}
+
+
+def _json_default(value):
+    """Fallback serializer for numpy scalars and arrays (without importing numpy)."""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON, with orjson when it is installed.
+
+    numpy scalars and arrays are accepted either way; NaN becomes null with
+    orjson, so payloads should have NaN mapped to None before they get here.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick 'br' or 'gzip' from an Accept-Encoding header, or None for identity.
+
+    Brotli is preferred when the client takes it and brotli is installed;
+    codings with q=0 are refused.
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    wildcard = accepted.get('*', 0.0)
+    for coding in ('br', 'gzip'):
+        if coding == 'br' and brotli is None:
+            continue
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress a body with 'br' or 'gzip'."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=DYNAMIC_LEVELS['br'] if level is None else level)
+    # mtime=0 keeps the output the same for the same input
+    return gzip.compress(body, compresslevel=DYNAMIC_LEVELS['gzip'] if level is None else level, mtime=0)
+
+
+class CompressedPayloads:
+    """
+    Compressed copies of payloads that never change, made once and reused.
+
+    Payloads are compressed at the stored (slower, smaller) levels on first
+    request and kept in an LRU of ``max_entries`` per cache; keys are
+    whatever identifies the payload within its owner, e.g. a game id.
+    """
+
+    def __init__(self, max_entries: int = COMPRESSED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Any, bytes]' = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, body: bytes, encoding: str) -> bytes:
+        with self._lock:
+            cached = self._entries.get((key, encoding))
+            if cached is not None:
+                self._entries.move_to_end((key, encoding))
+                return cached
+        compressed = compress(body, encoding, STORED_LEVELS[encoding])
+        with self._lock:
+            self._entries[(key, encoding)] = compressed
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def encoded_response(request: Request, body: bytes, media_type: str = 'application/json',
+                     headers: Optional[Dict[str, str]] = None, cache: Optional[CompressedPayloads] = None,
+                     key: Hashable = None, status_code: int = 200) -> Response:
+    """
+    A response with the body compressed as the client prefers.
+
+    With ``cache`` (and ``key``), the compressed body is reused across
+    requests; otherwise it is compressed for this response only.
+    """
+    headers = {**(headers or {}), 'Vary': 'Accept-Encoding'}
+    encoding = negotiate_encoding(request.headers.get('accept-encoding'))
+    if encoding is not None and len(body) >= COMPRESS_MIN_BYTES:
+        body = cache.get(key, body, encoding) if cache is not None else compress(body, encoding)
+        headers['Content-Encoding'] = encoding
+    return Response(content=body, media_type=media_type, headers=headers, status_code=status_code)
+
+
+def json_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """Serialize with dumps() and compress; skips FastAPI's jsonable_encoder pass."""
+    return encoded_response(request, dumps(content), status_code=status_code)
@@ -1,98 +1,295 @@
+import hashlib
+import hmac
 import logging
 import os
-from fastapi import APIRouter, Request, HTTPException, Depends
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Request, HTTPException, Depends, Response, Query, Header
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from . import models, schemas
-from .database import get_db
-import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from . import database, models, schemas
+from .cursors import InvalidCursor
+from .database import get_async_db
+from .dataset_manager import DatasetManager, DatasetVersion
+from .metrics import TimedRoute, metrics_response
+from .responses import CompressedPayloads, encoded_response, json_response, negotiate_encoding
 from dotenv import load_dotenv
 
 load_dotenv()
 logger=logging.getLogger(os.getenv('LOGGER_NAME'))
 
-# Create router
-router = APIRouter()
+# Create router; every route records its latency (see metrics.TimedRoute)
+router = APIRouter(route_class=TimedRoute)
 
 # Templates configuration
 templates = Jinja2Templates(directory="app/templates")
 
-# Load and process the BGG dataset - from the silver data
-# which is enriched with descriptions
-try:
-    logger.info("Loading BGG dataset...")
-    df = pd.read_csv('data/combined_2020.csv', sep=',')
-    logger.info(f"The columns in the df are: {df.columns}")
-    
-except Exception as e:
-    logger.error(f"Failed to load or process BGG dataset: {str(e)}")
-    raise
+# Path of the BGG dataset - the silver data which is enriched with descriptions
+DATASET_PATH = os.getenv('DATASET_PATH', 'data/combined_2020.csv')
+
+# Where game data is served from: 'dataset' (the file above, in memory) or
+# 'database' (the board_games table, see app/utils/load_games.py)
+GAME_SOURCE = os.getenv('GAME_SOURCE', 'dataset')
+
+# Shared secret for POST /admin/reload; the endpoint is off when unset
+RELOAD_TOKEN = os.getenv('RELOAD_TOKEN')
+
+
+class RenderedPage:
+    """A fully rendered HTML page, its ETag and its compressed copies."""
+
+    def __init__(self, body: bytes, stats: dict):
+        self.body = body
+        self.stats = stats
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.compressed = CompressedPayloads(max_entries=2)
+
+    def encoded(self, encoding: Optional[str]) -> Tuple[bytes, str]:
+        """The body in an encoding ('br', 'gzip' or None) and that representation's ETag."""
+        if encoding is None:
+            return self.body, self.etag
+        return self.compressed.get('body', self.body, encoding), f'{self.etag[:-1]}-{encoding}"'
+
+
+def render_home_page(home_stats: dict) -> RenderedPage:
+    """Render index.html for a set of home stats; done when they change, not per request."""
+    html = templates.get_template("index.html").render(**home_stats)
+    return RenderedPage(html.encode('utf-8'), home_stats)
+
+
+def build_dataset(path: Optional[str] = DATASET_PATH, source: str = GAME_SOURCE):
+    """
+    Load the game source and everything derived from it.
+
+    The in-memory dataset's home page is rendered once here; a database
+    source's home page is re-rendered whenever its stats are refreshed.
+
+    Returns:
+        tuple: The dataset and its rendered home page
+    """
+    try:
+        # Imported here, not at the top: pandas, numpy and pyarrow are only
+        # loaded by the first build, after the server is already up
+        if source == 'database':
+            from .games_db import DatabaseGames
+            logger.info("Serving games from the board_games table")
+            new_dataset = DatabaseGames(database.init_engines())
+        else:
+            from .dataset import GameDataset
+            new_dataset = GameDataset.from_path(path)
+        return new_dataset, render_home_page(new_dataset.home_stats)
+    except Exception as e:
+        logger.error("Failed to load or process BGG dataset: %s", e)
+        raise
+
+
+def current_home_page(version: DatasetVersion) -> RenderedPage:
+    """A version's rendered home page, re-rendered if its stats have changed."""
+    page = version.home_page
+    stats = version.dataset.home_stats
+    if page.stats is not stats:
+        page = version.home_page = render_home_page(stats)
+    return page
+
+
+async def _read(source, func, *args, **kwargs):
+    """Call a game source method, off the event loop if it does blocking I/O."""
+    if getattr(source, 'blocking', False):
+        return await run_in_threadpool(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return etag in [tag[2:] if tag.startswith('W/') else tag for tag in candidates]
+
+
+# The published dataset; loaded when the app starts (see app.main) and
+# swapped for a new version by reloads (see dataset_manager)
+datasets = DatasetManager(lambda path: build_dataset(path, GAME_SOURCE),
+                          path=DATASET_PATH if GAME_SOURCE != 'database' else None)
+
+
+def current_version() -> DatasetVersion:
+    """The published version, or a 503 while the first one is still loading."""
+    if not datasets.ready:
+        raise HTTPException(status_code=503, detail="Dataset is loading", headers={"Retry-After": "1"})
+    return datasets.current
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and its event loop is answering."""
+    return {"status": "ok"}
+
+@router.get("/readyz")
+async def readyz(request: Request):
+    """Readiness: 200 once a dataset version is published, 503 until then."""
+    if not datasets.ready:
+        body = {"status": "loading" if datasets.last_error is None else "failed", "error": datasets.last_error}
+        return json_response(request, body, status_code=503)
+    return {"status": "ready", "version": datasets.current.number}
 
 @router.get("/")
 async def home(request: Request):
     logger.info("Processing home page request")
+    # One version and page per request so a concurrent reload can't mix body and ETag
+    version = current_version()
+    page = await _read(version.dataset, current_home_page, version)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    body, etag = page.encoded(encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="text/html", headers=headers)
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request latencies, dataset builds, DB pool use and BGG enrichment, for Prometheus."""
+    return metrics_response()
+
+@router.post("/admin/reload", status_code=202)
+async def reload_dataset(x_reload_token: Optional[str] = Header(None)):
+    """
+    Rebuild the dataset in the background and swap it in when ready.
+
+    Each worker process has its own copy, so this reloads only the worker
+    that answers; DATASET_WATCH_INTERVAL makes every worker pick up a new
+    file by itself.
+    """
+    if not RELOAD_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_reload_token or not hmac.compare_digest(x_reload_token, RELOAD_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid reload token")
+    started = datasets.reload()
+    return {"version": datasets.current.number if datasets.ready else None, "started": started}
+
+@router.get("/games")
+async def list_games(
+    request: Request,
+    sort: str = "rating_average",
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Return one page of games, sorted by ``sort``; pass ``next_cursor`` back for the next page."""
+    dataset = current_version().dataset
+    listing = dataset.listing
+    if sort not in listing.sort_keys:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{sort}'. Choose from: {', '.join(listing.sort_keys)}")
     try:
-        # Get some basic stats to display
-        total_games = len(df)
-        avg_rating = df['rating_average'].mean()
-        avg_complexity = df['complexity_average'].mean()
-        # Get all games sorted by name
-        all_games = df.sort_values('rating_average')[['name', 'id']].to_dict('records')
-        
-        return templates.TemplateResponse(
-            "index.html",
-            {
-                "request": request,
-                "total_games": total_games,
-                "avg_rating": f"{avg_rating:.2f}",
-                "avg_complexity": f"{avg_complexity:.2f}",
-                "recent_games": df.nlargest(5, 'users_rated')[['name', 'year_published', 'rating_average']].to_dict('records'),
-                "all_games": all_games
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error processing home page request: {str(e)}")
-        raise
+        page = await _read(dataset, listing.page, sort, descending=(order == "desc"), cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        logger.error("Error listing games: %s", e)
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(request, page)
 
-@router.get("/game/{game_id}")
-async def get_game_details(game_id: int):
+@router.get("/games/filter")
+async def filter_games(
+    request: Request,
+    mechanics: List[str] = Query([]),
+    domains: List[str] = Query([]),
+    players: Optional[int] = Query(None, ge=1),
+    min_play_time: Optional[int] = Query(None, ge=0),
+    max_play_time: Optional[int] = Query(None, ge=0),
+    min_complexity: Optional[float] = Query(None, ge=0),
+    max_complexity: Optional[float] = Query(None, ge=0),
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    sort: str = "rating_average",
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    Return one page of the games matching every filter, with facet counts.
+
+    Repeat ``mechanics`` / ``domains`` to require several values; ranges are
+    inclusive. Pages the same way as /games.
+    """
+    dataset = current_version().dataset
+    listing = dataset.listing
+    if sort not in listing.sort_keys:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{sort}'. Choose from: {', '.join(listing.sort_keys)}")
+    from .facets import Filters  # numpy-backed; loaded with the dataset anyway
+    filters = Filters(
+        mechanics=tuple(mechanics),
+        domains=tuple(domains),
+        players=players,
+        play_time=(min_play_time, max_play_time),
+        complexity_average=(min_complexity, max_complexity),
+        year_published=(min_year, max_year),
+    )
     try:
-        # Get all game details including description
-        game = df[df['id'] == game_id].iloc[0].to_dict()
-        # Ensure description is included (will be None if not found)
-        if 'description' not in game:
-            game['description'] = None
-        return game
-    except Exception as e:
-        logger.error(f"Error fetching game details: {str(e)}")
+        page = await _read(dataset, dataset.filter, filters, sort=sort, descending=(order == "desc"), cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        logger.error("Error filtering games: %s", e)
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(request, page)
+
+@router.get("/search")
+async def search_games(request: Request, q: str = Query(..., min_length=1, max_length=200), limit: int = Query(20, ge=1, le=100)):
+    """Ranked prefix search over game names, mechanics and descriptions."""
+    return json_response(request, await run_in_threadpool(current_version().dataset.search, q, limit))
+
+@router.get("/game/{game_id}")
+async def get_game_details(request: Request, game_id: int):
+    # In memory this is a dict lookup of a pre-serialized payload, whose
+    # compressed copies are kept too; from the database it is an indexed
+    # query on bgg_id, compressed per response
+    dataset = current_version().dataset
+    payload = await _read(dataset, dataset.index.get, game_id)
+    if payload is None:
+        logger.error("Error fetching game details: no game with id %s", game_id)
+        raise HTTPException(status_code=404, detail="Game not found")
+    return encoded_response(request, payload, cache=getattr(dataset.index, 'compressed', None), key=game_id)
+
+@router.get("/game/{game_id}/similar")
+async def get_similar_games(request: Request, game_id: int, limit: int = Query(10, ge=1, le=50)):
+    """The games most like this one by mechanics, domains, complexity, player count and play time."""
+    dataset = current_version().dataset
+    similar = await _read(dataset, dataset.similar, game_id, limit)
+    if similar is None:
+        logger.error("Error fetching similar games: no game with id %s", game_id)
         raise HTTPException(status_code=404, detail="Game not found")
+    return json_response(request, similar)
 
 @router.get("/game/{game_id}/notes")
-async def get_game_notes(game_id: int, db: Session = Depends(get_db)):
+async def get_game_notes(game_id: int, db: AsyncSession = Depends(get_async_db)):
     try:
-        note = db.query(models.GameNote).filter(models.GameNote.game_id == game_id).first()
+        result = await db.execute(select(models.GameNote).where(models.GameNote.game_id == game_id).limit(1))
+        note = result.scalars().first()
         if note is None:
             return {"note_text": ""}
-        return note
+        return schemas.GameNote.model_validate(note)
     except Exception as e:
-        logger.error(f"Error fetching game notes: {str(e)}")
+        logger.error("Error fetching game notes: %s", e)
         raise HTTPException(status_code=500, detail="Error fetching game notes")
 
 @router.post("/game/{game_id}/notes")
-async def save_game_notes(game_id: int, note: schemas.GameNoteCreate, db: Session = Depends(get_db)):
+async def save_game_notes(game_id: int, note: schemas.GameNoteCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        existing_note = db.query(models.GameNote).filter(models.GameNote.game_id == game_id).first()
+        result = await db.execute(select(models.GameNote).where(models.GameNote.game_id == game_id).limit(1))
+        existing_note = result.scalars().first()
         if existing_note:
             existing_note.note_text = note.note_text
-            db.commit()
-            db.refresh(existing_note)
-            return existing_note
+            await db.commit()
+            await db.refresh(existing_note)
+            return schemas.GameNote.model_validate(existing_note)
         
         new_note = models.GameNote(game_id=game_id, note_text=note.note_text)
         db.add(new_note)
-        db.commit()
-        db.refresh(new_note)
-        return new_note
+        await db.commit()
+        await db.refresh(new_note)
+        return schemas.GameNote.model_validate(new_note)
     except Exception as e:
-        logger.error(f"Error saving game notes: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error saving game notes")
\ No newline at end of file
+        logger.error("Error saving game notes: %s", e)
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Error saving game notes")
@@ -0,0 +1,149 @@
+import logging
+import os
+import re
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(os.getenv('LOGGER_NAME'))
+
+# Fields that are searched, and how much a match in each counts
+SEARCH_FIELDS = (('name', 3.0), ('mechanics', 2.0), ('description', 1.0))
+
+TOKEN_PATTERN = r'[^\W_]+'
+_token_re = re.compile(TOKEN_PATTERN)
+
+# Most indexed terms a single query prefix expands to (the most common win)
+MAX_PREFIX_TERMS = 64
+
+# Added when a game's name starts with the whole query
+NAME_PREFIX_BONUS = 5.0
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens, the same way documents are indexed."""
+    return _token_re.findall(text.lower())
+
+
+class SearchResult(NamedTuple):
+    rows: np.ndarray     # Row positions of the best matches, best first
+    scores: np.ndarray   # Their scores
+    total: int           # How many games matched every query token
+
+
+class SearchIndex:
+    """
+    In-process inverted index over game names, mechanics and descriptions.
+
+    Postings are stored CSR-style: a sorted term array, and for each term a
+    slice of document positions and weights in two flat numpy arrays. A
+    query token matches every term it is a prefix of; a game has to match
+    all tokens, and is scored by field-weighted, idf-scaled term frequency.
+
+    Results are row positions in ``df`` after dropping duplicate ids, the
+    same positions dataset.GameListing uses.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.drop_duplicates(subset='id').reset_index(drop=True)
+        self.ids = df['id'].to_numpy(dtype=np.int64)
+        if 'name' in df.columns:
+            # Names sorted once, so "name starts with the query" is a range lookup
+            names = df['name'].astype(object).fillna('').astype(str).str.lower().to_numpy(dtype=object)
+            self._name_order = np.argsort(names, kind='stable')
+            self._sorted_names = names[self._name_order]
+        else:
+            self._name_order = np.array([], dtype=np.int64)
+            self._sorted_names = np.array([], dtype=object)
+        self._popularity = (df['users_rated'].fillna(0).to_numpy(dtype=np.float64)
+                            if 'users_rated' in df.columns else np.zeros(len(df)))
+        self.size = len(df)
+
+        postings = []
+        for field, weight in SEARCH_FIELDS:
+            if field not in df.columns:
+                continue
+            tokens = df[field].astype(object).fillna('').astype(str).str.lower() \
+                .str.findall(TOKEN_PATTERN).explode().dropna()
+            counts = pd.DataFrame({'term': tokens.to_numpy(), 'doc': tokens.index.to_numpy()}) \
+                .groupby(['term', 'doc'], sort=False).size()
+            postings.append(weight * (1 + np.log(counts.astype(np.float32))))
+        if postings:
+            weights = pd.concat(postings).groupby(level=['term', 'doc']).sum().sort_index()
+            terms = weights.index.get_level_values('term')
+            self.terms = np.asarray(terms.unique(), dtype=object)
+            self._docs = weights.index.get_level_values('doc').to_numpy(dtype=np.int32)
+            self._weights = weights.to_numpy(dtype=np.float32)
+            sizes = terms.value_counts(sort=False).reindex(self.terms).to_numpy()
+        else:
+            self.terms = np.array([], dtype=object)
+            self._docs = np.array([], dtype=np.int32)
+            self._weights = np.array([], dtype=np.float32)
+            sizes = np.array([], dtype=np.int64)
+        self._offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self._idf = np.log(1 + self.size / np.maximum(sizes, 1)).astype(np.float32)
+        logger.info("Built search index with %d terms over %d games", len(self.terms), self.size)
+
+    @staticmethod
+    def _prefix_range(values: np.ndarray, prefix: str) -> slice:
+        """The slice of a sorted string array whose values start with ``prefix``."""
+        lo = int(np.searchsorted(values, prefix, side='left'))
+        # Every value with the prefix sorts below prefix + the highest code point
+        hi = int(np.searchsorted(values, prefix + '\U0010ffff', side='left'))
+        return slice(lo, hi)
+
+    def _expand(self, token: str) -> np.ndarray:
+        """Term numbers that start with ``token``, capped at MAX_PREFIX_TERMS."""
+        span = self._prefix_range(self.terms, token)
+        found = np.arange(span.start, span.stop)
+        if len(found) > MAX_PREFIX_TERMS:
+            frequencies = self._offsets[found + 1] - self._offsets[found]
+            found = found[np.argpartition(-frequencies, MAX_PREFIX_TERMS)[:MAX_PREFIX_TERMS]]
+        return found
+
+    def search(self, query: str, limit: int = 20) -> SearchResult:
+        """Return the best ``limit`` matches for a query."""
+        none = SearchResult(np.array([], dtype=np.int64), np.array([], dtype=np.float32), 0)
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.size:
+            return none
+        scores = np.zeros(self.size, dtype=np.float32)
+        matched: Optional[np.ndarray] = None
+        for token in tokens:
+            token_scores = np.zeros(self.size, dtype=np.float32)
+            for term in self._expand(token):
+                start, end = self._offsets[term], self._offsets[term + 1]
+                docs = self._docs[start:end]
+                term_scores = self._weights[start:end] * self._idf[term]
+                # A game matching several expansions counts its best one
+                token_scores[docs] = np.maximum(token_scores[docs], term_scores)
+            hits = token_scores > 0
+            matched = hits if matched is None else matched & hits
+            if not matched.any():
+                return none
+            scores += token_scores
+        named = self._name_order[self._prefix_range(self._sorted_names, query.strip().lower())]
+        scores[named] += NAME_PREFIX_BONUS
+        candidates = np.flatnonzero(matched)
+        total = len(candidates)
+        if total > limit:
+            # Only games scoring at least the limit-th best can make the page
+            cutoff = np.partition(scores[candidates], total - limit)[total - limit]
+            candidates = candidates[scores[candidates] >= cutoff]
+        candidate_scores = scores[candidates]
+        # Best score first; more popular games break ties
+        order = np.lexsort((-self._popularity[candidates], -candidate_scores))[:limit]
+        return SearchResult(candidates[order], candidate_scores[order], int(total))
+
+
+def search_response(items: List[dict], result: SearchResult) -> dict:
+    """The /search body: result items with their scores, and the match count."""
+    for item, score in zip(items, result.scores.tolist()):
+        item['score'] = round(score, 3)
+    return {
+        "items": items,
+        "total": result.total,
+    }
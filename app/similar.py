@@ -0,0 +1,159 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from .utils.vocabulary import MultiHot
+
+load_dotenv()
+logger = logging.getLogger(os.getenv('LOGGER_NAME'))
+
+# Multi-valued columns in the feature vector, and the weight of each block
+SIMILAR_TERM_FEATURES = (('mechanics', 1.0), ('domains', 0.5))
+
+# Numeric columns (z-scored; play time on a log scale) and their weights
+SIMILAR_NUMERIC_FEATURES = (
+    ('complexity_average', 1.0),
+    ('min_players', 0.5),
+    ('max_players', 0.5),
+    ('play_time', 0.75),
+    ('min_age', 0.25),
+    ('year_published', 0.25),
+)
+
+# Neighbours kept per game in the cached table, and how many games' lists are kept
+SIMILAR_TABLE_K = int(os.getenv('SIMILAR_TABLE_K', '50'))
+SIMILAR_CACHE_SIZE = int(os.getenv('SIMILAR_CACHE_SIZE', '20000'))
+
+
+class Neighbours(NamedTuple):
+    rows: np.ndarray     # Row positions of the most similar games, best first
+    scores: np.ndarray   # Their cosine similarities
+
+
+class SimilarityIndex:
+    """
+    Content-based nearest neighbours by cosine similarity.
+
+    A game's feature vector is its mechanics and domains (multi-hot, each
+    term weighted by idf so rare mechanics say more) followed by z-scored
+    numeric columns. The sparse part is kept as inverted lists, so one
+    game's dot products with every other game are a bincount over the
+    postings of its few terms plus a (games x 6) matrix-vector product;
+    nothing dense of size games x vocabulary is ever built.
+
+    Each game's top SIMILAR_TABLE_K neighbours are computed on first request
+    and kept in an LRU-bounded table.
+
+    Rows are positions in ``df`` after dropping duplicate ids, the same
+    positions dataset.GameListing uses.
+
+    Args:
+        df (DataFrame): Games, with whichever feature columns they have
+        multi_hot (dict): Already built MultiHot matrices by column, e.g.
+            FacetIndex.multi_hot; the rest are built here
+    """
+
+    def __init__(self, df: pd.DataFrame, multi_hot: Optional[Dict[str, MultiHot]] = None,
+                 table_k: int = SIMILAR_TABLE_K, cache_size: int = SIMILAR_CACHE_SIZE):
+        df = df.drop_duplicates(subset='id').reset_index(drop=True)
+        self.size = len(df)
+        self.table_k = table_k
+        self._rows: Dict[int, int] = {game_id: row for row, game_id in enumerate(df['id'].tolist())}
+        self._popularity = (pd.to_numeric(df['users_rated'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+                            if 'users_rated' in df.columns else np.zeros(self.size))
+        multi_hot = multi_hot or {}
+        squared_norms = np.zeros(self.size, dtype=np.float64)
+
+        # Inverted lists of every term block, with one weight per posting
+        self._blocks = []
+        for column, block_weight in SIMILAR_TERM_FEATURES:
+            if column not in df.columns:
+                continue
+            terms = multi_hot.get(column)
+            if terms is None:
+                terms = MultiHot.from_joined(df[column])
+            frequencies = np.bincount(terms.indices, minlength=len(terms.vocabulary))
+            idf = np.log(1 + self.size / np.maximum(frequencies, 1))
+            # Squared weight of a shared term in the dot product
+            weights = block_weight * idf ** 2
+            order = np.argsort(terms.indices, kind='stable')
+            postings = terms.rows()[order]
+            offsets = np.concatenate([[0], np.cumsum(frequencies)]).astype(np.int64)
+            squared_norms += np.bincount(terms.rows(), weights=weights[terms.indices], minlength=self.size)
+            self._blocks.append((terms, postings, offsets, weights))
+
+        columns = []
+        for column, weight in SIMILAR_NUMERIC_FEATURES:
+            if column not in df.columns:
+                continue
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            if column == 'play_time':
+                values = np.log1p(np.clip(values, 0, None))
+            spread = np.nanstd(values) if np.isfinite(values).any() else 0
+            # A missing value sits at the mean, where it adds nothing
+            z = np.nan_to_num((values - np.nanmean(values)) / spread) if spread else np.zeros(self.size)
+            columns.append(np.sqrt(weight) * z)
+        self._numeric = np.column_stack(columns).astype(np.float32) if columns else np.zeros((self.size, 0), np.float32)
+        squared_norms += (self._numeric.astype(np.float64) ** 2).sum(axis=1)
+        self._norms = np.sqrt(squared_norms)
+
+        self._table = lru_cache(maxsize=cache_size)(self._neighbours)
+        logger.info("Built similarity index over %d games with %d terms", self.size,
+                    sum(len(block[0].vocabulary) for block in self._blocks))
+
+    def scores(self, row: int) -> np.ndarray:
+        """Cosine similarity of one game with every game (itself included)."""
+        dots = self._numeric @ self._numeric[row]
+        for terms, postings, offsets, weights in self._blocks:
+            own = terms.indices[terms.indptr[row]:terms.indptr[row + 1]]
+            if not len(own):
+                continue
+            starts, ends = offsets[own], offsets[own + 1]
+            lengths = ends - starts
+            # Postings of the game's terms, gathered in one step
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            dots = dots + np.bincount(postings[positions], weights=np.repeat(weights[own], lengths),
+                                      minlength=self.size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            similarity = dots / (self._norms * self._norms[row])
+        # Games without any features are similar to nothing
+        return np.nan_to_num(similarity, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def _neighbours(self, row: int) -> Neighbours:
+        similarity = self.scores(row)
+        similarity[row] = -np.inf
+        candidates = np.arange(self.size)
+        if self.size > self.table_k:
+            candidates = np.argpartition(-similarity, self.table_k)[:self.table_k]
+        candidates = candidates[np.isfinite(similarity[candidates]) & (similarity[candidates] > 0)]
+        # Most similar first; more popular games break ties
+        order = np.lexsort((-self._popularity[candidates], -similarity[candidates]))
+        candidates = candidates[order]
+        return Neighbours(candidates, similarity[candidates].astype(np.float32))
+
+    def similar(self, game_id: int, limit: int = 10) -> Optional[Neighbours]:
+        """
+        The games most like ``game_id``, or None if it is unknown.
+
+        Up to SIMILAR_TABLE_K of them; the list is computed once per game
+        and then served from the table.
+        """
+        row = self._rows.get(game_id)
+        if row is None:
+            return None
+        neighbours = self._table(row)
+        return Neighbours(neighbours.rows[:limit], neighbours.scores[:limit])
+
+
+def similar_response(items, neighbours: Neighbours) -> Dict:
+    """The /game/{game_id}/similar body: the similar games with their similarity."""
+    for item, score in zip(items, neighbours.scores.tolist()):
+        item['similarity'] = round(score, 4)
+    return {
+        "items": items,
+    }
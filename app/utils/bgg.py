@@ -1,42 +1,66 @@
 # A utility function to request data from boardgame geek
 
+import asyncio
 import requests
-import xml.etree.ElementTree as ET
 import json
 import os
 import time
 import sys
 import csv
-from typing import Dict, Optional, Set
+from contextlib import nullcontext
+from typing import Dict, Iterator, List, Optional
 from xml.etree.ElementTree import ParseError
-from datetime import datetime
 
-# Global variable to store all game data in memory
-GAMES_DATA = []
+from ..metrics import BGG_GAMES, BGG_REQUESTS
+from .bgg_cache import BGG_CACHE_PATH, ResponseCache, cache_key, conditional_headers
+from .bgg_client import BGG_BATCH_SIZE, BGGClient, batched, log, normalize_id
+from .enrich_store import STATUS_NOT_FOUND, STATUS_TRANSIENT, EnrichmentJournal, GameStore, get_journal_file
+from .bgg_parser import iter_thing_items
 
-def log(message: str):
-    """Print a message with a timestamp."""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f'[{timestamp}] {message}')
+# All game data in memory, keyed by BGG id and saved as an append-only log
+GAMES_DATA = GameStore('data/games.jsonl')
+LEGACY_GAMES_FILE = 'data/games.json'
 
-def get_game_details(game_id: str) -> Optional[Dict]:
+# Opened on first use by get_default_cache()
+_default_cache: Optional[ResponseCache] = None
+
+def get_default_cache() -> ResponseCache:
+    """The response cache shared by get_game_details calls (at BGG_CACHE_PATH)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache(BGG_CACHE_PATH)
+    return _default_cache
+
+def get_game_details(game_id: str, cache: Optional[ResponseCache] = None) -> Optional[Dict]:
     """
     Fetch board game details from BoardGameGeek XML API using game ID.
     
     Args:
         game_id (str): The BGG ID of the game to fetch
+        cache (ResponseCache): Where to look for and store results;
+            defaults to get_default_cache()
         
     Returns:
-        dict: Game details as a JSON object, or None if game not found
+        dict: Game details (BoardGame column names, see
+        bgg_parser.iter_thing_items), or None if game not found
     """
     url = 'https://boardgamegeek.com/xmlapi2/thing'
     params = {'id': game_id, 'stats': 1}
+    cache = cache if cache is not None else get_default_cache()
+    key = cache_key(normalize_id(game_id), params)
+    entry = cache.lookup(key)
+    if entry is not None and entry.fresh:
+        return {**entry.data, 'bgg_id': game_id} if entry.data else None
     
     try:
-        response = requests.get(url, params=params, timeout=5)
+        response = requests.get(url, params=params, headers=conditional_headers([entry]), timeout=5)
+        BGG_REQUESTS.labels(str(response.status_code)).inc()
         
         # Check if we got a successful response
-        if response.status_code == 404:
+        if response.status_code == 304:
+            cache.refresh([key])
+            return {**entry.data, 'bgg_id': game_id} if entry.data else None
+        elif response.status_code == 404:
             log(f'Game not found for ID: {game_id}')
             return None
         elif response.status_code == 429:
@@ -54,7 +78,8 @@ def get_game_details(game_id: str) -> Optional[Dict]:
             return None
             
         try:
-            tree = ET.fromstring(response.content)
+            # Stream the response rather than building the whole tree
+            game = next(iter_thing_items(response.content), None)
         except ParseError as e:
             log(f'Failed to parse XML for ID {game_id}: {str(e)}')
             return None
@@ -62,27 +87,16 @@ def get_game_details(game_id: str) -> Optional[Dict]:
             log(f'Unexpected XML processing error for ID {game_id}: {str(e)}')
             return None
         
-        # Find the first item element
-        item = tree.find('.//item')
-        if item is None:
+        if game is not None and game['description']:
+            game = {**game, 'bgg_id': game_id}
+        elif game is None:
             log(f'No item data found for game ID: {game_id}')
-            return None
-            
-        # Find the description
-        description = item.find('.//description')
-        if description is None:
-            log(f'No description element found for game ID: {game_id}')
-            return None
-            
-        description_text = description.text
-        if not description_text or not description_text.strip():
+        else:
             log(f'Empty description found for game ID: {game_id}')
-            return None
-            
-        return {
-            'bgg_id': game_id,
-            'description': description_text.strip()
-        }
+            game = None
+        cache.store([(key, game)], etag=response.headers.get('etag'),
+                    last_modified=response.headers.get('last-modified'))
+        return game
         
     except requests.exceptions.Timeout:
         log(f'Timeout while fetching data for ID {game_id}')
@@ -105,200 +119,163 @@ def add_game_to_memory(game_data, game_id):
         game_data (dict): The game data to store
         game_id (int): The game ID
     """
-    global GAMES_DATA
-    
-    # Check if game already exists in memory
-    for i, game in enumerate(GAMES_DATA):
-        if game.get('game_id') == game_id:
-            GAMES_DATA[i] = game_data  # Update existing entry
-            break
-    else:
-        GAMES_DATA.append(game_data)  # Add new entry
-    
+    GAMES_DATA.add(game_id, game_data)
     log(f'Game {game_id} added to memory')
 
 def save_all_games_to_json():
     """
-    Save all games from memory to a JSON file.
+    Append the games added or changed since the last save to the games log.
     """
-    if not os.path.exists('data'):
-        os.makedirs('data')
-        
-    filename = 'data/games.json'
-    
-    # Write all data to file
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(GAMES_DATA, f, indent=2, ensure_ascii=False)
-    
-    log(f'All game data saved to {filename}')
+    written = GAMES_DATA.flush()
+    log(f'Saved {written} new or updated games to {GAMES_DATA.path}')
 
 def load_existing_data():
     """
-    Load existing game data from JSON file into memory.
-    """
-    global GAMES_DATA
-    filename = 'data/games.json'
-    
-    if os.path.exists(filename):
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                GAMES_DATA = json.load(f)
-            log(f'Loaded {len(GAMES_DATA)} existing games from {filename}')
-        except json.JSONDecodeError:
-            log(f'Warning: Could not read existing data from {filename}. Starting fresh.')
-
-def get_checkpoint_file(input_file: str) -> str:
-    """Get the path to the checkpoint file for a given input file."""
-    base_dir = os.path.dirname(input_file)
-    base_name = os.path.basename(input_file)
-    return os.path.join(base_dir, f'.{base_name}.checkpoint')
+    Load existing game data into memory.
 
-def load_processed_ids(checkpoint_file: str) -> Set[str]:
-    """Load the set of already processed game IDs from checkpoint file."""
-    if os.path.exists(checkpoint_file):
-        try:
-            with open(checkpoint_file, 'r') as f:
-                return set(line.strip() for line in f)
-        except Exception as e:
-            log(f'Warning: Could not read checkpoint file: {e}')
-    return set()
-
-def save_processed_id(checkpoint_file: str, game_id: str):
-    """Save a processed game ID to the checkpoint file."""
+    Reads the games log, or the old whole-file JSON dump if there is no log
+    yet (it is converted to a log on the next save).
+    """
     try:
-        with open(checkpoint_file, 'a') as f:
-            f.write(f'{game_id}\n')
-    except Exception as e:
-        log(f'Warning: Could not update checkpoint file: {e}')
+        if os.path.exists(GAMES_DATA.path):
+            GAMES_DATA.load()
+        elif os.path.exists(LEGACY_GAMES_FILE):
+            with open(LEGACY_GAMES_FILE, 'r', encoding='utf-8') as f:
+                for game in json.load(f):
+                    game_id = game.get('bgg_id') or game.get('game_id')
+                    if game_id:
+                        GAMES_DATA.add(game_id, game)
+        else:
+            return
+        log(f'Loaded {len(GAMES_DATA)} existing games')
+    except (json.JSONDecodeError, OSError) as e:
+        log(f'Warning: Could not read existing game data: {e}. Starting fresh.')
 
-def enrich_games_file(input_file: str, output_file: str):
+def enrich_games_file(input_file: str, output_file: str, batch_size: int = BGG_BATCH_SIZE,
+                      cache_path: Optional[str] = BGG_CACHE_PATH, **client_options):
     """
     Read games from input CSV file, enrich with BGG descriptions, and write to output file.
-    Supports resuming from previous interruptions.
+    Supports resuming from previous interruptions: ids that were already
+    fetched or not found on BGG are skipped without any network calls.
     
     Args:
         input_file (str): Path to input CSV file (must have 'id' column)
         output_file (str): Path to output CSV file
+        batch_size (int): Games requested per BGG API call
+        cache_path (str): Response cache to read and fill; None disables it
+        **client_options: Passed to BGGClient (rate, concurrency, base_url, ...)
+    """
+    asyncio.run(enrich_games_file_async(input_file, output_file, batch_size, cache_path, **client_options))
+
+async def enrich_games_file_async(input_file: str, output_file: str, batch_size: int = BGG_BATCH_SIZE,
+                                  cache_path: Optional[str] = BGG_CACHE_PATH, **client_options):
+    """
+    Async implementation of enrich_games_file.
+
+    Games are fetched in batches of ``batch_size`` ids per request, with
+    batches running concurrently through a BGGClient that does the rate
+    limiting and retries. Each result is appended to an EnrichmentJournal
+    as it arrives, together with a per-id status (fetched, not found, or
+    transient failure); the output file is written once at the end by
+    compacting the journal against the input.
     """
     if not os.path.exists(input_file):
         log(f'Input file not found: {input_file}')
         return
         
-    # Setup checkpoint tracking
-    checkpoint_file = get_checkpoint_file(input_file)
-    processed_ids = load_processed_ids(checkpoint_file)
-    if processed_ids:
-        log(f'Resuming from checkpoint with {len(processed_ids)} previously processed games')
-    
-    enriched_games = []
     error_count = 0
     max_errors = 1000  # Maximum number of consecutive errors before aborting
-    
-    # Load existing enriched data if available
-    existing_enriched_data = {}
-    if os.path.exists(output_file):
-        try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if 'id' in row and 'description' in row:
-                        existing_enriched_data[row['id']] = row['description']
-        except Exception as e:
-            log(f'Warning: Could not read existing enriched data: {e}')
-    
-    try:
-        # First pass: read all data and collect existing results
-        with open(input_file, 'r', encoding='utf-8') as f:
+
+    with EnrichmentJournal(get_journal_file(output_file)) as journal, \
+            (ResponseCache(cache_path) if cache_path else nullcontext()) as cache:
+        # Carry over results from an output file written before journalling
+        if journal.is_new and os.path.exists(output_file):
             try:
-                reader = csv.DictReader(f)
-                if 'id' not in reader.fieldnames:
-                    log('Input file must have an "id" column')
+                log(f'Imported {journal.import_output_file(output_file)} games from {output_file}')
+            except Exception as e:
+                log(f'Warning: Could not read existing enriched data: {e}')
+        elif len(journal):
+            counts = ', '.join(f'{count} {status}' for status, count in sorted(journal.status_counts().items()))
+            log(f'Resuming with {len(journal)} previously enriched games ({counts})')
+
+        async with BGGClient(cache=cache, **client_options) as client:
+            async def enrich(batch):
+                return batch, await client.fetch_games(batch)
+
+            # Enough queued batches to keep the client busy, and no more,
+            # so memory stays flat however large the input is
+            max_in_flight = 2 * client.concurrency
+            in_flight = set()
+            completed = 0
+
+            def record(batch, details):
+                nonlocal error_count, completed
+                completed += len(batch)
+                if details is None:
+                    # The request failed: nothing is known about these ids yet
+                    journal.record_failures(batch, STATUS_TRANSIENT)
+                    BGG_GAMES.labels('failed').inc(len(batch))
+                    error_count += len(batch)
+                    log(f'Batch of {len(batch)} games failed; will retry on the next run')
                     return
-                
-                # Read all rows first
-                all_rows = list(reader)
-                total_games = len(all_rows)
-                log(f'Found {total_games} games in input file')
-                
-                # Process each row
-                for i, row in enumerate(all_rows, 1):
-                    game_id = row['id'].strip()
-                    if not game_id:  # Skip empty IDs
-                        log('Skipping row with empty ID')
-                        continue
-                    
-                    # Check if we already have enriched data for this game
-                    if game_id in existing_enriched_data:
-                        enriched_row = {**row, 'description': existing_enriched_data[game_id]}
-                        enriched_games.append(enriched_row)
-                        continue
-                    
-                    # Skip already processed games unless they're missing from enriched_games
-                    if game_id in processed_ids:
-                        log(f'Skipping already processed game ID: {game_id} ({i}/{total_games})')
-                        # Try to get BGG details again if we don't have the description
-                        bgg_data = get_game_details(game_id)
-                        if bgg_data:
-                            enriched_row = {**row, 'description': bgg_data['description']}
-                        else:
-                            enriched_row = row
-                        enriched_games.append(enriched_row)
-                        continue
-                        
-                    log(f'Processing game ID: {game_id} ({i}/{total_games})')
-                    
-                    # Get BGG details
-                    bgg_data = get_game_details(game_id)
-                    if bgg_data:
-                        # Merge original row with BGG data
-                        enriched_row = {**row, 'description': bgg_data['description']}
-                        enriched_games.append(enriched_row)
-                        error_count = 0  # Reset error count on success
-                        
-                        # Update checkpoint
-                        save_processed_id(checkpoint_file, game_id)
-                    else:
-                        # Keep original row if no BGG data found
-                        enriched_games.append(row)
-                        error_count += 1
-                        
+                found = [game_id for game_id in batch if details.get(game_id)]
+                journal.append((game_id, {'description': details[game_id]['description']}) for game_id in found)
+                journal.record_failures((game_id for game_id in batch if not details.get(game_id)),
+                                        STATUS_NOT_FOUND)
+                BGG_GAMES.labels('fetched').inc(len(found))
+                BGG_GAMES.labels('not_found').inc(len(batch) - len(found))
+                error_count = 0  # Reset error count on a successful request
+                log(f'Enriched batch of {len(batch)} games ({completed} fetched this run)')
+
+            try:
+                for batch in iter_pending_batches(input_file, journal, batch_size):
+                    if len(in_flight) >= max_in_flight:
+                        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            record(*task.result())
                         if error_count >= max_errors:
                             log(f'Aborting after {max_errors} consecutive errors')
                             break
-                    
-                    # Be nice to the BGG API
-                    time.sleep(2)
-                    
-                    # Periodically save progress to output file
-                    if i % 10 == 0:  # Save every 10 games
-                        save_output_file(output_file, enriched_games)
-                    
-            except csv.Error as e:
+                    in_flight.add(asyncio.create_task(enrich(batch)))
+                else:
+                    for next_result in asyncio.as_completed(in_flight):
+                        record(*await next_result)
+                    in_flight = set()
+            except (csv.Error, OSError, ValueError) as e:
                 log(f'Error reading CSV file: {str(e)}')
-                return
-    except Exception as e:
-        log(f'Error processing input file: {str(e)}')
-        return
-    finally:
-        # Always try to save progress before exiting
-        if enriched_games:
-            save_output_file(output_file, enriched_games)
+            finally:
+                for task in in_flight:
+                    task.cancel()
+                log(f'Sent {client.requests_sent} requests to BGG ({client.rate_limited} rate limited)')
+                if cache is not None:
+                    log(f'Response cache: {cache.hits} hits, {cache.misses} misses')
+                # Always write out progress before exiting
+                try:
+                    rows = journal.compact(input_file, output_file)
+                    log(f'Progress saved to: {output_file} ({rows} rows)')
+                except Exception as e:
+                    log(f'Error writing output file: {str(e)}')
 
-def save_output_file(output_file: str, enriched_games: list):
-    """Save the current progress to the output file."""
-    try:
-        fieldnames = list(enriched_games[0].keys())
-        with open(output_file, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(enriched_games)
-        log(f'Progress saved to: {output_file}')
-    except Exception as e:
-        log(f'Error writing output file: {str(e)}')
+def iter_pending_batches(input_file: str, journal: EnrichmentJournal, batch_size: int) -> Iterator[List[str]]:
+    """
+    Stream the input file and yield batches of ids that still need fetching.
+
+    Raises:
+        ValueError: If the input file has no 'id' column
+    """
+    with open(input_file, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        if 'id' not in reader.fieldnames:
+            raise ValueError('Input file must have an "id" column')
+        ids = (row['id'].strip() for row in reader)
+        for chunk in batched((game_id for game_id in ids if game_id), batch_size):
+            pending = journal.pending(list(dict.fromkeys(chunk)))
+            if pending:
+                yield pending
 
 if __name__ == '__main__':
     if len(sys.argv) != 3:
-        log('Usage: python bgg.py <input_file.csv> <output_file.csv>')
+        log('Usage: python -m app.utils.bgg <input_file.csv> <output_file.csv>')
         sys.exit(1)
         
     input_file = sys.argv[1]
@@ -0,0 +1,165 @@
+# On-disk cache of BGG lookups
+#
+# Results are stored per game id (and request params) in SQLite, so a game
+# fetched as part of one batch is a cache hit for any later batch or
+# single lookup. Entries younger than the TTL are served without a request.
+# Stale entries keep the validators (ETag / Last-Modified) of the response
+# they came from, and are revalidated with a conditional request when
+# possible. The least recently used entries are evicted past a size bound.
+
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BGG_CACHE_PATH = os.getenv('BGG_CACHE_PATH', 'data/.bgg_cache.sqlite')
+BGG_CACHE_TTL = float(os.getenv('BGG_CACHE_TTL', str(7 * 24 * 3600)))
+BGG_CACHE_MAX_ENTRIES = int(os.getenv('BGG_CACHE_MAX_ENTRIES', '100000'))
+
+
+def cache_key(game_id: str, params: Dict) -> str:
+    """Key for one game's result under the given request params (minus 'id')."""
+    extra = '&'.join(f'{name}={params[name]}' for name in sorted(params) if name != 'id')
+    return f'thing/{game_id}?{extra}'
+
+
+class CacheEntry(NamedTuple):
+    data: Optional[Dict]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    fresh: bool
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of per-game BGG results with TTL and LRU eviction.
+
+    A cached value of None records that BGG had no usable data for the id,
+    so "not found" answers are cached too.
+
+    Args:
+        path (str): SQLite file; created (with its directory) if missing
+        ttl (float): Seconds an entry is served without revalidation
+        max_entries (int): Entries kept before least recently used ones go
+    """
+
+    def __init__(self, path: str = BGG_CACHE_PATH, ttl: float = BGG_CACHE_TTL,
+                 max_entries: int = BGG_CACHE_MAX_ENTRIES, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' data TEXT NOT NULL,'
+            ' etag TEXT,'
+            ' last_modified TEXT,'
+            ' fetched_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> 'ResponseCache':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for a key (fresh or stale), or None if there is none."""
+        row = self._db.execute(
+            'SELECT data, etag, last_modified, fetched_at FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        now = self._clock()
+        with self._db:
+            self._db.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        data, etag, last_modified, fetched_at = row
+        fresh = now - fetched_at < self.ttl
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return CacheEntry(json.loads(data), etag, last_modified, fetched_at, fresh)
+
+    def store(self, entries: Iterable[Tuple[str, Optional[Dict]]], etag: Optional[str] = None,
+              last_modified: Optional[str] = None):
+        """Store results that came from one response, then evict past the size bound."""
+        now = self._clock()
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO responses (key, data, etag, last_modified, fetched_at, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                [(key, json.dumps(data, ensure_ascii=False), etag, last_modified, now, now)
+                 for key, data in entries]
+            )
+        self.evict()
+
+    def refresh(self, keys: List[str]):
+        """Mark entries fresh again after the server confirmed them (304)."""
+        now = self._clock()
+        with self._db:
+            self._db.executemany('UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?',
+                                 [(now, now, key) for key in keys])
+
+    def evict(self) -> int:
+        """Drop least recently used entries beyond max_entries."""
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        with self._db:
+            self._db.execute(
+                'DELETE FROM responses WHERE key IN'
+                ' (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)', (excess,)
+            )
+        return excess
+
+    def clear(self):
+        with self._db:
+            self._db.execute('DELETE FROM responses')
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+def conditional_headers(entries: Iterable[Optional[CacheEntry]]) -> Dict[str, str]:
+    """
+    Validators for revalidating a request, if every entry came from the same response.
+
+    Returns:
+        dict: If-None-Match / If-Modified-Since headers, or {} when the
+        entries have no validators in common
+    """
+    validators = {(entry.etag, entry.last_modified) if entry else None for entry in entries}
+    if len(validators) != 1:
+        return {}
+    validator = validators.pop()
+    if validator is None:
+        return {}
+    etag, last_modified = validator
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers
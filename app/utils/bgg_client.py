@@ -0,0 +1,273 @@
+# Async client for the BoardGameGeek XML API
+#
+# Requests share one pooled httpx.AsyncClient, are paced by a token bucket
+# and capped by a concurrency limit, and are retried with exponential
+# backoff and jitter when BGG answers 429, 202 (request queued) or 5xx.
+# With a ResponseCache, games fetched before are served from disk and only
+# stale ones are requested again (conditionally, when validators allow).
+
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from xml.etree.ElementTree import ParseError
+
+import httpx
+from dotenv import load_dotenv
+
+from ..metrics import BGG_REQUEST_LATENCY, BGG_REQUESTS
+from .bgg_cache import ResponseCache, cache_key, conditional_headers
+from .bgg_parser import iter_thing_items
+
+load_dotenv()
+
+BGG_API_URL = os.getenv('BGG_API_URL', 'https://boardgamegeek.com/xmlapi2')
+BGG_REQUESTS_PER_SECOND = float(os.getenv('BGG_REQUESTS_PER_SECOND', '1.0'))
+BGG_CONCURRENCY = int(os.getenv('BGG_CONCURRENCY', '4'))
+# Ids per /thing request; BGG rejects more than 20
+BGG_BATCH_SIZE = int(os.getenv('BGG_BATCH_SIZE', '20'))
+
+# Statuses worth retrying: rate limited, queued by BGG, or a server error
+RETRY_STATUSES = {202, 429, 500, 502, 503, 504}
+
+
+def log(message: str):
+    """Print a message with a timestamp."""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f'[{timestamp}] {message}')
+
+
+class TokenBucket:
+    """
+    Async token bucket: allows ``rate`` acquisitions per second on average,
+    with bursts of up to ``capacity``.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1, clock=time.monotonic):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        # The lock makes waiters queue up in order instead of racing
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def pause(self, seconds: float):
+        """Hold back every caller for ``seconds``, e.g. after a 429."""
+        self._refill()
+        self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable into lists of at most ``size`` items."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def normalize_id(game_id) -> str:
+    """Canonical string form of a BGG id, as BGG echoes it back."""
+    game_id = str(game_id).strip()
+    return str(int(game_id)) if game_id.isdigit() else game_id
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given retry attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class BGGClient:
+    """
+    Rate-limited, retrying client for the BGG ``thing`` endpoint.
+
+    Use as an async context manager so the pooled connections are closed:
+
+        async with BGGClient(rate=1) as client:
+            details = await client.get_game_details('174430')
+
+    Args:
+        base_url (str): XML API root, e.g. a local stub server in tests
+        rate (float): Requests per second allowed by the token bucket
+        burst (float): Token bucket capacity
+        concurrency (int): Maximum requests in flight at once
+        max_retries (int): Retries for 429 / 202 / 5xx / network errors
+        backoff_base (float): First backoff delay in seconds
+        backoff_cap (float): Largest backoff delay in seconds
+        timeout (float): Per-request timeout in seconds
+        transport: Optional httpx transport (e.g. httpx.ASGITransport)
+        cache (ResponseCache): Optional on-disk cache of per-game results
+    """
+
+    def __init__(self, base_url: str = BGG_API_URL, rate: float = BGG_REQUESTS_PER_SECOND,
+                 burst: float = 2, concurrency: int = BGG_CONCURRENCY, max_retries: int = 5, backoff_base: float = 2.0,
+                 backoff_cap: float = 60.0, timeout: float = 10.0, transport=None,
+                 cache: Optional[ResponseCache] = None):
+        self.base_url = base_url.rstrip('/')
+        self.limiter = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            transport=transport,
+            # Keep-alive pool sized to the concurrency limit
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        self.cache = cache
+        self.requests_sent = 0
+        self.rate_limited = 0
+
+    async def __aenter__(self) -> 'BGGClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def _retry_wait(self, attempt: int, response: Optional[httpx.Response] = None):
+        delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        await asyncio.sleep(delay)
+
+    async def fetch_thing(self, params: Dict, headers: Optional[Dict] = None) -> Optional[httpx.Response]:
+        """
+        GET /thing with rate limiting and retries.
+
+        Returns:
+            httpx.Response: The final response (200, 304 or a non-retryable
+            status), or None if every attempt failed
+        """
+        url = f'{self.base_url}/thing'
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                await self.limiter.acquire()
+                self.requests_sent += 1
+                start = time.perf_counter()
+                try:
+                    response = await self._client.get(url, params=params, headers=headers)
+                except httpx.TransportError as e:
+                    log(f'Request error for {params}: {str(e)} (attempt {attempt + 1})')
+                    response = None
+                BGG_REQUEST_LATENCY.observe(time.perf_counter() - start)
+                BGG_REQUESTS.labels(str(response.status_code) if response is not None else 'error').inc()
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                return response
+            if response is not None and response.status_code == 429:
+                self.rate_limited += 1
+                # Slow every request down, not just this one
+                self.limiter.pause(self.backoff_base)
+            if attempt < self.max_retries:
+                status = response.status_code if response is not None else 'error'
+                log(f'Retrying {params} after status {status} (attempt {attempt + 1})')
+                await self._retry_wait(attempt, response)
+        log(f'Giving up on {params} after {self.max_retries + 1} attempts')
+        return None
+
+    async def fetch_games(self, game_ids: Sequence[str]) -> Optional[Dict[str, Optional[Dict]]]:
+        """
+        Fetch several games with a single /thing request.
+
+        Args:
+            game_ids (list): BGG ids, at most BGG_BATCH_SIZE of them
+
+        Returns:
+            dict: Each requested id mapped to the game's fields (see
+            bgg_parser.iter_thing_items), or to None if BGG has no
+            description for it. None if the request itself failed, so
+            callers can tell "not found" apart from "try again later".
+        """
+        if not game_ids:
+            return {}
+        params = {'stats': 1}
+
+        def key(game_id):
+            return cache_key(normalize_id(game_id), params)
+
+        def relabel(game_id, game):
+            return {**game, 'bgg_id': game_id} if game else None
+
+        results: Dict[str, Optional[Dict]] = {}
+        stale = {}
+        for game_id in game_ids:
+            entry = self.cache.lookup(key(game_id)) if self.cache is not None else None
+            if entry is not None and entry.fresh:
+                results[game_id] = relabel(game_id, entry.data)
+            else:
+                stale[game_id] = entry
+        if not stale:
+            return results
+        game_ids = list(stale)
+        # BGG echoes ids in canonical form; map them back to what was asked
+        requested = {normalize_id(game_id): game_id for game_id in game_ids}
+        label = f'IDs {game_ids[0]}..{game_ids[-1]}' if len(game_ids) > 1 else f'ID {game_ids[0]}'
+        response = await self.fetch_thing({'id': ','.join(requested), **params},
+                                          headers=conditional_headers(stale.values()))
+        if response is None:
+            return None
+        if response.status_code == 304:
+            # Unchanged since the cached response: serve the stale entries
+            self.cache.refresh([key(game_id) for game_id in game_ids])
+            return {**results, **{game_id: relabel(game_id, entry.data) for game_id, entry in stale.items()}}
+        if response.status_code != 200:
+            log(f'Unexpected HTTP status {response.status_code} for {label}')
+            return None
+        fetched: Dict[str, Optional[Dict]] = {game_id: None for game_id in game_ids}
+        try:
+            for game in iter_thing_items(response.content):
+                game_id = requested.get(game['bgg_id'] or '')
+                if game_id is None:
+                    continue
+                if not game['description']:
+                    log(f'No description found for game ID: {game_id}')
+                    continue
+                fetched[game_id] = {**game, 'bgg_id': game_id}
+        except ParseError as e:
+            log(f'Failed to parse XML for {label}: {str(e)}')
+            return None
+        if self.cache is not None:
+            self.cache.store(((key(game_id), game) for game_id, game in fetched.items()),
+                             etag=response.headers.get('etag'),
+                             last_modified=response.headers.get('last-modified'))
+        return {**results, **fetched}
+
+    async def get_games_details(self, game_ids: Sequence[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Like fetch_games, but maps every id to None when the request fails.
+        """
+        results = await self.fetch_games(game_ids)
+        return results if results is not None else {game_id: None for game_id in game_ids}
+
+    async def get_game_details(self, game_id: str) -> Optional[Dict]:
+        """
+        Fetch a single game, like bgg.get_game_details but async.
+
+        Returns:
+            dict: The game's fields, or None if the game was not found or
+            could not be fetched
+        """
+        return (await self.get_games_details([game_id]))[game_id]
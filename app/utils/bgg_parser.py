@@ -0,0 +1,108 @@
+# Streaming parser for BGG XML API ``thing`` responses
+#
+# Items are parsed one at a time with iterparse and cleared as soon as their
+# fields are extracted, so a large batched response never exists as a
+# complete element tree.
+
+import io
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Dict, Iterator, Optional, Union
+
+# BGG family rank names -> the domain labels used in the dataset
+DOMAIN_NAMES = {
+    'abstracts': 'Abstract Games',
+    'cgs': 'Customizable Games',
+    'childrensgames': "Children's Games",
+    'familygames': 'Family Games',
+    'partygames': 'Party Games',
+    'strategygames': 'Strategy Games',
+    'thematic': 'Thematic Games',
+    'wargames': 'Wargames',
+}
+
+# Child elements whose value attribute maps straight onto a BoardGame column
+VALUE_FIELDS = {
+    'yearpublished': ('year_published', int),
+    'minplayers': ('min_players', int),
+    'maxplayers': ('max_players', int),
+    'playingtime': ('play_time', int),
+    'minage': ('min_age', int),
+    'usersrated': ('users_rated', int),
+    'average': ('rating_average', float),
+    'averageweight': ('complexity_average', float),
+    'owned': ('owned_users', int),
+}
+
+# Every key _item_fields produces, in order
+GAME_FIELDS = (
+    'bgg_id', 'name', 'description', 'year_published', 'min_players', 'max_players', 'play_time',
+    'min_age', 'users_rated', 'rating_average', 'bgg_rank', 'complexity_average', 'owned_users',
+    'mechanics', 'domains',
+)
+
+
+def _number(value: Optional[str], cast):
+    """Parse a numeric attribute; BGG uses 'Not Ranked' and '' for gaps."""
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _item_fields(item: ET.Element) -> Dict:
+    """Extract the BoardGame columns from a single <item> element."""
+    game = {'bgg_id': item.get('id'), 'name': None, 'description': None}
+    mechanics = []
+    domains = []
+    for element in item.iter():
+        tag = element.tag
+        if tag == 'name' and element.get('type') == 'primary':
+            game['name'] = element.get('value')
+        elif tag == 'description':
+            game['description'] = (element.text or '').strip() or None
+        elif tag in VALUE_FIELDS:
+            column, cast = VALUE_FIELDS[tag]
+            game[column] = _number(element.get('value'), cast)
+        elif tag == 'link' and element.get('type') == 'boardgamemechanic':
+            mechanics.append(element.get('value'))
+        elif tag == 'rank':
+            if element.get('name') == 'boardgame':
+                game['bgg_rank'] = _number(element.get('value'), int)
+            elif element.get('name') in DOMAIN_NAMES:
+                domains.append(DOMAIN_NAMES[element.get('name')])
+    game['mechanics'] = ', '.join(mechanics) or None
+    game['domains'] = ', '.join(domains) or None
+    return game
+
+
+def iter_thing_items(source: Union[bytes, BinaryIO]) -> Iterator[Dict]:
+    """
+    Stream the games out of a /thing response.
+
+    Args:
+        source: The response body, as bytes or a binary file-like object
+
+    Yields:
+        dict: One game per <item>, with BoardGame column names ('bgg_id',
+        'name', 'description', 'rating_average', 'mechanics', ...)
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the XML is malformed
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    root = None
+    depth = 0
+    for event, element in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+            depth += 1
+            continue
+        depth -= 1
+        # Items are direct children of <items>
+        if depth == 1 and element.tag == 'item':
+            yield _item_fields(element)
+            # Drop the finished item so memory stays flat across the response
+            element.clear()
+            root.remove(element)
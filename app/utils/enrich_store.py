@@ -0,0 +1,315 @@
+# Durable progress storage for BGG enrichment runs
+#
+# Each fetched game is appended to a SQLite journal (WAL mode) as soon as it
+# arrives, so saving progress costs the same for the 20th game as for the
+# 20,000th. The output is only written once, by compact(), which streams
+# the input file and merges in the journalled data row by row.
+#
+# Alongside the data, the journal keeps a status per id: fetched, not found
+# on BGG, or failed with a transient error (and how many times). Resuming
+# skips every id whose outcome is final without touching the network.
+
+import csv
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+from .bgg_parser import GAME_FIELDS
+from .snapshot import SNAPSHOT_SUFFIX, write_snapshot
+
+load_dotenv()
+
+# Outcomes recorded per game id
+STATUS_SUCCESS = 'success'
+STATUS_NOT_FOUND = 'not_found'
+STATUS_TRANSIENT = 'transient'
+
+# Transient failures after which an id is given up on, until reset_failures()
+BGG_MAX_ATTEMPTS = int(os.getenv('BGG_MAX_ATTEMPTS', '5'))
+
+
+def get_journal_file(output_file: str) -> str:
+    """Get the path to the journal that backs a given output file."""
+    base_dir = os.path.dirname(output_file)
+    base_name = os.path.basename(output_file)
+    return os.path.join(base_dir, f'.{base_name}.journal.sqlite')
+
+
+class EnrichmentJournal:
+    """
+    Append-only store of enriched game data and fetch status, keyed by BGG id.
+
+    Args:
+        path (str): SQLite file to use; created if it doesn't exist
+        max_attempts (int): Transient failures before an id stops being retried
+    """
+
+    def __init__(self, path: str, max_attempts: int = BGG_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.is_new = not os.path.exists(path)
+        self._db = sqlite3.connect(path)
+        # WAL makes each append a sequential write instead of a page rewrite
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS enriched ('
+            ' game_id TEXT PRIMARY KEY,'
+            ' data TEXT NOT NULL,'
+            ' fetched_at REAL NOT NULL)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS fetch_status ('
+            ' game_id TEXT PRIMARY KEY,'
+            ' status TEXT NOT NULL,'
+            ' attempts INTEGER NOT NULL,'
+            ' updated_at REAL NOT NULL)'
+        )
+        # Journals written before statuses existed only hold successes
+        self._db.execute(
+            'INSERT OR IGNORE INTO fetch_status (game_id, status, attempts, updated_at)'
+            ' SELECT game_id, ?, 1, fetched_at FROM enriched', (STATUS_SUCCESS,)
+        )
+        self._db.commit()
+
+    def __enter__(self) -> 'EnrichmentJournal':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def append(self, games: Iterable[Tuple[str, Dict]]):
+        """Record fetched data for some games in one transaction."""
+        now = time.time()
+        rows = [(game_id, json.dumps(data, ensure_ascii=False)) for game_id, data in games]
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO enriched (game_id, data, fetched_at) VALUES (?, ?, ?)',
+                [(game_id, data, now) for game_id, data in rows]
+            )
+            self._db.executemany(
+                'INSERT OR REPLACE INTO fetch_status (game_id, status, attempts, updated_at)'
+                ' VALUES (?, ?, COALESCE((SELECT attempts FROM fetch_status WHERE game_id = ?), 0) + 1, ?)',
+                [(game_id, STATUS_SUCCESS, game_id, now) for game_id, _ in rows]
+            )
+
+    def record_failures(self, game_ids: Iterable[str], status: str):
+        """Record that some games were not found, or failed transiently."""
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                'INSERT INTO fetch_status (game_id, status, attempts, updated_at) VALUES (?, ?, 1, ?)'
+                ' ON CONFLICT (game_id) DO UPDATE SET'
+                ' status = excluded.status, attempts = attempts + 1, updated_at = excluded.updated_at',
+                [(game_id, status, now) for game_id in game_ids]
+            )
+
+    def pending(self, game_ids: Sequence[str]) -> List[str]:
+        """
+        Return the ids (in order) that still need fetching.
+
+        Ids that were fetched or not found are done; transient failures are
+        retried until they have failed ``max_attempts`` times.
+        """
+        if not game_ids:
+            return []
+        placeholders = ','.join('?' * len(game_ids))
+        done = {row[0] for row in self._db.execute(
+            f'SELECT game_id FROM fetch_status WHERE game_id IN ({placeholders})'
+            ' AND (status != ? OR attempts >= ?)',
+            [*game_ids, STATUS_TRANSIENT, self.max_attempts])}
+        return [game_id for game_id in game_ids if game_id not in done]
+
+    def status(self, game_id: str) -> Optional[Tuple[str, int, float]]:
+        """Return (status, attempts, updated_at) for a game, or None if never tried."""
+        return self._db.execute(
+            'SELECT status, attempts, updated_at FROM fetch_status WHERE game_id = ?', (game_id,)
+        ).fetchone()
+
+    def status_counts(self) -> Dict[str, int]:
+        return dict(self._db.execute('SELECT status, COUNT(*) FROM fetch_status GROUP BY status'))
+
+    def reset_failures(self) -> int:
+        """Make every transiently failed id eligible for retry again."""
+        with self._db:
+            return self._db.execute(
+                'UPDATE fetch_status SET attempts = 0 WHERE status = ?', (STATUS_TRANSIENT,)
+            ).rowcount
+
+    def get(self, game_id: str) -> Optional[Dict]:
+        row = self._db.execute('SELECT data FROM enriched WHERE game_id = ?', (game_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM enriched').fetchone()[0]
+
+    def import_output_file(self, output_file: str) -> int:
+        """
+        Seed the journal from an output file written by an older run.
+
+        Returns:
+            int: The number of games imported
+        """
+        games = []
+        with open(output_file, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('id') and row.get('description'):
+                    games.append((row['id'].strip(), {'description': row['description']}))
+        self.append(games)
+        return len(games)
+
+    def compact(self, input_file: str, output_file: str) -> int:
+        """
+        Write the output: every input row, with journalled fields merged in.
+
+        Rows are streamed from the input and written to a temporary file that
+        replaces the output at the end, so memory use doesn't grow with the
+        dataset and a crash never leaves a half-written output. An output
+        path ending in .parquet is written as a typed snapshot instead.
+
+        Returns:
+            int: The number of rows written
+        """
+        tmp_file = f'{output_file}.tmp'
+        written = 0
+        with open(input_file, 'r', encoding='utf-8') as src, \
+                open(tmp_file, 'w', encoding='utf-8', newline='') as dst:
+            reader = csv.DictReader(src)
+            fieldnames = list(reader.fieldnames)
+            if 'description' not in fieldnames:
+                fieldnames.append('description')
+            writer = csv.DictWriter(dst, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            for row in reader:
+                data = self.get(row['id'].strip()) if row.get('id') else None
+                writer.writerow({**row, **data} if data else row)
+                written += 1
+        if output_file.endswith(SNAPSHOT_SUFFIX):
+            write_snapshot(tmp_file, output_file)
+            os.remove(tmp_file)
+        else:
+            os.replace(tmp_file, output_file)
+        return written
+
+
+class GameRecord:
+    """
+    One game's BGG fields, stored in slots rather than a per-game dict.
+
+    Keys outside GAME_FIELDS are kept in ``extra`` so nothing passed in is lost.
+    """
+
+    __slots__ = GAME_FIELDS + ('extra',)
+
+    def __init__(self, fields: Dict):
+        for name in GAME_FIELDS:
+            setattr(self, name, fields.get(name))
+        extra = {key: value for key, value in fields.items() if key not in GAME_FIELDS}
+        self.extra = extra or None
+
+    def to_dict(self) -> Dict:
+        game = {name: getattr(self, name) for name in GAME_FIELDS}
+        if self.extra:
+            game.update(self.extra)
+        return game
+
+
+class GameStore:
+    """
+    Games keyed by BGG id, persisted as an append-only JSON lines log.
+
+    Adding or replacing a game is a dict assignment. flush() appends only
+    the games changed since the last flush, one compact line each, so the
+    cost of saving is proportional to what changed. When the log is read
+    back, later lines win; compact() rewrites it with one line per game.
+
+    Args:
+        path (str): The JSON lines log; nothing is persisted if None
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._records: Dict[str, GameRecord] = {}
+        self._dirty: Dict[str, None] = {}
+
+    def add(self, game_id, game_data: Dict):
+        """Add a game, replacing any earlier record for the same id."""
+        game_id = str(game_id)
+        self._records[game_id] = GameRecord(game_data)
+        self._dirty[game_id] = None
+
+    def get(self, game_id) -> Optional[Dict]:
+        record = self._records.get(str(game_id))
+        return record.to_dict() if record else None
+
+    def __contains__(self, game_id) -> bool:
+        return str(game_id) in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return (record.to_dict() for record in self._records.values())
+
+    def _write_lines(self, f, game_ids: Iterable[str]):
+        for game_id in game_ids:
+            line = {'id': game_id, **self._records[game_id].to_dict()}
+            f.write(json.dumps(line, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def flush(self) -> int:
+        """
+        Append the games changed since the last flush to the log.
+
+        Returns:
+            int: The number of games written
+        """
+        if not self.path or not self._dirty:
+            return 0
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            self._write_lines(f, self._dirty)
+        written = len(self._dirty)
+        self._dirty = {}
+        return written
+
+    def load(self) -> int:
+        """
+        Read the log into memory.
+
+        A torn line left by an interrupted write is skipped, and the log is
+        rewritten so later appends don't land on the end of it.
+
+        Returns:
+            int: The number of games loaded
+        """
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        torn = False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    game = json.loads(line)
+                except json.JSONDecodeError:
+                    torn = True
+                    continue
+                self._records[str(game.pop('id'))] = GameRecord(game)
+        if torn:
+            self.compact()
+        return len(self._records)
+
+    def compact(self):
+        """Rewrite the log with exactly one line per game."""
+        if not self.path:
+            return
+        tmp_file = f'{self.path}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            self._write_lines(f, self._records)
+        os.replace(tmp_file, self.path)
+        self._dirty = {}
@@ -1,67 +1,217 @@
-import pandas as pd
+import io
 import logging
 import os
-from sqlalchemy.orm import Session
-from app.database import engine, SessionLocal
+import sys
+from typing import List
+
+import pandas as pd
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.engine import Engine
+from app import database
 from app.models import BoardGame, Base
+from app.utils.logger import setup_logger
+from app.utils.snapshot import read_games_frame
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 logger = logging.getLogger(os.getenv('LOGGER_NAME'))
 
-def load_games_data():
+GAMES_FILE = 'app/utils/data/silver_enriched.csv'
+TABLE = BoardGame.__tablename__
+STAGING_TABLE = f'{TABLE}_staging'
+# Names of the staging table's constraint and indexes until it is swapped in
+STAGING_SUFFIX = '_new'
+
+# Rows per COPY chunk / per executemany batch
+COPY_CHUNK_ROWS = 50_000
+INSERT_BATCH_ROWS = 5_000
+
+LOAD_MODES = ('replace', 'upsert')
+
+
+def prepare_games_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shape a dataset frame for the board_games table.
+
+    Keeps only the table's columns, fills bgg_id from the dataset id (they
+    are the same BGG id) and drops duplicate games, keeping the first.
+    """
+    if 'bgg_id' not in df.columns and 'id' in df.columns:
+        df = df.assign(bgg_id=df['id'])
+    columns = [c for c in BoardGame.__table__.columns.keys() if c in df.columns]
+    return df[columns].drop_duplicates(subset='bgg_id')
+
+
+def _copy_frame(cursor, df: pd.DataFrame, table: str):
+    """Stream a frame into a table with COPY, one CSV chunk at a time."""
+    columns = ', '.join(df.columns)
+    statement = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    for start in range(0, len(df), COPY_CHUNK_ROWS):
+        buffer = io.StringIO()
+        df.iloc[start:start + COPY_CHUNK_ROWS].to_csv(buffer, header=False, index=False, na_rep='\\N')
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        logger.info("Copied rows %d to %d into %s", start, min(start + COPY_CHUNK_ROWS, len(df)), table)
+
+
+def _update_columns(df: pd.DataFrame) -> List[str]:
+    # User data (note) isn't in the frame, so an upsert never overwrites it
+    return [c for c in df.columns if c not in ('id', 'bgg_id')]
+
+
+def _staging_index_ddl(db_engine: Engine) -> List[str]:
+    """
+    CREATE INDEX statements for the model's indexes on the staging table.
+
+    Each gets its final name plus STAGING_SUFFIX, as the live table still
+    holds the final names; they are renamed after the swap.
+    """
+    statements = []
+    for index in BoardGame.__table__.indexes:
+        ddl = str(CreateIndex(index).compile(dialect=db_engine.dialect))
+        target = f'INDEX {index.name} ON {TABLE} '
+        if target not in ddl:
+            raise ValueError(f"Unexpected DDL for index {index.name}: {ddl}")
+        statements.append(ddl.replace(target, f'INDEX {index.name}{STAGING_SUFFIX} ON {STAGING_TABLE} ', 1))
+    return statements
+
+
+def _copy_load(db_engine: Engine, df: pd.DataFrame, mode: str):
+    """PostgreSQL path: COPY into a staging table, then swap or upsert."""
+    connection = db_engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            if mode == 'replace':
+                # Build the new table, with its primary key and every index,
+                # next to the live one and commit it, so readers keep seeing
+                # the old data meanwhile. It has no indexes while loading,
+                # which keeps COPY fast.
+                cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+                cursor.execute(f"CREATE TABLE {STAGING_TABLE} (LIKE {TABLE} INCLUDING DEFAULTS)")
+                _copy_frame(cursor, df, STAGING_TABLE)
+                cursor.execute(f"ALTER TABLE {STAGING_TABLE} ADD CONSTRAINT {TABLE}_pkey{STAGING_SUFFIX} PRIMARY KEY (id)")
+                indexes = [index.name for index in BoardGame.__table__.indexes]
+                for statement in _staging_index_ddl(db_engine):
+                    cursor.execute(statement)
+                connection.commit()
+
+                # The swap only renames and drops, so the exclusive lock on
+                # board_games is held for moments, not for an index build
+                cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (TABLE,))
+                sequence = cursor.fetchone()[0]
+                cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_old")
+                cursor.execute(f"ALTER TABLE {STAGING_TABLE} RENAME TO {TABLE}")
+                if sequence:
+                    # The id sequence belongs to the old table; keep it alive
+                    cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id")
+                # Dropping the old table frees its index names for the new one
+                cursor.execute(f"DROP TABLE {TABLE}_old")
+                cursor.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {TABLE}_pkey{STAGING_SUFFIX} TO {TABLE}_pkey")
+                for name in indexes:
+                    cursor.execute(f"ALTER INDEX {name}{STAGING_SUFFIX} RENAME TO {name}")
+            else:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {STAGING_TABLE} (LIKE {TABLE} INCLUDING DEFAULTS) ON COMMIT DROP")
+                _copy_frame(cursor, df, STAGING_TABLE)
+                columns = ', '.join(df.columns)
+                updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in _update_columns(df))
+                cursor.execute(
+                    f"INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM {STAGING_TABLE} "
+                    f"ON CONFLICT (bgg_id) DO UPDATE SET {updates}")
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def _insert_load(db_engine: Engine, df: pd.DataFrame, mode: str):
+    """Portable path for other databases: batched executemany in one transaction."""
+    table = BoardGame.__table__
+    if db_engine.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    statement = insert(table)
+    if mode == 'upsert':
+        statement = statement.on_conflict_do_update(
+            index_elements=['bgg_id'],
+            set_={c: statement.excluded[c] for c in _update_columns(df)})
+    # NaN / pd.NA -> None so the driver writes NULL
+    rows = df.astype(object).where(df.notna(), None).to_dict('records')
+    with db_engine.begin() as connection:
+        if mode == 'replace':
+            connection.execute(table.delete())
+        for start in range(0, len(rows), INSERT_BATCH_ROWS):
+            connection.execute(statement, rows[start:start + INSERT_BATCH_ROWS])
+
+
+def _ensure_indexes(db_engine: Engine):
+    """
+    Create the model's indexes on a table that predates them.
+
+    Tables created before bgg_id was unique also get a unique index on it,
+    which upserts need.
+    """
+    for index in BoardGame.__table__.indexes:
+        index.create(db_engine, checkfirst=True)
+    inspector = inspect(db_engine)
+    unique_sets = [index['column_names'] for index in inspector.get_indexes(TABLE) if index['unique']]
+    unique_sets += [constraint['column_names'] for constraint in inspector.get_unique_constraints(TABLE)]
+    if ['bgg_id'] not in unique_sets:
+        with db_engine.begin() as connection:
+            connection.execute(text(f"CREATE UNIQUE INDEX ix_{TABLE}_bgg_id_unique ON {TABLE} (bgg_id)"))
+
+
+def bulk_load_games(db_engine: Engine, df: pd.DataFrame, mode: str = 'replace') -> int:
+    """
+    Load games into the board_games table.
+
+    On PostgreSQL the frame is streamed with COPY ... FROM STDIN into a
+    staging table. 'replace' swaps the staging table in for the live one in
+    a single transaction; 'upsert' merges it into the live table keyed on
+    bgg_id. Other databases use batched multi-row inserts.
+
+    Args:
+        db_engine: The SQLAlchemy engine to load into
+        df (DataFrame): Games, e.g. from read_games_frame
+        mode (str): 'replace' or 'upsert'
+
+    Returns:
+        int: The number of games loaded
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"mode must be one of {LOAD_MODES}, not {mode!r}")
+    Base.metadata.create_all(bind=db_engine, tables=[BoardGame.__table__])
+    _ensure_indexes(db_engine)
+    df = prepare_games_frame(df)
+    if db_engine.dialect.name == 'postgresql':
+        _copy_load(db_engine, df, mode)
+    else:
+        _insert_load(db_engine, df, mode)
+    return len(df)
+
+
+def load_games_data(path: str = GAMES_FILE, mode: str = 'replace'):
     """Load board games data from CSV into the database."""
     try:
-        # Create tables if they don't exist
-        Base.metadata.create_all(bind=engine)
-        
-        # Read the CSV file
-        logger.info("Reading CSV file...")
-        df = pd.read_csv('app/utils/data/silver_enriched.csv')
-        
-        # Drop the index column if it exists
-        if 'Unnamed: 0' in df.columns:
-            df = df.drop('Unnamed: 0', axis=1)
-        
-        # Create database session
-        db = SessionLocal()
-        
-        try:
-            # First, delete existing records if any
-            logger.info("Clearing existing records...")
-            db.query(BoardGame).delete()
-            
-            # Convert DataFrame to list of dictionaries
-            logger.info("Converting data for database insertion...")
-            games_data = df.to_dict('records')
-            
-            # Insert records in batches
-            batch_size = 1000
-            total_records = len(games_data)
-            
-            for i in range(0, total_records, batch_size):
-                batch = games_data[i:i + batch_size]
-                # Filter out any keys that aren't in the BoardGame model
-                valid_columns = BoardGame.__table__.columns.keys()
-                filtered_batch = [{k: v for k, v in game.items() if k in valid_columns} for game in batch]
-                game_objects = [BoardGame(**game) for game in filtered_batch]
-                db.bulk_save_objects(game_objects)
-                db.commit()
-                logger.info(f"Inserted records {i} to {min(i + batch_size, total_records)}")
-            
-            logger.info(f"Successfully loaded {total_records} games into the database")
-            
-        except Exception as e:
-            logger.error(f"Error while loading data: {str(e)}")
-            db.rollback()
-            raise
-        finally:
-            db.close()
-            
+        # Read the dataset, only the columns the table stores; this uses the
+        # Parquet snapshot when one is up to date
+        logger.info("Reading games dataset...")
+        df = read_games_frame(path, columns=BoardGame.__table__.columns.keys())
+        total_records = bulk_load_games(database.init_engines(), df, mode)
+        logger.info("Successfully loaded %d games into the database (%s)", total_records, mode)
+
     except Exception as e:
-        logger.error(f"Failed to load games data: {str(e)}")
+        logger.error("Failed to load games data: %s", e)
         raise
 
 if __name__ == "__main__":
-    load_games_data()
\ No newline at end of file
+    setup_logger()
+    args = sys.argv[1:]
+    mode = 'upsert' if '--upsert' in args else 'replace'
+    paths = [arg for arg in args if arg != '--upsert']
+    load_games_data(*paths[:1], mode=mode)
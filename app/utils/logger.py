@@ -1,20 +1,49 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
+load_dotenv()
+
+# Where the log file goes, and when it is rotated
+LOG_FILE = os.getenv('LOG_FILE', 'logs/app.log')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+
+# The thread writing records out; set once setup_logger has run
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_logger: Optional[logging.Logger] = None
 
-# Create logs directory if it doesn't exist
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
 
 # Configure logging
-def setup_logger():
+def setup_logger(level: Optional[str] = None, log_file: Optional[str] = None) -> logging.Logger:
+    """
+    Configure the app logger; calling it again only updates the level.
+
+    Log calls put records on a queue and return; a background
+    QueueListener thread writes them to a size-rotated file and stdout,
+    so request handlers never wait on file or console I/O.
+
+    Args:
+        level (str): Defaults to LOGGING_LEVEL, or INFO
+        log_file (str): Defaults to LOG_FILE
+    """
+    global _listener, _queue_handler, _logger
     load_dotenv()
     logger = logging.getLogger(os.getenv('LOGGER_NAME', 'bgg_app'))
-    logger.setLevel(os.getenv("LOGGING_LEVEL", "INFO"))
-    print(f"Logging level detected: {os.getenv('LOGGING_LEVEL')}")
+    level = level or os.getenv('LOGGING_LEVEL', 'INFO')
+    logger.setLevel(level)
+    if _listener is not None:
+        return logger
+
+    log_file = log_file or LOG_FILE
+    Path(log_file).parent.mkdir(parents=True, exist_ok=True)
     # Create formatters
     file_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -23,18 +52,37 @@ def setup_logger():
         '%(levelname)s: %(message)s'
     )
 
-    # File handler
-    file_handler = logging.FileHandler('logs/app.log')
-    file_handler.setLevel(os.getenv('LOGGING_LEVEL'))
+    # File handler, rotated by size
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES,
+                                                        backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
     file_handler.setFormatter(file_formatter)
 
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(os.getenv('LOGGING_LEVEL'))
     console_handler.setFormatter(console_formatter)
 
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # The logger only enqueues; the listener thread does the writing
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
+    _logger = logger
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+    _listener.start()
+    atexit.register(stop_logger)
+    logger.debug("Logging level: %s", level)
+    return logger
+
 
-    return logger 
\ No newline at end of file
+def stop_logger():
+    """Write out queued records and stop the listener thread (run at exit)."""
+    global _listener, _queue_handler, _logger
+    if _listener is None:
+        return
+    # Nothing may be queued behind the listener's stop marker
+    _logger.removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
+    _logger = None
@@ -0,0 +1,224 @@
+# Typed columnar snapshots of the board game dataset
+#
+# The CSV exports carry pandas index columns, int64 everywhere and
+# mechanics_list as a stringified Python list. A snapshot fixes all of that
+# once, so loading it is a projected Parquet read with no parsing. The
+# heavily repeated mechanics / domains strings are stored dictionary-encoded
+# and loaded as pandas categoricals.
+#
+# Snapshots can also be written as uncompressed Arrow IPC (.arrow) files.
+# Those are memory-mapped rather than read, so every worker process shares
+# the same page-cache copy of the data.
+
+import ast
+import logging
+import os
+import sys
+import tempfile
+from typing import List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+from .logger import setup_logger
+from .vocabulary import intern_values, is_placeholder
+
+load_dotenv()
+logger = logging.getLogger(os.getenv('LOGGER_NAME'))
+
+SNAPSHOT_SUFFIX = '.parquet'
+ARROW_SUFFIX = '.arrow'
+
+# Write a CSV's Parquet snapshot next to it the first time it is parsed, so
+# later loads (and other workers) skip the parse
+DATASET_AUTO_SNAPSHOT = os.getenv('DATASET_AUTO_SNAPSHOT', 'true').lower() in ('1', 'true', 'yes')
+
+# Column types for the snapshot; columns not listed here are dropped
+GAME_SCHEMA = pa.schema([
+    ('id', pa.int32()),
+    ('name', pa.string()),
+    ('year_published', pa.int32()),
+    ('min_players', pa.int32()),
+    ('max_players', pa.int32()),
+    ('play_time', pa.int32()),
+    ('min_age', pa.int32()),
+    ('users_rated', pa.int32()),
+    ('rating_average', pa.float64()),
+    ('bgg_rank', pa.int32()),
+    ('complexity_average', pa.float64()),
+    ('owned_users', pa.int32()),
+    ('mechanics', pa.dictionary(pa.int32(), pa.string())),
+    ('domains', pa.dictionary(pa.int32(), pa.string())),
+    ('mechanics_list', pa.list_(pa.string())),
+    ('description', pa.string()),
+])
+
+# String columns with few distinct values, kept as categoricals
+CATEGORICAL_COLUMNS = ('mechanics', 'domains')
+
+
+def parse_mechanics_list(value) -> List[str]:
+    """Parse "['Action Queue', ' Action Retrieval']" into a clean list."""
+    if isinstance(value, (list, tuple)):
+        items = value
+    elif not isinstance(value, str) or not value.strip():
+        return []
+    else:
+        try:
+            items = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            items = value.strip('[]').split(',')
+    # Interned, so the thousands of games naming a mechanic share its string
+    items = (str(item).strip(" '\"") for item in items)
+    return intern_values(item for item in items if not is_placeholder(item))
+
+
+def categorize(df: pd.DataFrame) -> pd.DataFrame:
+    """Store the repeated-string columns as categoricals (no-op if they already are)."""
+    columns = [c for c in CATEGORICAL_COLUMNS if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)]
+    return df.astype({c: 'category' for c in columns}) if columns else df
+
+
+def clean_games_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop CSV index columns and coerce the known columns to their types."""
+    columns = [field.name for field in GAME_SCHEMA if field.name in df.columns]
+    df = df[columns].copy()
+    if 'mechanics_list' in df.columns:
+        df['mechanics_list'] = df['mechanics_list'].map(parse_mechanics_list)
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            # The CSV's 'missing' means no values, not a mechanic or domain called that
+            df[column] = df[column].mask(df[column].map(is_placeholder).astype(bool))
+    for field in GAME_SCHEMA:
+        if field.name not in df.columns or not pa.types.is_integer(field.type):
+            continue
+        values = pd.to_numeric(df[field.name], errors='coerce')
+        # Nullable ints only where the data actually has gaps
+        df[field.name] = values.astype('int32' if values.notna().all() else 'Int32')
+    return categorize(df)
+
+
+def snapshot_path(csv_path: str) -> str:
+    """Path of the snapshot that belongs to a CSV file."""
+    return os.path.splitext(csv_path)[0] + SNAPSHOT_SUFFIX
+
+
+def write_snapshot(csv_path: str, output_path: Optional[str] = None) -> str:
+    """
+    Convert a dataset CSV into a typed snapshot.
+
+    Args:
+        csv_path (str): The CSV export to convert
+        output_path (str): Where to write the snapshot; defaults to the CSV
+            path with a .parquet suffix. A path ending in .arrow writes an
+            uncompressed Arrow IPC file that can be memory-mapped.
+
+    Returns:
+        str: The path of the written snapshot
+    """
+    output_path = output_path or snapshot_path(csv_path)
+    return write_games_frame(clean_games_frame(pd.read_csv(csv_path)), output_path)
+
+
+def write_games_frame(df: pd.DataFrame, output_path: str) -> str:
+    """
+    Write a cleaned games frame (see clean_games_frame) as a snapshot.
+
+    Args:
+        df (DataFrame): The games, as clean_games_frame returns them
+        output_path (str): A .parquet path, or .arrow for a mappable file
+
+    Returns:
+        str: output_path
+    """
+    schema = pa.schema([field for field in GAME_SCHEMA if field.name in df.columns])
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    # Written to a uniquely named file alongside and renamed into place, so
+    # a running app watching the path never reads a partial file (and mapped
+    # old versions stay valid), and callers' own '<output>.tmp' files (e.g.
+    # EnrichmentJournal.compact's) aren't clobbered
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(output_path)),
+                                     prefix=f'{os.path.basename(output_path)}.', suffix='.tmp',
+                                     delete=False) as temp:
+        temp_path = temp.name
+    try:
+        if output_path.endswith(ARROW_SUFFIX):
+            # Uncompressed on purpose: compressed buffers can't be mapped zero-copy
+            with pa.OSFile(temp_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            pq.write_table(table, temp_path, compression='zstd')
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    logger.info("Wrote %d games to snapshot %s", table.num_rows, output_path)
+    return output_path
+
+
+def map_games_table(path: str, columns: Optional[Sequence[str]] = None) -> pa.Table:
+    """
+    Memory-map an Arrow IPC snapshot without copying it.
+
+    The returned table's buffers point into the mapped file, so processes
+    mapping the same file share its pages instead of each holding a copy.
+
+    Args:
+        path (str): An .arrow snapshot written by write_snapshot
+        columns (list): Only expose these columns (missing ones are ignored)
+    """
+    logger.info("Memory-mapping dataset snapshot %s", path)
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    if columns:
+        table = table.select([c for c in columns if c in table.column_names])
+    return table
+
+
+def read_games_frame(path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Read the dataset, preferring an up-to-date Parquet snapshot.
+
+    A CSV path is served from its sibling snapshot when that snapshot is at
+    least as new as the CSV; otherwise the CSV is parsed and cleaned, and
+    (unless DATASET_AUTO_SNAPSHOT is off) the snapshot is written for next
+    time.
+
+    Args:
+        path (str): A dataset CSV or a .parquet / .arrow snapshot
+        columns (list): Only read these columns (missing ones are ignored)
+    """
+    if not path.endswith((SNAPSHOT_SUFFIX, ARROW_SUFFIX)):
+        snapshot = snapshot_path(path)
+        if os.path.exists(snapshot) and os.path.getmtime(snapshot) >= os.path.getmtime(path):
+            path = snapshot
+    if path.endswith(ARROW_SUFFIX):
+        return map_games_table(path, columns).to_pandas()
+    if path.endswith(SNAPSHOT_SUFFIX):
+        # ParquetFile reads a single file without the pyarrow.dataset machinery
+        parquet_file = pq.ParquetFile(path)
+        available = parquet_file.schema_arrow.names
+        projected = [c for c in columns if c in available] if columns else None
+        logger.info("Reading dataset snapshot %s", path)
+        # Snapshots written before the columns were dictionary-encoded read as strings
+        return categorize(parquet_file.read(columns=projected).to_pandas())
+    logger.info("Reading dataset CSV %s (no up-to-date snapshot)", path)
+    df = clean_games_frame(pd.read_csv(path))
+    if DATASET_AUTO_SNAPSHOT:
+        try:
+            write_games_frame(df, snapshot_path(path))
+        except OSError as e:
+            # e.g. a read-only data directory; the next load parses the CSV again
+            logger.warning("Could not write a snapshot for %s: %s", path, e)
+    return df[[c for c in columns if c in df.columns]] if columns else df
+
+
+if __name__ == '__main__':
+    setup_logger()
+    if len(sys.argv) not in (2, 3):
+        print('Usage: python -m app.utils.snapshot <input_file.csv> [output_file.parquet|.arrow]')
+        sys.exit(1)
+    print(write_snapshot(*sys.argv[1:]))
@@ -0,0 +1,199 @@
+# Interned vocabularies and sparse multi-hot matrices for list-like columns
+#
+# mechanics, domains and mechanics_list all hold several values per game,
+# as comma-joined strings or lists. A MultiHot parses such a column once
+# into a sorted vocabulary of interned strings and a CSR matrix (row
+# pointers plus term numbers), so counting or averaging per mechanic is a
+# bincount instead of a re-parse of every row. Joined strings are parsed
+# once per distinct value, not once per game.
+
+import sys
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def intern_values(values: Iterable[str]) -> List[str]:
+    """Intern strings so every game naming a value shares one object."""
+    return [sys.intern(value) for value in values]
+
+
+# What the dataset writes where a game has no mechanics or domains
+PLACEHOLDER_VALUES = frozenset({'missing'})
+
+
+def is_placeholder(value) -> bool:
+    """Whether a value stands for "no values": None, NaN, blank or a placeholder."""
+    if not isinstance(value, str):
+        return value is None or bool(pd.isna(value))
+    return not value.strip() or value.strip().lower() in PLACEHOLDER_VALUES
+
+
+def split_joined(value, sep: str = ',') -> List[str]:
+    """Split 'Dice Rolling, Tile Placement' into stripped items, without blanks or placeholders."""
+    if not isinstance(value, str):
+        return []
+    return [item.strip() for item in value.split(sep) if not is_placeholder(item)]
+
+
+class MultiHot:
+    """
+    Sparse multi-hot matrix: one row per game, one column per vocabulary term.
+
+    Stored CSR-style without scipy: row ``i``'s terms are
+    ``indices[indptr[i]:indptr[i + 1]]``, sorted and without repeats, and
+    term ``j`` is ``vocabulary[j]``. The vocabulary is sorted.
+
+    Args:
+        vocabulary (ndarray): Interned term strings, sorted
+        indptr (ndarray): Row pointers, one more than there are rows
+        indices (ndarray): Term numbers of every row, row after row
+    """
+
+    def __init__(self, vocabulary: np.ndarray, indptr: np.ndarray, indices: np.ndarray):
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.indices = indices
+        self._rows: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_lists(cls, lists: Iterable) -> 'MultiHot':
+        """Build from one list (or array, or None) of terms per row."""
+        items = pd.Series(list(lists), dtype=object)
+        size = len(items)
+        exploded = items.explode().dropna()
+        exploded = exploded[~exploded.map(is_placeholder).astype(bool)]
+        codes, terms = pd.factorize(exploded.astype(str), sort=True)
+        rows = exploded.index.to_numpy(dtype=np.int64)
+        width = max(len(terms), 1)
+        # Row-major order, and a term listed twice for one row counts once
+        pairs = np.unique(rows * width + codes)
+        rows, codes = pairs // width, pairs % width
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+        index_type = np.int16 if len(terms) < 2 ** 15 else np.int32
+        vocabulary = np.array(intern_values(terms), dtype=object)
+        return cls(vocabulary, indptr, codes.astype(index_type))
+
+    @classmethod
+    def from_joined(cls, series: pd.Series, sep: str = ',') -> 'MultiHot':
+        """
+        Build from a column of separator-joined strings.
+
+        Each distinct string is split once; rows then pick up their terms
+        by category code, which is fast when (like mechanics and domains)
+        many games share a value.
+        """
+        categorical = series.astype('category')
+        distinct = cls.from_lists(split_joined(value, sep) for value in categorical.cat.categories)
+        codes = categorical.cat.codes.to_numpy()
+        present = codes >= 0
+        lengths = np.zeros(len(codes), dtype=np.int64)
+        lengths[present] = np.diff(distinct.indptr)[codes[present]]
+        indptr = np.zeros(len(codes) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        # Gather each row's slice of the per-value matrix in one step
+        starts = np.zeros(len(codes), dtype=np.int64)
+        starts[present] = distinct.indptr[codes[present]]
+        offsets = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return cls(distinct.vocabulary, indptr, distinct.indices[offsets])
+
+    @property
+    def shape(self):
+        return len(self.indptr) - 1, len(self.vocabulary)
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def rows(self) -> np.ndarray:
+        """The row of every stored entry, parallel to ``indices``."""
+        if self._rows is None:
+            self._rows = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.indptr))
+        return self._rows
+
+    def term(self, value: str) -> Optional[int]:
+        """The column number of a term, or None if no row has it."""
+        position = int(np.searchsorted(self.vocabulary, value))
+        if position < len(self.vocabulary) and self.vocabulary[position] == value:
+            return position
+        return None
+
+    def row_terms(self, row: int) -> List[str]:
+        return self.vocabulary[self.indices[self.indptr[row]:self.indptr[row + 1]]].tolist()
+
+    def column(self, value: str) -> np.ndarray:
+        """Boolean per row: whether it has the term."""
+        mask = np.zeros(len(self), dtype=bool)
+        code = self.term(value)
+        if code is not None:
+            mask[self.rows()[self.indices == code]] = True
+        return mask
+
+    def counts(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rows having each term, optionally only among rows where ``mask`` is set."""
+        indices = self.indices if mask is None else self.indices[mask[self.rows()]]
+        return np.bincount(indices, minlength=len(self.vocabulary))
+
+    def mean(self, values) -> np.ndarray:
+        """
+        Per-term mean of a numeric column over the rows that have the term.
+
+        Args:
+            values: One number per row; NaN / missing values are skipped
+
+        Returns:
+            ndarray: One mean per vocabulary term (NaN where no row counts)
+        """
+        values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        entry_values = values[self.rows()]
+        present = ~np.isnan(entry_values)
+        totals = np.bincount(self.indices[present], weights=entry_values[present], minlength=len(self.vocabulary))
+        counts = np.bincount(self.indices[present], minlength=len(self.vocabulary))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return totals / counts
+
+    def summarize(self, df: pd.DataFrame, columns) -> pd.DataFrame:
+        """
+        Per-term game counts and column means, e.g. rating by mechanic.
+
+        Args:
+            df (DataFrame): The frame the matrix was built from, row for row
+            columns (list): Numeric columns to average
+
+        Returns:
+            DataFrame: Indexed by term, with a 'games' count and one mean
+            per column, most common terms first
+        """
+        summary = pd.DataFrame({'games': self.counts()}, index=pd.Index(self.vocabulary, name='term'))
+        for column in columns:
+            summary[column] = self.mean(df[column].to_numpy())
+        return summary.sort_values('games', ascending=False, kind='stable')
+
+    def to_dense(self) -> np.ndarray:
+        """The full boolean matrix; rows x vocabulary, so mind the size."""
+        dense = np.zeros(self.shape, dtype=bool)
+        dense[self.rows(), self.indices] = True
+        return dense
+
+    def to_frame(self, index=None) -> pd.DataFrame:
+        """A DataFrame of sparse boolean columns, one per term, e.g. for notebooks."""
+        rows = self.rows()
+        columns = {}
+        for code, value in enumerate(self.vocabulary):
+            column = np.zeros(len(self), dtype=bool)
+            column[rows[self.indices == code]] = True
+            columns[value] = pd.arrays.SparseArray(column, fill_value=False)
+        return pd.DataFrame(columns, index=index)
+
+
+def mechanics_multi_hot(df: pd.DataFrame) -> MultiHot:
+    """
+    The mechanics of every game in a dataset frame, as a MultiHot.
+
+    Uses the parsed mechanics_list when the frame has it, otherwise the
+    comma-joined mechanics column.
+    """
+    if 'mechanics_list' in df.columns:
+        return MultiHot.from_lists(df['mechanics_list'])
+    return MultiHot.from_joined(df['mechanics'])
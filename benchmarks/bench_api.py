@@ -0,0 +1,86 @@
+"""
+API throughput and latency percentiles under concurrent in-process clients.
+
+Runs the real app (main.app) against a scratch SQLite database, or
+BENCH_DATABASE_URL, through httpx.ASGITransport. Scenarios:
+
+  home    GET /
+  game    GET /game/{game_id} for random games in the dataset
+  notes   GET /game/{game_id}/notes, with one request in five saving a note
+
+Latency is measured at the client, so it includes the in-process
+transport (a few hundred microseconds). Clients only overlap where the app
+awaits (database I/O, the threadpool), so for in-memory routes latency is
+close to service time.
+
+Usage: python -m benchmarks.bench_api [--dataset PATH] [--requests N] [--clients N] [--json PATH]
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+from typing import Dict
+
+from benchmarks.harness import generate_load, scratch_environment
+
+NOTE_GAMES = 200
+
+
+def scenarios(game_ids):
+    """Request generators by scenario name."""
+    def home(rng):
+        return 'GET', '/', None
+
+    def game(rng):
+        return 'GET', f'/game/{rng.choice(game_ids)}', None
+
+    def notes(rng):
+        game_id = rng.randrange(NOTE_GAMES)
+        if rng.random() < 0.2:
+            return 'POST', f'/game/{game_id}/notes', {'note_text': 'Benchmark note'}
+        return 'GET', f'/game/{game_id}/notes', None
+
+    return {'home': home, 'game': game, 'notes': notes}
+
+
+def run(dataset_path: str, requests: int, clients: int) -> Dict[str, Dict]:
+    """Load results by scenario, as dicts of LoadResult fields."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch_environment(tmp, dataset_path)
+        # Imported only now: the app is configured when it is imported
+        from main import app
+        from app.routes import datasets
+
+        async def run_all():
+            # One event loop for every scenario: the async engine's connections belong to it.
+            # The lifespan hook creates the tables and starts the dataset load
+            async with app.router.lifespan_context(app):
+                datasets.wait()
+                dataset = datasets.current.dataset
+                game_ids = [game['id'] for game in dataset.listing.page('bgg_rank', limit=len(dataset.index))['items']]
+                return {name: (await generate_load(app, make_request, clients=clients, requests=requests)).as_dict()
+                        for name, make_request in scenarios(game_ids).items()}
+
+        return asyncio.run(run_all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default='data/silver.csv')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    results = run(args.dataset, args.requests, args.clients)
+    print(f'{args.dataset}: {args.requests} requests per scenario, {args.clients} clients')
+    for name, result in results.items():
+        print(f"  {name:<6} {result['throughput']:8.0f} req/s | p50 {result['p50_ms']:6.2f} ms "
+              f"| p95 {result['p95_ms']:6.2f} ms | p99 {result['p99_ms']:6.2f} ms | errors {result['errors']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Parse a BGG /thing response with the old tree-based path vs iter_thing_items.
+
+The old path builds the whole tree with ET.fromstring and reads only each
+item's description; the streaming parser extracts every BoardGame field
+and discards items as it goes. Reports time per response and peak memory
+allocated while parsing.
+
+Usage: python -m benchmarks.bench_bgg_parse
+"""
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from app.utils.bgg_parser import iter_thing_items
+from tests.bgg_stub import item_xml, sample_games
+
+REPEAT = 20
+
+
+def tree_parse(body: bytes):
+    """The pre-streaming implementation, applied to every item."""
+    tree = ET.fromstring(body)
+    return [item.find('.//description').text.strip() for item in tree.iter('item')]
+
+
+def stream_parse(body: bytes):
+    return list(iter_thing_items(body))
+
+
+def make_response(items: int) -> bytes:
+    games = sample_games(items)
+    for game in games.values():
+        game['description'] = 'A long board game description. ' * 80
+        game['mechanics'] = [f'Mechanic {n}' for n in range(12)]
+    return ('<items>' + ''.join(item_xml(i, g) for i, g in games.items()) + '</items>').encode()
+
+
+def measure(func, body: bytes):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func(body)
+    seconds = (time.perf_counter() - start) / REPEAT
+    tracemalloc.start()
+    func(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+if __name__ == '__main__':
+    for items in (20, 1000):
+        body = make_response(items)
+        print(f'{items} items, {len(body) / 1e3:.0f} kB response')
+        for name, func in (('tree', tree_parse), ('stream', stream_parse)):
+            seconds, peak = measure(func, body)
+            print(f'  {name:<7} {seconds * 1000:7.2f} ms  peak {peak / 1e3:8.0f} kB')
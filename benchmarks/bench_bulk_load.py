@@ -0,0 +1,65 @@
+"""
+Load games into board_games with the old ORM loader vs bulk_load_games.
+
+The old loader built a BoardGame object per row and saved them with
+bulk_save_objects, committing every 1000 rows. bulk_load_games uses COPY
+into a staging table on PostgreSQL and batched multi-row inserts elsewhere.
+Reports rows/sec for each.
+
+Set BENCH_DATABASE_URL to a PostgreSQL URL to measure the COPY path (the
+board_games table there is replaced); without it a temporary SQLite file
+is used, which exercises the portable insert path.
+
+Usage: python -m benchmarks.bench_bulk_load [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, BoardGame
+from app.utils.load_games import bulk_load_games, prepare_games_frame
+from app.utils.snapshot import clean_games_frame
+from benchmarks.synthetic import make_games_frame
+
+
+def orm_load(engine, df):
+    """The pre-COPY loader."""
+    Base.metadata.create_all(bind=engine, tables=[BoardGame.__table__])
+    db = sessionmaker(bind=engine)()
+    try:
+        db.query(BoardGame).delete()
+        games_data = df.to_dict('records')
+        for i in range(0, len(games_data), 1000):
+            batch = games_data[i:i + 1000]
+            valid_columns = BoardGame.__table__.columns.keys()
+            filtered_batch = [{k: v for k, v in game.items() if k in valid_columns} for game in batch]
+            db.bulk_save_objects([BoardGame(**game) for game in filtered_batch])
+            db.commit()
+    finally:
+        db.close()
+
+
+def measure(name, func, engine, df):
+    start = time.perf_counter()
+    func(engine, df)
+    seconds = time.perf_counter() - start
+    print(f'  {name:<12} {seconds:7.2f} s  {len(df) / seconds:10,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    # Plain Python scalars: the ORM path can't bind numpy / pd.NA values
+    df = prepare_games_frame(clean_games_frame(make_games_frame(rows)))
+    orm_df = df.astype(object).where(df.notna(), None)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.getenv('BENCH_DATABASE_URL') or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url)
+        print(f'{rows} games into {engine.dialect.name}')
+        measure('orm', orm_load, engine, orm_df)
+        measure('bulk replace', bulk_load_games, engine, df)
+        measure('bulk upsert', lambda e, d: bulk_load_games(e, d, mode='upsert'), engine, df)
+        engine.dispose()
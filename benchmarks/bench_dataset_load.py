@@ -0,0 +1,78 @@
+"""
+Compare loading the dataset from CSV with loading its Parquet snapshot.
+
+"raw read_csv" is the old loader; "cleaned csv" is read_games_frame on the
+CSV, which also parses mechanics_list and fixes dtypes as the app now needs.
+"first load" is the same with DATASET_AUTO_SNAPSHOT on (the default), so it
+also writes the snapshot that every later load reads instead ("snapshot").
+
+Each load runs in a fresh interpreter, as it would in a new worker. Imports
+happen before the clock starts so only the dataset load is measured.
+
+Usage: python -m benchmarks.bench_dataset_load [dataset.csv]
+"""
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from app.utils.snapshot import snapshot_path, write_snapshot
+
+RUNS = 7
+
+CSV_LOAD = '''
+import time
+import pandas as pd
+start = time.perf_counter()
+df = pd.read_csv({path!r}, sep=',')
+print(time.perf_counter() - start)
+'''
+
+APP_LOAD = '''
+import time
+from app.dataset import APP_COLUMNS
+from app.utils.snapshot import read_games_frame
+start = time.perf_counter()
+df = read_games_frame({path!r}, columns=APP_COLUMNS)
+print(time.perf_counter() - start)
+'''
+
+
+def time_in_subprocess(code: str, auto_snapshot: bool = False, before_run=None) -> float:
+    timings = []
+    env = {**os.environ, 'LOGGING_LEVEL': 'WARNING', 'DATASET_AUTO_SNAPSHOT': str(auto_snapshot).lower()}
+    for _ in range(RUNS):
+        if before_run:
+            before_run()
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, env=env)
+        timings.append(float(output.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def run(csv_path: str):
+    with tempfile.TemporaryDirectory() as tmp:
+        # A copy, so the snapshot written by "first load" lands in tmp
+        csv_copy = shutil.copy(csv_path, os.path.join(tmp, 'games.csv'))
+        snapshot = write_snapshot(csv_path, os.path.join(tmp, 'snapshot.parquet'))
+
+        def remove_snapshot():
+            if os.path.exists(snapshot_path(csv_copy)):
+                os.remove(snapshot_path(csv_copy))
+
+        timings = {
+            'raw read_csv': time_in_subprocess(CSV_LOAD.format(path=csv_copy)),
+            'cleaned csv': time_in_subprocess(APP_LOAD.format(path=csv_copy), before_run=remove_snapshot),
+            'first load': time_in_subprocess(APP_LOAD.format(path=csv_copy), auto_snapshot=True,
+                                             before_run=remove_snapshot),
+            'snapshot': time_in_subprocess(APP_LOAD.format(path=snapshot)),
+        }
+        print(f'{csv_path}: {os.path.getsize(csv_path) / 1e6:.1f} MB csv, '
+              f'{os.path.getsize(snapshot) / 1e6:.1f} MB parquet (median of {RUNS} runs)')
+    for name, seconds in timings.items():
+        print(f'  {name:<13} {seconds * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    run(sys.argv[1] if len(sys.argv) > 1 else 'data/silver.csv')
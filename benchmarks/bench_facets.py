@@ -0,0 +1,57 @@
+"""
+Compare filtering with facet counts by DataFrame scan vs the FacetIndex.
+
+The scan is what /games/filter would do without indexes: boolean masks
+over the columns, then value_counts / cut for every facet.
+
+Usage: python -m benchmarks.bench_facets [rows ...]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from app.facets import RANGE_FACETS, FacetIndex, Filters
+from benchmarks.synthetic import make_games_frame
+
+REPEATS = 20
+FILTERS = Filters(mechanics=('Dice Rolling',), players=3, play_time=(30, 90), complexity_average=(2, 4))
+
+
+def scan(df):
+    """Filter and count facets straight from the DataFrame."""
+    mask = (df['mechanics'].str.split(', ').apply(lambda values: 'Dice Rolling' in values)
+            & (df['min_players'] <= 3) & (df['max_players'] >= 3)
+            & df['play_time'].between(30, 90) & df['complexity_average'].between(2, 4))
+    matching = df[mask]
+    counts = {
+        'mechanics': matching['mechanics'].str.split(', ').explode().value_counts().to_dict(),
+        'domains': matching['domains'].value_counts().to_dict(),
+    }
+    for column, edges in RANGE_FACETS.items():
+        counts[column] = pd.cut(matching[column], list(edges) + [float('inf')], right=False).value_counts()
+    return matching, counts
+
+
+def time_per_call(func) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - start) / REPEATS
+
+
+def run(rows: int):
+    df = make_games_frame(rows)
+    start = time.perf_counter()
+    index = FacetIndex(df)
+    build_seconds = time.perf_counter() - start
+    scanned = time_per_call(lambda: scan(df))
+    indexed = time_per_call(lambda: index.evaluate(FILTERS))
+    print(f'{rows:>9} rows | scan {scanned * 1000:8.2f} ms | index {indexed * 1000:6.2f} ms '
+          f'| speedup {scanned / indexed:5.0f}x | index build {build_seconds:.2f} s')
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20_000, 100_000]
+    for size in sizes:
+        run(size)
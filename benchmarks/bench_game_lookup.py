@@ -0,0 +1,46 @@
+"""
+Compare the old DataFrame scan in /game/{game_id} with the GameIndex lookup.
+
+Usage: python -m benchmarks.bench_game_lookup [rows ...]
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.dataset import GameIndex
+from benchmarks.synthetic import make_games_frame
+
+LOOKUPS = 200
+
+
+def scan_lookup(df, game_id):
+    """The pre-index implementation of get_game_details."""
+    return df[df['id'] == game_id].iloc[0].to_dict()
+
+
+def time_per_call(func, ids) -> float:
+    start = time.perf_counter()
+    for game_id in ids:
+        func(game_id)
+    return (time.perf_counter() - start) / len(ids)
+
+
+def run(rows: int):
+    df = make_games_frame(rows)
+    ids = np.random.default_rng(1).choice(df['id'].to_numpy(), LOOKUPS).tolist()
+
+    start = time.perf_counter()
+    index = GameIndex(df)
+    build_seconds = time.perf_counter() - start
+
+    scan = time_per_call(lambda game_id: scan_lookup(df, game_id), ids)
+    indexed = time_per_call(index.get, ids)
+    print(f'{rows:>9} rows | scan {scan * 1e6:10.1f} us | index {indexed * 1e6:6.2f} us '
+          f'| speedup {scan / indexed:8.0f}x | index build {build_seconds:.2f} s')
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20_000, 1_000_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,90 @@
+"""
+Insert and save games with the old list-based GAMES_DATA vs GameStore.
+
+The old store scanned the whole list on every insert and dumped the full
+list with indent=2 on every save. GameStore is a dict of slotted records
+that appends only changed games to a JSON lines log. A save follows every
+SAVE_EVERY inserts, as in an enrichment session. Memory is what each
+store holds after loading its saved file back.
+
+Usage: python -m benchmarks.bench_game_store
+"""
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.utils.enrich_store import GameStore
+from tests.bgg_stub import sample_games
+
+SAVE_EVERY = 100
+
+
+def make_games(count: int):
+    games = sample_games(count)
+    for game_id, game in games.items():
+        game['bgg_id'] = game_id
+        game['mechanics'] = ', '.join(game['mechanics'])
+        game['description'] = 'A long board game description. ' * 20
+    return games
+
+
+def list_session(games, path):
+    """The pre-GameStore implementation."""
+    data = []
+    for n, (game_id, game) in enumerate(games.items(), 1):
+        for i, existing in enumerate(data):
+            if existing.get('game_id') == game_id:
+                data[i] = game
+                break
+        else:
+            data.append(game)
+        if n % SAVE_EVERY == 0:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def list_load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def store_session(games, path):
+    store = GameStore(path)
+    for n, (game_id, game) in enumerate(games.items(), 1):
+        store.add(game_id, game)
+        if n % SAVE_EVERY == 0:
+            store.flush()
+    store.flush()
+
+
+def store_load(path):
+    store = GameStore(path)
+    store.load()
+    return store
+
+
+def measure(session, load, games):
+    """Session time and file size, then memory held after loading the file back."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'games')
+        start = time.perf_counter()
+        session(games, path)
+        seconds = time.perf_counter() - start
+        size = os.path.getsize(path)
+        tracemalloc.start()
+        loaded = load(path)
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del loaded
+    return seconds, size, held
+
+
+if __name__ == '__main__':
+    for count in (2_000, 20_000):
+        games = make_games(count)
+        print(f'{count} games')
+        for name, session, load in (('list', list_session, list_load), ('store', store_session, store_load)):
+            seconds, size, held = measure(session, load, games)
+            print(f'  {name:<6} {seconds:8.2f} s  file {size / 1e6:6.1f} MB  held {held / 1e6:6.1f} MB')
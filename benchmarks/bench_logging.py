@@ -0,0 +1,138 @@
+"""
+Request throughput with DEBUG logging, direct handlers vs the queued setup.
+
+"direct" is the old setup_logger: a FileHandler and a stdout StreamHandler
+on the logger, so every record is formatted and written inside the
+request. "queued" is app.utils.logger: records go on a queue and a
+listener thread writes them. The route logs like the real ones do per
+request (one info, two debug lines for the session open and close).
+stdout goes to a file, and then to a stream that takes 0.2 ms per write,
+like a container log pipe that is applying back-pressure. Best of
+ROUNDS runs each.
+
+A last line times a log call below the logger's level, f-string vs lazy.
+
+Usage: python -m benchmarks.bench_logging [requests]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.utils.logger import setup_logger, stop_logger
+
+CONCURRENCY = 32
+ROUNDS = 3
+
+logger = logging.getLogger(os.getenv('LOGGER_NAME', 'bgg_app'))
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/game/{game_id}')
+    async def game(game_id: int):
+        logger.info("Processing game request %s", game_id)
+        logger.debug('Creating new session for database')
+        logger.debug('Closing database session')
+        return {'id': game_id}
+
+    return app
+
+
+def direct_setup(log_file: str):
+    """The pre-queue setup_logger: handlers attached straight to the logger."""
+    logger.setLevel('DEBUG')
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+    return [file_handler, console_handler]
+
+
+async def drive(app: FastAPI, requests: int) -> float:
+    """Requests per second through the ASGI app with CONCURRENCY clients."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for game_id in remaining:
+                (await client.get(f'/game/{game_id}')).raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        return requests / (time.perf_counter() - start)
+
+
+class SlowStream:
+    """A stdout that blocks for ``delay`` seconds on every write."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, text: str):
+        time.sleep(self.delay)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def throughput(app: FastAPI, requests: int, directory: str, queued: bool) -> float:
+    best = 0.0
+    for _ in range(ROUNDS):
+        log_file = os.path.join(directory, 'queued.log' if queued else 'direct.log')
+        if queued:
+            setup_logger(level='DEBUG', log_file=log_file)
+        else:
+            handlers = direct_setup(log_file)
+        best = max(best, asyncio.run(drive(app, requests)))
+        if queued:
+            stop_logger()
+        else:
+            for handler in handlers:
+                logger.removeHandler(handler)
+                handler.close()
+    return best
+
+
+def run(requests: int):
+    app = make_app()
+    directory = tempfile.mkdtemp()
+    stop_logger()
+    for label, delay in (('stdout to file', None), ('slow stdout', 0.0002)):
+        console = open(os.path.join(directory, 'stdout.log'), 'w') if delay is None else SlowStream(delay)
+        real_stdout, sys.stdout = sys.stdout, console
+        try:
+            direct = throughput(app, requests, directory, queued=False)
+            queued = throughput(app, requests, directory, queued=True)
+        finally:
+            sys.stdout = real_stdout
+            if delay is None:
+                console.close()
+        print(f'{label:<15} | {requests} requests, DEBUG on | direct {direct:7.0f} req/s '
+              f'| queued {queued:7.0f} req/s | {queued / direct:5.2f}x')
+
+    logger.setLevel('INFO')
+    game_id, calls = 174430, 200_000
+    start = time.perf_counter()
+    for _ in range(calls):
+        logger.debug(f"Fetched game {game_id}")
+    eager = (time.perf_counter() - start) / calls
+    start = time.perf_counter()
+    for _ in range(calls):
+        logger.debug("Fetched game %s", game_id)
+    lazy = (time.perf_counter() - start) / calls
+    print(f'disabled debug  | f-string {eager * 1e9:5.0f} ns | lazy {lazy * 1e9:5.0f} ns')
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
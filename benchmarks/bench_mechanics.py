@@ -0,0 +1,65 @@
+"""
+Memory and mechanic-level aggregation: raw CSV columns vs the normalized ones.
+
+"raw" is what pd.read_csv gives: object columns of repeated strings and
+mechanics_list as stringified lists that each consumer parses (here, mean
+rating per mechanic the way the notebooks do it). "normalized" is
+read_games_frame's categoricals plus a MultiHot over mechanics.
+
+Usage: python -m benchmarks.bench_mechanics [dataset.csv]
+"""
+import ast
+import sys
+import time
+
+import pandas as pd
+
+from app.utils.snapshot import clean_games_frame
+from app.utils.vocabulary import mechanics_multi_hot
+
+COLUMNS = ['mechanics', 'domains', 'mechanics_list']
+REPEATS = 5
+
+
+def raw_rating_by_mechanic(df):
+    mechanics = df['mechanics_list'].apply(ast.literal_eval).explode().str.strip()
+    return df['rating_average'].reindex(mechanics.index).groupby(mechanics.to_numpy()).mean()
+
+
+def megabytes(frame) -> float:
+    return frame.memory_usage(deep=True).sum() / 1e6
+
+
+def best_of(func) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(csv_path: str):
+    raw = pd.read_csv(csv_path)
+    start = time.perf_counter()
+    normalized = clean_games_frame(raw)
+    multi_hot = mechanics_multi_hot(normalized)
+    normalize_seconds = time.perf_counter() - start
+
+    # The strings themselves are shared, so only the list objects count
+    list_bytes = sum(sys.getsizeof(items) for items in normalized['mechanics_list'])
+    multi_hot_bytes = multi_hot.indptr.nbytes + multi_hot.indices.nbytes
+    print(f'{len(raw)} games, {len(multi_hot.vocabulary)} mechanics, normalized in {normalize_seconds:.2f} s')
+    print(f'  mechanics + domains: raw {megabytes(raw[COLUMNS[:2]]):6.2f} MB '
+          f'| categorical {megabytes(normalized[COLUMNS[:2]]):6.2f} MB')
+    print(f'  mechanics_list:      raw {megabytes(raw[["mechanics_list"]]):6.2f} MB '
+          f'| interned lists {list_bytes / 1e6:6.2f} MB | multi-hot {multi_hot_bytes / 1e6:6.2f} MB')
+
+    parsed = best_of(lambda: raw_rating_by_mechanic(raw))
+    vectorized = best_of(lambda: multi_hot.summarize(normalized, ['rating_average']))
+    print(f'  rating by mechanic:  re-parse {parsed * 1000:7.1f} ms | multi-hot {vectorized * 1000:5.2f} ms '
+          f'| speedup {parsed / vectorized:4.0f}x')
+
+
+if __name__ == '__main__':
+    run(sys.argv[1] if len(sys.argv) > 1 else 'silver.csv')
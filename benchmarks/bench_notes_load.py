@@ -0,0 +1,133 @@
+"""
+Notes endpoint throughput under concurrent clients: sync vs async sessions.
+
+"sync" is the old implementation, where async endpoints call a blocking
+SQLAlchemy Session and every query stalls the event loop. "async" is the
+current one on an AsyncSession. Clients run in-process through
+httpx.ASGITransport; 80% of requests read a note and 20% save one.
+
+Set BENCH_DATABASE_URL to a PostgreSQL URL to measure against a real
+server (pool settings come from the DB_POOL_* variables); without it a
+temporary SQLite file is used.
+
+Usage: python -m benchmarks.bench_notes_load [requests_per_client]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models, schemas
+from app.database import engine_options, get_async_db, init_async_db
+from app.routes import get_game_notes, save_game_notes
+
+CLIENTS = (1, 8, 32, 64)
+GAMES = 200
+
+
+def sync_router(SessionLocal) -> APIRouter:
+    """The pre-async notes endpoints."""
+    router = APIRouter()
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @router.get("/game/{game_id}/notes")
+    async def get_notes(game_id: int, db: Session = Depends(get_db)):
+        note = db.query(models.GameNote).filter(models.GameNote.game_id == game_id).first()
+        if note is None:
+            return {"note_text": ""}
+        return note
+
+    @router.post("/game/{game_id}/notes")
+    async def save_notes(game_id: int, note: schemas.GameNoteCreate, db: Session = Depends(get_db)):
+        existing_note = db.query(models.GameNote).filter(models.GameNote.game_id == game_id).first()
+        if existing_note:
+            existing_note.note_text = note.note_text
+            db.commit()
+            db.refresh(existing_note)
+            return existing_note
+        new_note = models.GameNote(game_id=game_id, note_text=note.note_text)
+        db.add(new_note)
+        db.commit()
+        db.refresh(new_note)
+        return new_note
+
+    return router
+
+
+def async_app(url):
+    async_engine, AsyncSessionLocal = init_async_db(url)
+
+    async def get_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.add_api_route("/game/{game_id}/notes", get_game_notes, methods=["GET"])
+    app.add_api_route("/game/{game_id}/notes", save_game_notes, methods=["POST"])
+    app.dependency_overrides[get_async_db] = get_db
+    return app, async_engine
+
+
+async def client_loop(client, requests):
+    rng = random.Random()
+    for _ in range(requests):
+        game_id = rng.randrange(GAMES)
+        if rng.random() < 0.2:
+            response = await client.post(f'/game/{game_id}/notes', json={"note_text": "note"})
+        else:
+            response = await client.get(f'/game/{game_id}/notes')
+        response.raise_for_status()
+
+
+async def run(app, clients, requests):
+    """Requests per second, or None if the run failed (e.g. pool exhausted)."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(client_loop(client, requests) for _ in range(clients)))
+        except Exception as e:
+            print(f'    failed: {type(e).__name__}: {str(e).splitlines()[0]}')
+            return None
+        return clients * requests / (time.perf_counter() - start)
+
+
+def rate(value):
+    return f'{value:8.0f}' if value is not None else '  failed'
+
+
+
+async def main(url, requests):
+    # A short pool timeout: blocked checkouts on the event loop never recover
+    sync_engine = create_engine(url, **{**engine_options(url), 'pool_timeout': 5})
+    models.Base.metadata.create_all(bind=sync_engine, tables=[models.GameNote.__table__])
+    sync_app = FastAPI()
+    sync_app.include_router(sync_router(sessionmaker(bind=sync_engine)))
+    async_notes_app, async_engine = async_app(url)
+    print(f'{sync_engine.dialect.name}: requests/s by concurrent clients')
+    for clients in CLIENTS:
+        sync_rate = await run(sync_app, clients, requests)
+        async_rate = await run(async_notes_app, clients, requests)
+        print(f'  {clients:>3} clients  sync {rate(sync_rate)}  async {rate(async_rate)}')
+    await async_engine.dispose()
+    sync_engine.dispose()
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.getenv('BENCH_DATABASE_URL') or f"sqlite:///{os.path.join(tmp, 'notes.db')}"
+        asyncio.run(main(url, requests))
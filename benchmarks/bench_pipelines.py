@@ -0,0 +1,91 @@
+"""
+Micro-benchmarks for the data pipelines.
+
+  dataset_load   GameDataset.from_path: read the dataset and build every index
+  load_games     load_games_data into a scratch SQLite database (or
+                 BENCH_DATABASE_URL), replacing the table each run
+  enrich         enrich_games_file against the local stub BGG server
+                 (tests/bgg_stub.py) with rate limiting out of the way, so
+                 what is left is batching, parsing and journalling
+
+Each reports the median of RUNS runs.
+
+Usage: python -m benchmarks.bench_pipelines [--dataset PATH] [--games N] [--json PATH]
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+from typing import Dict
+
+import httpx
+
+from benchmarks.harness import median_seconds, scratch_environment
+
+RUNS = 3
+STUB_URL = 'http://bgg.test/xmlapi2'
+
+
+def run(dataset_path: str, games: int) -> Dict[str, Dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch_environment(tmp, dataset_path)
+        # Imported only now: the app is configured when it is imported
+        from app.dataset import GameDataset
+        from app.utils.bgg import enrich_games_file
+        from app.utils.load_games import load_games_data
+        from app.utils.snapshot import read_games_frame
+        from tests.bgg_stub import create_stub_app, sample_games
+
+        rows = len(read_games_frame(dataset_path, columns=['id']))
+        results = {}
+
+        seconds = median_seconds(lambda: GameDataset.from_path(dataset_path), RUNS)
+        results['dataset_load'] = {'rows': rows, 'seconds': round(seconds, 4)}
+
+        seconds = median_seconds(lambda: load_games_data(dataset_path), RUNS)
+        results['load_games'] = {'rows': rows, 'seconds': round(seconds, 4), 'rows_per_second': round(rows / seconds)}
+
+        stub_games = sample_games(games)
+        input_file = os.path.join(tmp, 'games.csv')
+        with open(input_file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['id', 'name'])
+            writer.writerows([game_id, game['name']] for game_id, game in stub_games.items())
+        stub = create_stub_app(stub_games)
+        runs = iter(range(RUNS))
+
+        def enrich():
+            # A new output file (and so journal) each run, so nothing is skipped as done
+            output_file = os.path.join(tmp, f'enriched_{next(runs)}.csv')
+            # enrich_games_file prints a line per batch
+            with contextlib.redirect_stdout(io.StringIO()):
+                enrich_games_file(input_file, output_file, cache_path=None, base_url=STUB_URL,
+                                  transport=httpx.ASGITransport(app=stub), rate=1e6, burst=1e6)
+
+        stub.state.requests.clear()
+        seconds = median_seconds(enrich, RUNS)
+        results['enrich'] = {'games': games, 'requests': len(stub.state.requests) // RUNS,
+                             'seconds': round(seconds, 4), 'games_per_second': round(games / seconds)}
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default='data/silver.csv')
+    parser.add_argument('--games', type=int, default=2000, help='Games served by the stub BGG server')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    results = run(args.dataset, args.games)
+    for name, result in results.items():
+        print(f'  {name:<13} ' + ' | '.join(f'{key} {value}' for key, value in result.items()))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Time /search queries against the in-process SearchIndex.
+
+Descriptions are drawn from a Zipf-distributed vocabulary so common terms
+have long posting lists, like real text. Queries are one or two word
+prefixes of varying length; the target is under 10 ms per query.
+
+Usage: python -m benchmarks.bench_search [rows ...]
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.search import SearchIndex
+from benchmarks.synthetic import make_games_frame
+
+VOCABULARY = 20_000
+WORDS_PER_DESCRIPTION = 120
+QUERIES = 300
+
+
+def make_words(rng) -> np.ndarray:
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    return np.array([''.join(rng.choice(letters, rng.integers(3, 10))) for _ in range(VOCABULARY)])
+
+
+def make_queries(rng, words) -> list:
+    queries = []
+    for _ in range(QUERIES):
+        picked = words[np.minimum(rng.zipf(1.2, rng.integers(1, 3)), VOCABULARY) - 1]
+        queries.append(' '.join(word[:rng.integers(2, len(word) + 1)] for word in picked))
+    return queries
+
+
+def run(rows: int):
+    rng = np.random.default_rng(0)
+    words = make_words(rng)
+    df = make_games_frame(rows)
+    ranks = np.minimum(rng.zipf(1.2, (rows, WORDS_PER_DESCRIPTION)), VOCABULARY) - 1
+    df['description'] = [' '.join(words[row]) for row in ranks]
+
+    start = time.perf_counter()
+    index = SearchIndex(df)
+    build_seconds = time.perf_counter() - start
+
+    timings = []
+    for query in make_queries(rng, words):
+        start = time.perf_counter()
+        index.search(query)
+        timings.append(time.perf_counter() - start)
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99]) * 1000
+    print(f'{rows:>9} rows | {len(index.terms):>6} terms | build {build_seconds:5.2f} s '
+          f'| p50 {p50:5.2f} ms | p95 {p95:5.2f} ms | p99 {p99:5.2f} ms')
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20_000, 100_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,83 @@
+"""
+Serialization cost and bytes on the wire for game payloads.
+
+"before" is what FastAPI does with a returned dict (jsonable_encoder, then
+json.dumps); "after" is app.responses.dumps (orjson when installed). Sizes
+are averaged over sampled detail payloads and listing/filter pages, raw and
+compressed with gzip and brotli; "stored" is a compressed detail payload
+served from the per-index cache rather than compressed per response.
+
+Usage: python -m benchmarks.bench_serialize [dataset path]
+"""
+import json
+import sys
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from app import responses
+from app.dataset import GameDataset
+from app.facets import Filters
+
+SAMPLES = 300
+
+
+def before(content) -> bytes:
+    """FastAPI's default JSONResponse path for a returned dict."""
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(',', ':')).encode('utf-8')
+
+
+def time_per_call(func, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def report(label, bodies):
+    encodings = ['gzip'] + (['br'] if responses.brotli is not None else [])
+    raw = np.mean([len(body) for body in bodies])
+    line = f'{label:<14} | raw {raw:8.0f} B'
+    for encoding in encodings:
+        sizes = [len(responses.compress(body, encoding)) for body in bodies]
+        seconds = time_per_call(lambda body: responses.compress(body, encoding), bodies)
+        line += f' | {encoding} {np.mean(sizes):7.0f} B ({np.mean(sizes) / raw:4.0%}, {seconds * 1e6:5.0f} us)'
+    print(line)
+
+
+def run(path: str):
+    dataset = GameDataset.from_path(path)
+    known = [game['id'] for game in dataset.listing.page('bgg_rank', limit=len(dataset.index))['items']]
+    ids = np.random.default_rng(1).choice(known, min(SAMPLES, len(known)), replace=False).tolist()
+    games = [json.loads(dataset.index.get(game_id)) for game_id in ids]
+    pages = [dataset.listing.page('rating_average', descending=True, limit=100)]
+    cursor = pages[0]['next_cursor']
+    for _ in range(9):
+        page = dataset.listing.page('rating_average', descending=True, cursor=cursor, limit=100)
+        pages.append(page)
+        cursor = page['next_cursor']
+    filtered = [dataset.filter(Filters(players=players), limit=50) for players in range(1, 9)]
+
+    print(f'serializer: {"orjson" if responses.orjson is not None else "json"}')
+    for label, contents in (('detail', games), ('listing x100', pages), ('filter x50', filtered)):
+        old = time_per_call(before, contents)
+        new = time_per_call(responses.dumps, contents)
+        print(f'{label:<14} | before {old * 1e6:8.1f} us | after {new * 1e6:7.1f} us | speedup {old / new:5.1f}x')
+
+    print()
+    details = [dataset.index.get(game_id) for game_id in ids]
+    report('detail', details)
+    report('listing x100', [responses.dumps(page) for page in pages])
+    report('filter x50', [responses.dumps(page) for page in filtered])
+
+    cache = responses.CompressedPayloads()
+    for game_id, body in zip(ids, details):
+        cache.get(game_id, body, 'gzip')
+    stored = time_per_call(lambda pair: cache.get(pair[0], pair[1], 'gzip'), list(zip(ids, details)))
+    print(f'detail stored  | gzip from cache {stored * 1e6:5.2f} us')
+
+
+if __name__ == '__main__':
+    run(sys.argv[1] if len(sys.argv) > 1 else 'data/combined_2020.csv')
@@ -0,0 +1,45 @@
+"""
+Time /game/{game_id}/similar lookups with the SimilarityIndex.
+
+"first" is a game's first request, which scores it against every game;
+"cached" is a repeat request served from the neighbour table.
+
+Usage: python -m benchmarks.bench_similar [rows ...]
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.similar import SimilarityIndex
+from benchmarks.synthetic import make_games_frame
+
+LOOKUPS = 200
+
+
+def run(rows: int):
+    df = make_games_frame(rows)
+    ids = np.random.default_rng(1).choice(df['id'].to_numpy(), LOOKUPS, replace=False).tolist()
+
+    start = time.perf_counter()
+    index = SimilarityIndex(df)
+    build_seconds = time.perf_counter() - start
+
+    first = []
+    for game_id in ids:
+        start = time.perf_counter()
+        index.similar(game_id)
+        first.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    for game_id in ids:
+        index.similar(game_id)
+    cached = (time.perf_counter() - start) / len(ids)
+    p50, p95 = np.percentile(first, [50, 95]) * 1000
+    print(f'{rows:>9} rows | first p50 {p50:6.2f} ms p95 {p95:6.2f} ms | cached {cached * 1e6:5.1f} us '
+          f'| index build {build_seconds:.2f} s')
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20_000, 200_000]
+    for size in sizes:
+        run(size)
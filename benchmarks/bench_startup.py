@@ -0,0 +1,101 @@
+"""
+Startup time of the web app, each run in a fresh interpreter.
+
+  import    python -c 'import main': what uvicorn (and every worker, and
+            the reloader on each change) waits for before it can listen
+  healthz   launching uvicorn until GET /healthz answers
+  ready     launching uvicorn until GET /readyz answers 200, i.e. the
+            dataset is loaded and its indexes built
+
+Before the app loaded its dataset in a lifespan hook, importing main did
+all of the work, so "import" took what "ready" takes now and nothing
+answered until then.
+
+Usage: python -m benchmarks.bench_startup [--dataset PATH] [--runs N] [--json PATH]
+"""
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.harness import scratch_environment
+
+RUNS = 5
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_import() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import main'], check=True)
+    return time.perf_counter() - start
+
+
+def time_server(timeout: float = 120) -> Dict[str, float]:
+    """Seconds from launching uvicorn to /healthz answering and to /readyz being 200."""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    timings = {}
+    try:
+        with httpx.Client(base_url=f'http://127.0.0.1:{port}', timeout=1) as client:
+            while 'ready' not in timings:
+                if time.perf_counter() - start > timeout or server.poll() is not None:
+                    raise RuntimeError('The server did not become ready')
+                try:
+                    if 'healthz' not in timings and client.get('/healthz').status_code == 200:
+                        timings['healthz'] = time.perf_counter() - start
+                    if client.get('/readyz').status_code == 200:
+                        timings['ready'] = time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+    return timings
+
+
+def run(dataset_path: str, runs: int) -> Dict[str, Dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        # The subprocesses inherit the scratch environment
+        scratch_environment(tmp, dataset_path)
+        imports: List[float] = [time_import() for _ in range(runs)]
+        servers = [time_server() for _ in range(runs)]
+    return {
+        'import': {'seconds': round(float(np.median(imports)), 4)},
+        'healthz': {'seconds': round(float(np.median([s['healthz'] for s in servers])), 4)},
+        'ready': {'seconds': round(float(np.median([s['ready'] for s in servers])), 4)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default='data/silver.csv')
+    parser.add_argument('--runs', type=int, default=RUNS)
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    results = run(args.dataset, args.runs)
+    print(f'{args.dataset}: median of {args.runs} runs')
+    for name, result in results.items():
+        print(f"  {name:<8} {result['seconds']:7.3f} s")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Per-worker memory with the dataset loaded from Parquet vs a mapped Arrow file.
+
+Starts 1, 4 and 8 worker processes that each load the dataset the way
+app.routes does and serve a few game lookups, then reads every worker's
+/proc/self/smaps_rollup while they are all alive. RSS counts shared pages
+in full for every process; PSS splits them between the processes sharing
+them, so total PSS is what the workers really cost together.
+
+Linux only. Usage: python -m benchmarks.bench_worker_memory [rows]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+
+from benchmarks.synthetic import make_games_frame
+
+WORKER_COUNTS = (1, 4, 8)
+
+
+def read_memory_kb() -> dict:
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': fields['Rss'],
+        'pss': fields['Pss'],
+        'private': fields['Private_Clean'] + fields['Private_Dirty'],
+    }
+
+
+def worker(path, loaded, results):
+    from app.dataset import GameDataset
+    if path is not None:
+        dataset = GameDataset.from_path(path)
+        for game_id in dataset.df['id'].head(200).tolist():
+            dataset.index.get(game_id)
+    loaded.wait()
+    results.put(read_memory_kb())
+    loaded.wait()
+
+
+def measure(path: str, workers: int) -> list:
+    context = multiprocessing.get_context('spawn')
+    loaded = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(path, loaded, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return samples
+
+
+def run(rows: int):
+    from app.utils.snapshot import write_snapshot
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'games.csv')
+        make_games_frame(rows).to_csv(csv_path)
+        paths = {
+            # Baseline: a worker that has imported the app but loaded no data
+            'none': None,
+            'parquet': write_snapshot(csv_path, os.path.join(tmp, 'games.parquet')),
+            'arrow': write_snapshot(csv_path, os.path.join(tmp, 'games.arrow')),
+        }
+        print(f'{rows} games, csv {os.path.getsize(csv_path) / 1e6:.0f} MB')
+        print(f'{"format":<8} {"workers":>7} {"rss/worker":>11} {"pss/worker":>11} '
+              f'{"private/worker":>15} {"total pss":>10}')
+        for name, path in paths.items():
+            for workers in (WORKER_COUNTS if path else WORKER_COUNTS[:1]):
+                samples = measure(path, workers)
+                mean = {key: sum(s[key] for s in samples) / len(samples) / 1024 for key in samples[0]}
+                total_pss = sum(s['pss'] for s in samples) / 1024
+                print(f'{name:<8} {workers:>7} {mean["rss"]:>8.0f} MB {mean["pss"]:>8.0f} MB '
+                      f'{mean["private"]:>12.0f} MB {total_pss:>7.0f} MB')
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,102 @@
+"""
+Shared pieces of the benchmark suite: a scratch environment for the app and
+an in-process HTTP load generator.
+
+The app reads its configuration when it is imported, so benchmarks call
+scratch_environment() first and import app modules after it.
+"""
+import asyncio
+import os
+import random
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import httpx
+import numpy as np
+
+# One request: method, path and an optional JSON body
+Request = Tuple[str, str, Optional[Dict]]
+
+
+def scratch_environment(directory: str, dataset_path: Optional[str] = None):
+    """
+    Point the app at a throwaway SQLite database in ``directory``.
+
+    BENCH_DATABASE_URL, when set, is used instead (e.g. a PostgreSQL
+    server). Logging drops to WARNING and dataset watching is off unless
+    already configured.
+    """
+    os.environ['DATABASE_URL'] = os.getenv('BENCH_DATABASE_URL') or f"sqlite:///{os.path.join(directory, 'bench.sqlite')}"
+    os.environ['LOG_FILE'] = os.path.join(directory, 'app.log')
+    os.environ.setdefault('LOGGING_LEVEL', 'WARNING')
+    os.environ['DATASET_WATCH_INTERVAL'] = '0'
+    if dataset_path:
+        os.environ['DATASET_PATH'] = dataset_path
+
+
+class LoadResult(NamedTuple):
+    requests: int
+    errors: int
+    seconds: float
+    throughput: float   # Requests per second
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    def as_dict(self) -> Dict:
+        return {field: round(value, 3) if isinstance(value, float) else value
+                for field, value in self._asdict().items()}
+
+
+async def generate_load(app, make_request: Callable[[random.Random], Request], clients: int = 16,
+                        requests: int = 2000, warmup: int = 50, seed: int = 0) -> LoadResult:
+    """
+    Drive an ASGI app in-process with ``clients`` concurrent clients.
+
+    Each client keeps one request in flight, so this is a closed loop:
+    throughput is how fast the app answers that many clients.
+
+    Args:
+        app: The ASGI app
+        make_request: Called with a per-client Random; returns the next request
+        clients (int): Concurrent clients
+        requests (int): Total requests, shared between the clients
+        warmup (int): Requests sent (and not measured) before starting
+        seed (int): Seeds the clients' Randoms, so runs send the same requests
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        warmup_rng = random.Random(seed)
+        for _ in range(warmup):
+            method, path, body = make_request(warmup_rng)
+            await client.request(method, path, json=body)
+
+        latencies = []
+        errors = 0
+        remaining = iter(range(requests))
+
+        async def client_loop(rng: random.Random):
+            nonlocal errors
+            for _ in remaining:
+                method, path, body = make_request(rng)
+                start = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 500:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(random.Random(seed + 1 + i)) for i in range(clients)))
+        seconds = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return LoadResult(len(latencies), errors, seconds, len(latencies) / seconds, p50, p95, p99)
+
+
+def median_seconds(func: Callable[[], object], runs: int = 5) -> float:
+    """Median wall time of ``func`` over ``runs`` calls."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
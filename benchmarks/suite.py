@@ -0,0 +1,142 @@
+"""
+Run the benchmark suite, save the results as JSON and compare with a
+previous run.
+
+Each part (bench_api, bench_pipelines, bench_startup) runs in a fresh interpreter against
+its own scratch database. Results go to benchmarks/results/ with the commit
+and machine they came from; every run is compared with the previous
+results file (or --compare), and metrics that got more than --threshold
+worse are flagged. The exit status is 1 when anything regressed, so the
+suite can gate CI.
+
+Usage: python -m benchmarks.suite [--quick] [--dataset PATH] [--compare FILE] [--output FILE]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# Metric names and which way is better
+HIGHER_IS_BETTER = {'throughput', 'rows_per_second', 'games_per_second'}
+LOWER_IS_BETTER = {'p50_ms', 'p95_ms', 'p99_ms', 'seconds'}
+
+# Arguments for each part, in full and --quick runs
+PARTS = {
+    'api': ('benchmarks.bench_api', ['--requests', '2000'], ['--requests', '300']),
+    'pipelines': ('benchmarks.bench_pipelines', ['--games', '2000'], ['--games', '200']),
+    'startup': ('benchmarks.bench_startup', ['--runs', '5'], ['--runs', '1']),
+}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_part(module: str, args: List[str]) -> Dict:
+    """Run one benchmark module in its own interpreter and return its results."""
+    with tempfile.NamedTemporaryFile(suffix='.json') as output:
+        subprocess.run([sys.executable, '-m', module, *args, '--json', output.name], check=True,
+                       env={**os.environ, 'LOGGING_LEVEL': 'WARNING'}, stdout=subprocess.DEVNULL)
+        with open(output.name) as f:
+            return json.load(f)
+
+
+def flatten(results: Dict) -> Dict[str, float]:
+    """part.scenario.metric -> value, for the metrics that have a direction."""
+    return {f'{part}.{name}.{metric}': value
+            for part, scenarios in results.items()
+            for name, metrics in scenarios.items()
+            for metric, value in metrics.items()
+            if metric in HIGHER_IS_BETTER or metric in LOWER_IS_BETTER}
+
+
+def compare(previous: Dict, current: Dict, threshold: float) -> List[Tuple[str, float, float, float, bool]]:
+    """
+    Metric-by-metric changes between two runs' results.
+
+    Returns:
+        list: (metric, previous, current, relative change, regressed) for
+        every metric in both runs; the change is positive when better
+    """
+    before, after = flatten(previous), flatten(current)
+    rows = []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        if not old:
+            continue
+        change = (new - old) / old
+        if key.rsplit('.', 1)[1] in LOWER_IS_BETTER:
+            change = -change
+        rows.append((key, old, new, change, change < -threshold))
+    return rows
+
+
+def latest_results(exclude: Optional[str] = None) -> Optional[str]:
+    paths = sorted(path for path in glob.glob(os.path.join(RESULTS_DIR, '*.json')) if path != exclude)
+    return paths[-1] if paths else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default='data/silver.csv')
+    parser.add_argument('--quick', action='store_true', help='Fewer requests and games, for a smoke run')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<time>-<commit>.json)')
+    parser.add_argument('--compare', help='Results file to compare with (default: the latest in benchmarks/results)')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative change counted as a regression')
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {}
+    for part, (module, full_args, quick_args) in PARTS.items():
+        print(f'Running {module}...', flush=True)
+        results[part] = run_part(module, ['--dataset', args.dataset, *(quick_args if args.quick else full_args)])
+
+    report = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': commit,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'dataset': args.dataset,
+            'quick': args.quick,
+        },
+        'results': results,
+    }
+    previous_path = args.compare or latest_results()
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {output}')
+
+    for key, value in flatten(results).items():
+        print(f'  {key:<32} {value:>12}')
+    if not previous_path:
+        return 0
+    with open(previous_path) as f:
+        previous = json.load(f)
+    if previous['meta'].get('quick') != args.quick or previous['meta'].get('dataset') != args.dataset:
+        print(f'Not comparing with {previous_path}: it was run with other settings')
+        return 0
+    rows = compare(previous['results'], results, args.threshold)
+    print(f"Compared with {previous_path} (commit {previous['meta'].get('commit')}):")
+    for key, old, new, change, regressed in rows:
+        print(f"  {key:<32} {old:>12} -> {new:>12}  {change:+7.1%}{'  REGRESSED' if regressed else ''}")
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Synthetic board game data for benchmarks
+"""
+import numpy as np
+import pandas as pd
+
+MECHANICS = [
+    'Action Queue', 'Action Retrieval', 'Area Majority / Influence',
+    'Cooperative Game', 'Deck Construction', 'Dice Rolling', 'Grid Movement',
+    'Hand Management', 'Hexagon Grid', 'Modular Board', 'Set Collection',
+    'Solo / Solitaire Game', 'Tile Placement', 'Variable Player Powers',
+    'Worker Placement',
+]
+DOMAINS = ['Strategy Games', 'Thematic Games', 'Family Games', 'Party Games', 'Wargames']
+
+
+def make_games_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build a DataFrame with the same columns as the silver dataset."""
+    rng = np.random.default_rng(seed)
+    mechanics = [
+        [MECHANICS[j] for j in rng.choice(len(MECHANICS), size=rng.integers(1, 6), replace=False)]
+        for _ in range(rows)
+    ]
+    min_players = rng.integers(1, 4, rows)
+    return pd.DataFrame({
+        'id': rng.permutation(rows * 2)[:rows] + 1,
+        'name': [f'Game {i}' for i in range(rows)],
+        'year_published': rng.integers(1950, 2022, rows),
+        'min_players': min_players,
+        'max_players': min_players + rng.integers(0, 6, rows),
+        'play_time': rng.integers(10, 240, rows),
+        'min_age': rng.integers(6, 18, rows),
+        'users_rated': rng.integers(30, 100000, rows),
+        'rating_average': rng.uniform(1, 10, rows).round(2),
+        'bgg_rank': np.arange(1, rows + 1),
+        'complexity_average': rng.uniform(1, 5, rows).round(2),
+        'owned_users': rng.integers(0, 150000, rows),
+        'mechanics': [', '.join(m) for m in mechanics],
+        'domains': rng.choice(DOMAINS, rows),
+        'mechanics_list': [str(m) for m in mechanics],
+        'description': ['A synthetic game used for benchmarking. ' * 10] * rows,
+    })
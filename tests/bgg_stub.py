@@ -0,0 +1,96 @@
+"""
+Local stand-in for the BoardGameGeek XML API
+
+Serves /xmlapi2/thing for a fixed set of games, with optional injected
+failures. Responses carry an ETag and honour If-None-Match. Use it
+in-process through httpx.ASGITransport, or run it as a real server with:
+uvicorn tests.bgg_stub:app --port 8001
+"""
+import hashlib
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from fastapi import FastAPI, Header, Response
+
+
+def sample_games(count: int = 3) -> Dict[str, Dict]:
+    """Games keyed by BGG id, shaped like the fields the stub serves."""
+    return {
+        str(1000 + i): {
+            'name': f'Stub Game {i}',
+            'description': f'Description of stub game {i}.',
+            'year_published': 2000 + i,
+            'min_players': 1,
+            'max_players': 4,
+            'play_time': 60,
+            'min_age': 10,
+            'users_rated': 100 * (i + 1),
+            'rating_average': 7.0 + i / 10,
+            'bgg_rank': i + 1,
+            'complexity_average': 2.5,
+            'owned_users': 50 * (i + 1),
+            'mechanics': ['Dice Rolling', 'Hand Management'],
+        }
+        for i in range(count)
+    }
+
+
+def item_xml(game_id: str, game: Dict) -> str:
+    """One <item> element in the shape BGG returns with stats=1."""
+    links = ''.join(
+        f'<link type="boardgamemechanic" id="{n}" value={quoteattr(m)}/>'
+        for n, m in enumerate(game.get('mechanics', []))
+    )
+    return (
+        f'<item type="boardgame" id="{game_id}">'
+        f'<name type="primary" sortindex="1" value={quoteattr(game["name"])}/>'
+        f'<description>{escape(game["description"])}</description>'
+        f'<yearpublished value="{game["year_published"]}"/>'
+        f'<minplayers value="{game["min_players"]}"/>'
+        f'<maxplayers value="{game["max_players"]}"/>'
+        f'<playingtime value="{game["play_time"]}"/>'
+        f'<minage value="{game["min_age"]}"/>'
+        f'{links}'
+        '<statistics page="1"><ratings>'
+        f'<usersrated value="{game["users_rated"]}"/>'
+        f'<average value="{game["rating_average"]}"/>'
+        '<ranks>'
+        f'<rank type="subtype" id="1" name="boardgame" friendlyname="Board Game Rank" value="{game["bgg_rank"]}"/>'
+        '</ranks>'
+        f'<owned value="{game["owned_users"]}"/>'
+        f'<averageweight value="{game["complexity_average"]}"/>'
+        '</ratings></statistics>'
+        '</item>'
+    )
+
+
+def create_stub_app(games: Optional[Dict[str, Dict]] = None, failures: Optional[List[int]] = None) -> FastAPI:
+    """
+    Build a stub BGG API.
+
+    Args:
+        games (dict): Games keyed by id; defaults to sample_games()
+        failures (list): Status codes returned, in order, for the first
+            requests before normal responses resume (e.g. [429, 503])
+    """
+    games = sample_games() if games is None else games
+    stub = FastAPI()
+    stub.state.requests = []
+    stub.state.failures = list(failures or [])
+
+    @stub.get('/xmlapi2/thing')
+    async def thing(id: str, stats: int = 0, if_none_match: Optional[str] = Header(None)):
+        stub.state.requests.append(id)
+        if stub.state.failures:
+            return Response(status_code=stub.state.failures.pop(0))
+        items = ''.join(item_xml(game_id, games[game_id]) for game_id in id.split(',') if game_id in games)
+        body = f'<?xml version="1.0" encoding="utf-8"?><items termsofuse="https://boardgamegeek.com/xmlapi/termsofuse">{items}</items>'
+        etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+        if if_none_match == etag:
+            return Response(status_code=304, headers={'ETag': etag})
+        return Response(content=body, media_type='text/xml', headers={'ETag': etag})
+
+    return stub
+
+
+app = create_stub_app()
@@ -1,7 +1,27 @@
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+
+# Configure before the app is imported: a scratch SQLite database rather
+# than PostgreSQL, the small dataset checked into data/, and logs kept out
+# of logs/
+_scratch = tempfile.mkdtemp(prefix='bgg-tests-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_scratch, 'test.sqlite')}")
+os.environ.setdefault('DATASET_PATH', 'data/combined_2020.csv')
+os.environ.setdefault('LOG_FILE', os.path.join(_scratch, 'app.log'))
+os.environ.setdefault('DATASET_WATCH_INTERVAL', '0')
+# Don't leave snapshots of the checked-in datasets in data/
+os.environ.setdefault('DATASET_AUTO_SNAPSHOT', 'false')
+
+from app.main import app  # noqa: E402
+from app.routes import datasets  # noqa: E402
+
 
 @pytest.fixture
 def client():
-    return TestClient(app) 
\ No newline at end of file
+    # Entering the client runs the lifespan hook, which starts the dataset load
+    with TestClient(app) as client:
+        datasets.wait(60)
+        yield client
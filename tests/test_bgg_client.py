@@ -0,0 +1,187 @@
+import asyncio
+import csv
+
+import httpx
+
+from app.utils.bgg import enrich_games_file
+from app.utils.bgg_cache import ResponseCache, cache_key
+from app.utils.bgg_client import BGGClient, TokenBucket
+from app.utils.bgg_parser import iter_thing_items
+from app.utils.enrich_store import (STATUS_NOT_FOUND, STATUS_SUCCESS, STATUS_TRANSIENT, EnrichmentJournal,
+                                    get_journal_file)
+from tests.bgg_stub import create_stub_app, item_xml, sample_games
+
+STUB_URL = 'http://bgg.test/xmlapi2'
+
+
+def stub_client(stub, **options):
+    options = {'rate': 1000, 'burst': 1000, 'backoff_base': 0.001, **options}
+    return BGGClient(base_url=STUB_URL, transport=httpx.ASGITransport(app=stub), **options)
+
+
+def test_parser_streams_board_game_fields():
+    games = sample_games(2)
+    body = '<items>' + ''.join(item_xml(game_id, game) for game_id, game in games.items()) + '</items>'
+    parsed = list(iter_thing_items(body.encode()))
+    assert [game['bgg_id'] for game in parsed] == ['1000', '1001']
+    assert parsed[1] == {
+        'bgg_id': '1001', 'name': 'Stub Game 1', 'description': 'Description of stub game 1.',
+        'year_published': 2001, 'min_players': 1, 'max_players': 4, 'play_time': 60, 'min_age': 10,
+        'users_rated': 200, 'rating_average': 7.1, 'bgg_rank': 2, 'owned_users': 100,
+        'complexity_average': 2.5, 'mechanics': 'Dice Rolling, Hand Management', 'domains': None,
+    }
+
+
+async def test_token_bucket_paces_acquisitions():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=1, clock=lambda: now[0])
+    await bucket.acquire()
+    # No tokens left: the next acquire has to wait for a refill
+    waiter = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    now[0] += 0.5
+    await asyncio.wait_for(waiter, 1)
+
+
+async def test_client_retries_rate_limits_and_server_errors():
+    stub = create_stub_app(failures=[429, 503])
+    async with stub_client(stub) as client:
+        details = await client.get_game_details('1000')
+    assert details['bgg_id'] == '1000'
+    assert details['description'] == 'Description of stub game 0.'
+    assert client.rate_limited == 1
+    assert len(stub.state.requests) == 3
+
+
+async def test_client_gives_up_after_max_retries():
+    stub = create_stub_app(failures=[429] * 5)
+    async with stub_client(stub, max_retries=2) as client:
+        assert await client.get_game_details('1000') is None
+    assert len(stub.state.requests) == 3
+
+
+async def test_batch_request_maps_items_back_to_ids():
+    stub = create_stub_app()
+    async with stub_client(stub) as client:
+        details = await client.get_games_details(['1002', '01000', '9999'])
+    assert stub.state.requests == ['1002,1000,9999']
+    assert details['01000']['description'] == 'Description of stub game 0.'
+    assert details['1002']['bgg_id'] == '1002'
+    assert details['9999'] is None
+
+
+def test_enrich_games_file_against_stub(tmp_path):
+    input_file = tmp_path / 'games.csv'
+    output_file = tmp_path / 'enriched.csv'
+    with open(input_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['id', 'name'])
+        writer.writeheader()
+        for game_id, game in sample_games().items():
+            writer.writerow({'id': game_id, 'name': game['name']})
+        writer.writerow({'id': '9999', 'name': 'Unknown'})
+
+    stub = create_stub_app()
+    enrich_games_file(str(input_file), str(output_file), base_url=STUB_URL,
+                      transport=httpx.ASGITransport(app=stub), rate=1000, burst=1000, cache_path=None)
+
+    with open(output_file, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['id'] for row in rows] == ['1000', '1001', '1002', '9999']
+    assert rows[1]['description'] == 'Description of stub game 1.'
+    assert rows[3]['description'] == ''
+    # All four ids fit in one batched request
+    assert len(stub.state.requests) == 1
+
+
+def test_enrich_games_file_resumes_from_journal(tmp_path):
+    input_file = tmp_path / 'games.csv'
+    output_file = tmp_path / 'enriched.csv'
+    with open(input_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['id', 'name'])
+        writer.writeheader()
+        for game_id, game in sample_games().items():
+            writer.writerow({'id': game_id, 'name': game['name']})
+
+    # A previous run got as far as game 1001
+    with EnrichmentJournal(get_journal_file(str(output_file))) as journal:
+        journal.append([('1001', {'description': 'From an earlier run.'})])
+
+    stub = create_stub_app()
+    enrich_games_file(str(input_file), str(output_file), base_url=STUB_URL,
+                      transport=httpx.ASGITransport(app=stub), rate=1000, burst=1000, cache_path=None)
+
+    assert stub.state.requests == ['1000,1002']
+    with open(output_file, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['id'] for row in rows] == ['1000', '1001', '1002']
+    assert rows[1]['description'] == 'From an earlier run.'
+
+
+def test_resume_skips_terminal_ids_and_retries_transient_failures(tmp_path):
+    input_file = tmp_path / 'games.csv'
+    output_file = tmp_path / 'enriched.csv'
+    with open(input_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['id', 'name'])
+        writer.writeheader()
+        for game_id in ['1000', '9999', '1001']:
+            writer.writerow({'id': game_id, 'name': ''})
+
+    def run(stub):
+        enrich_games_file(str(input_file), str(output_file), base_url=STUB_URL,
+                          transport=httpx.ASGITransport(app=stub), rate=1000, burst=1000, max_retries=0,
+                          cache_path=None)
+        return stub.state.requests
+
+    journal_file = get_journal_file(str(output_file))
+    assert run(create_stub_app(failures=[503])) == ['1000,9999,1001']
+    with EnrichmentJournal(journal_file) as journal:
+        assert journal.status('1001')[:2] == (STATUS_TRANSIENT, 1)
+
+    # Transient failures are retried and reach a final status
+    assert run(create_stub_app()) == ['1000,9999,1001']
+    with EnrichmentJournal(journal_file) as journal:
+        assert journal.status('1001')[:2] == (STATUS_SUCCESS, 2)
+        assert journal.status('9999')[:2] == (STATUS_NOT_FOUND, 2)
+
+    # Nothing left to do: resuming makes no requests at all
+    assert run(create_stub_app()) == []
+
+
+async def test_cached_games_skip_the_network_until_stale(tmp_path):
+    now = [0.0]
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), ttl=60, clock=lambda: now[0])
+    stub = create_stub_app()
+    async with stub_client(stub, cache=cache) as client:
+        await client.get_games_details(['1000', '9999'])
+        # Fresh hits, including the cached "not found", make no request
+        details = await client.get_games_details(['01000', '9999'])
+        assert details['01000']['bgg_id'] == '01000'
+        assert details['9999'] is None
+        assert stub.state.requests == ['1000,9999']
+
+        # Only the id that isn't cached is requested
+        await client.get_games_details(['1000', '1001'])
+        assert stub.state.requests[-1] == '1001'
+
+        # Stale entries are revalidated; an unchanged response is a 304
+        now[0] += 120
+        details = await client.get_games_details(['1000', '9999'])
+        assert details['1000']['description'] == 'Description of stub game 0.'
+        assert client.requests_sent == 3
+        assert cache.lookup(cache_key('1000', {'stats': 1})).fresh
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    now = [0.0]
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), max_entries=2, clock=lambda: now[0])
+    for key in ('a', 'b'):
+        now[0] += 1
+        cache.store([(key, {'key': key})])
+    now[0] += 1
+    cache.lookup('a')
+    now[0] += 1
+    cache.store([('c', None)])
+    assert len(cache) == 2
+    assert cache.lookup('b') is None
+    assert cache.lookup('a').data == {'key': 'a'}
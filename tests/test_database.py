@@ -0,0 +1,31 @@
+import pytest
+
+from app import database
+
+
+@pytest.fixture
+def no_database_config(monkeypatch):
+    for name in ('DATABASE_URL', 'DB_USERNAME', 'DB_PASSWORD', 'DB_HOST', 'DB_NAME'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(database, 'SQLITE_PATH', None)
+
+
+def test_missing_credentials_are_an_error_not_a_fallback(no_database_config, monkeypatch):
+    monkeypatch.setenv('DB_USERNAME', 'games')
+    with pytest.raises(RuntimeError, match='No database configured'):
+        database.database_url()
+
+
+def test_sqlite_only_when_asked_for(no_database_config, monkeypatch, tmp_path):
+    monkeypatch.setattr(database, 'SQLITE_PATH', str(tmp_path / 'games.sqlite'))
+    assert database.database_url().get_backend_name() == 'sqlite'
+    monkeypatch.setenv('DATABASE_URL', 'sqlite+aiosqlite:///games.sqlite')
+    assert database.database_url() == 'sqlite+aiosqlite:///games.sqlite'
+
+
+def test_postgres_from_credentials(no_database_config, monkeypatch):
+    monkeypatch.setenv('DB_USERNAME', 'games')
+    monkeypatch.setenv('DB_PASSWORD', 'secret')
+    url = database.database_url()
+    assert url.get_backend_name() == 'postgresql'
+    assert (url.username, url.host, url.database) == ('games', 'localhost', 'board_game_db')
@@ -0,0 +1,96 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.cursors import InvalidCursor, encode_cursor
+from app import dataset as dataset_module
+from app.dataset import GameDataset, GameIndex, GameListing, compute_home_stats
+
+
+def make_games():
+    return pd.DataFrame({
+        'id': [10, 20, 30],
+        'name': ['Alpha', 'Beta', 'Gamma'],
+        'rating_average': [7.5, np.nan, 8.1],
+        'users_rated': [100, 50, 300],
+        'complexity_average': [2.0, 3.0, 1.5],
+        'year_published': [2001, 2010, 2020],
+    })
+
+
+def test_game_index_returns_serialized_game():
+    index = GameIndex(make_games())
+    game = json.loads(index.get(10))
+    assert game['name'] == 'Alpha'
+    assert game['description'] is None
+    assert len(index) == 3
+
+
+def test_game_index_maps_nan_to_null_and_misses_to_none():
+    index = GameIndex(make_games())
+    assert json.loads(index.get(20))['rating_average'] is None
+    assert index.get(99) is None
+
+
+def test_home_stats_are_precomputed_once(monkeypatch):
+    calls = []
+
+    def counting(df):
+        calls.append(len(df))
+        return compute_home_stats(df)
+
+    monkeypatch.setattr(dataset_module, 'compute_home_stats', counting)
+    dataset = GameDataset(make_games())
+    assert dataset.home_stats is dataset.home_stats
+    assert calls == [3]
+
+    stats = dataset.home_stats
+    assert stats['total_games'] == 3
+    assert stats['avg_rating'] == '7.80'
+    assert [game['name'] for game in stats['recent_games']] == ['Gamma', 'Alpha', 'Beta']
+
+
+def collect_pages(listing, sort, descending, limit):
+    ids, cursor = [], None
+    while True:
+        page = listing.page(sort, descending=descending, cursor=cursor, limit=limit)
+        ids += [game['id'] for game in page['items']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            return ids
+
+
+def test_listing_pages_follow_sort_order_with_missing_values_last():
+    listing = GameListing(make_games())
+    assert collect_pages(listing, 'rating_average', True, 1) == [30, 10, 20]
+    assert collect_pages(listing, 'rating_average', False, 2) == [10, 30, 20]
+    assert collect_pages(listing, 'name', False, 5) == [10, 20, 30]
+
+
+def raw_cursor(value, game_id):
+    return base64.urlsafe_b64encode(json.dumps([value, game_id]).encode()).decode()
+
+
+@pytest.mark.parametrize('sort, cursor', [
+    ('name', raw_cursor(5, 1)),
+    ('name', raw_cursor({'a': 1}, 1)),
+    ('rating_average', raw_cursor('7.5', 10)),
+    ('rating_average', raw_cursor([7.5], 10)),
+    ('rating_average', raw_cursor(True, 10)),
+    ('rating_average', raw_cursor(7.5, '10')),
+    ('rating_average', raw_cursor(7.5, 10.5)),
+    ('rating_average', 'not a cursor'),
+])
+def test_listing_rejects_cursors_of_the_wrong_type(sort, cursor):
+    with pytest.raises(InvalidCursor):
+        GameListing(make_games()).page(sort, cursor=cursor, limit=1)
+
+
+def test_listing_accepts_its_own_cursors():
+    listing = GameListing(make_games())
+    assert listing.page('name', cursor=encode_cursor('Alpha', 10), limit=5)['items'][0]['id'] == 20
+    assert listing.page('rating_average', cursor=encode_cursor(None, 10), limit=5)['items'][0]['id'] == 20
+    assert listing.page('year_published', cursor=encode_cursor(2001, 10), limit=5)['items'][0]['id'] == 20
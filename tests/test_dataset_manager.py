@@ -0,0 +1,111 @@
+import os
+import threading
+
+from app.dataset_manager import DatasetManager
+
+
+class Builds:
+    """A build function that records calls and can be held or made to fail."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def __call__(self, path):
+        self.calls.append(path)
+        self.release.wait(5)
+        if self.fail:
+            raise ValueError('broken file')
+        return f'dataset {len(self.calls)}', f'page {len(self.calls)}'
+
+
+def test_reload_swaps_only_when_the_new_version_is_built():
+    builds = Builds()
+    manager = DatasetManager(builds, path='games.csv')
+    first = manager.load()
+    builds.release.clear()
+    assert manager.reload() is True
+    # Requests keep getting the published version while the build runs
+    assert manager.current is first
+    builds.release.set()
+    assert manager.wait(5)
+    assert manager.current.number == 2
+    assert manager.current.dataset == 'dataset 2'
+    # A request that took the old version still has it
+    assert first.dataset == 'dataset 1'
+
+
+def test_reloads_during_a_build_coalesce_into_one_more():
+    builds = Builds()
+    manager = DatasetManager(builds, path='a.csv')
+    manager.load()
+    builds.release.clear()
+    assert manager.reload() is True
+    assert manager.reload(path='b.csv') is False
+    assert manager.reload(path='c.csv') is False
+    builds.release.set()
+    assert manager.wait(5)
+    assert builds.calls[-1] == 'c.csv' and len(builds.calls) == 3
+    assert manager.current.path == 'c.csv'
+
+
+def test_failed_reload_keeps_the_current_version():
+    builds = Builds()
+    manager = DatasetManager(builds, path='games.csv')
+    first = manager.load()
+    builds.fail = True
+    manager.reload()
+    assert manager.wait(5)
+    assert manager.current is first
+
+
+def test_check_reloads_once_a_changed_file_is_stable(tmp_path):
+    path = tmp_path / 'games.parquet'
+    path.write_text('v1')
+    builds = Builds()
+    manager = DatasetManager(builds, path=str(path))
+    manager.load()
+    assert manager.check() is False
+    path.write_text('version 2')
+    os.utime(path, ns=(1, 1))
+    # First sighting of the change: wait for it to settle
+    assert manager.check() is False
+    assert manager.check() is True
+    assert manager.wait(5)
+    assert manager.current.number == 2
+    assert manager.check() is False
+
+
+class PausingLock:
+    """The manager's lock, with builder threads held just after they release it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.released = threading.Event()
+        self.resume = threading.Event()
+
+    def __enter__(self):
+        self._lock.acquire()
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+        if threading.current_thread().name == 'dataset-reload':
+            self.released.set()
+            self.resume.wait(5)
+
+
+def test_reload_while_the_last_build_is_finishing_is_not_lost():
+    builds = Builds()
+    manager = DatasetManager(builds, path='a.csv')
+    manager.load()
+    manager._lock = lock = PausingLock()
+    assert manager.reload() is True
+    # The builder found nothing pending and is on its way out, but still alive
+    assert lock.released.wait(5)
+    assert manager.reload(path='b.csv') is True
+    lock.resume.set()
+    assert manager.wait(5)
+    assert builds.calls == ['a.csv', 'a.csv', 'b.csv']
+    assert manager.current.path == 'b.csv'
@@ -0,0 +1,49 @@
+from app.utils.enrich_store import EnrichmentJournal, GameRecord, GameStore
+from app.utils.snapshot import read_games_frame
+
+
+def test_game_store_replaces_by_id_and_keeps_extra_keys():
+    store = GameStore()
+    store.add('1000', {'bgg_id': '1000', 'name': 'Old'})
+    store.add(1000, {'bgg_id': '1000', 'name': 'New', 'source': 'test'})
+    assert len(store) == 1
+    game = store.get('1000')
+    assert game['name'] == 'New'
+    assert game['source'] == 'test'
+    assert game['description'] is None
+    assert not hasattr(GameRecord({}), '__dict__')
+
+
+def test_game_store_flush_appends_only_changes(tmp_path):
+    path = tmp_path / 'games.jsonl'
+    store = GameStore(str(path))
+    store.add('1', {'name': 'One'})
+    store.add('2', {'name': 'Two'})
+    assert store.flush() == 2
+    store.add('2', {'name': 'Two, revised'})
+    assert store.flush() == 1
+    assert store.flush() == 0
+    assert len(path.read_text().splitlines()) == 3
+
+    # A torn line from an interrupted write is ignored; later lines win
+    with open(path, 'a') as f:
+        f.write('{"id": "3", "na')
+    reloaded = GameStore(str(path))
+    assert reloaded.load() == 2
+    assert reloaded.get('2')['name'] == 'Two, revised'
+    # ...and the log is rewritten without it
+    assert len(path.read_text().splitlines()) == 2
+
+
+def test_journal_compacts_to_a_parquet_snapshot(tmp_path):
+    input_file = tmp_path / 'games.csv'
+    input_file.write_text('id,name,year_published\n1,One,2000\n2,Two,\n', encoding='utf-8')
+    output_file = tmp_path / 'enriched.parquet'
+    with EnrichmentJournal(str(tmp_path / 'journal.sqlite')) as journal:
+        journal.append([('1', {'description': 'First game'})])
+        assert journal.compact(str(input_file), str(output_file)) == 2
+    df = read_games_frame(str(output_file))
+    assert df['description'].tolist()[0] == 'First game'
+    assert df['name'].tolist() == ['One', 'Two']
+    assert sorted(path.name for path in tmp_path.iterdir()) == \
+        ['enriched.parquet', 'games.csv', 'journal.sqlite']
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from app.dataset import SORT_KEYS, GameDataset
+from app.facets import FacetIndex, Filters
+from app.similar import SimilarityIndex
+from app.games_db import DatabaseGames
+from app.utils.load_games import bulk_load_games
+
+MECHANICS = ['Dice Rolling', 'Hand Management', 'Set Collection', 'Tile Placement']
+
+
+def make_games(rows=60):
+    rng = np.random.default_rng(1)
+    min_players = rng.integers(1, 4, rows)
+    return pd.DataFrame({
+        'id': rng.permutation(rows * 2)[:rows] + 1,
+        'name': [f'Game {i}' for i in range(rows)],
+        'year_published': rng.choice([1985.0, 2005.0, 2015.0, np.nan], rows),
+        'min_players': min_players,
+        'max_players': min_players + rng.integers(0, 4, rows),
+        'play_time': rng.choice([20, 45, 90, 200], rows),
+        'users_rated': rng.integers(0, 1000, rows),
+        'rating_average': rng.choice([6.0, 7.0, 8.0, np.nan], rows),
+        'bgg_rank': np.arange(1, rows + 1),
+        'complexity_average': rng.uniform(1, 5, rows).round(1),
+        'mechanics': [', '.join(rng.choice(MECHANICS, rng.integers(0, 3), replace=False)) for _ in range(rows)],
+        'domains': rng.choice(['Family Games', 'Strategy Games, Thematic Games', None], rows),
+    })
+
+
+def expected_ids(df, mechanic, players, max_play_time):
+    has_mechanic = df['mechanics'].str.split(', ').apply(lambda values: mechanic in values)
+    plays = (df['min_players'] <= players) & (df['max_players'] >= players)
+    return set(df.loc[has_mechanic & plays & (df['play_time'] <= max_play_time), 'id'])
+
+
+def collect_filtered(games, filters, sort, descending, limit):
+    ids, cursor = [], None
+    while True:
+        page = games.filter(filters, sort=sort, descending=descending, cursor=cursor, limit=limit)
+        ids += [game['id'] for game in page['items']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            return ids, page
+
+
+def test_filters_match_a_dataframe_scan():
+    df = make_games()
+    index = FacetIndex(df)
+    result = index.evaluate(Filters(mechanics=('Dice Rolling',), players=3, play_time=(None, 90)))
+    assert set(df['id'][result.mask]) == expected_ids(df, 'Dice Rolling', 3, 90)
+    assert result.total == result.mask.sum()
+    assert index.evaluate(Filters(mechanics=('Dice Rolling', 'Unknown'))).total == 0
+    assert index.evaluate(Filters(domains=('Strategy Games', 'Thematic Games'))).total == \
+        (df['domains'] == 'Strategy Games, Thematic Games').sum()
+
+
+def test_facet_counts():
+    df = make_games()
+    counts = FacetIndex(df).evaluate(Filters(mechanics=('Hand Management',), play_time=(40, 100))).counts
+    matching = df[df['mechanics'].str.contains('Hand Management') & df['play_time'].between(40, 100)]
+    # Value facets count within the result
+    assert counts['mechanics']['Hand Management'] == len(matching)
+    assert counts['mechanics'].get('Tile Placement', 0) == matching['mechanics'].str.contains('Tile').sum()
+    # A range facet leaves out its own filter
+    with_mechanic = df[df['mechanics'].str.contains('Hand Management')]
+    assert counts['play_time']['180-240'] == (with_mechanic['play_time'] == 200).sum()
+    assert counts['players']['2'] == ((matching['min_players'] <= 2) & (matching['max_players'] >= 2)).sum()
+    assert sum(counts['year_published'].values()) == matching['year_published'].notna().sum()
+
+
+def test_filtered_pages_follow_listing_order(tmp_path):
+    df = make_games()
+    memory = GameDataset(df)
+    engine = create_engine(f"sqlite:///{tmp_path / 'games.db'}")
+    bulk_load_games(engine, df)
+    database = DatabaseGames(engine)
+    filters = Filters(players=2, complexity_average=(2, 4.5))
+    selected = set(df['id'][memory.facets.evaluate(filters).mask])
+    for sort in SORT_KEYS:
+        for descending in (False, True):
+            everything = [game['id'] for game in memory.listing.page(sort, descending, limit=len(df))['items']]
+            ids, last_page = collect_filtered(memory, filters, sort, descending, limit=7)
+            assert ids == [game_id for game_id in everything if game_id in selected]
+            assert last_page['total'] == len(selected)
+            assert collect_filtered(database, filters, sort, descending, limit=7)[0] == ids
+
+
+def test_nullable_integer_columns_with_gaps():
+    # clean_games_frame stores integer columns with gaps as Int32, with pd.NA
+    df = make_games()
+    df['year_published'] = df['year_published'].astype('Int32')
+    df['min_players'] = df['min_players'].astype('Int32').mask(df.index % 5 == 0)
+    index = FacetIndex(df)
+    result = index.evaluate(Filters(year_published=(2000, None), players=2))
+    plays = (df['min_players'] <= 2) & (df['max_players'] >= 2)
+    assert set(df['id'][result.mask]) == set(df.loc[(df['year_published'] >= 2000) & plays, 'id'].dropna())
+    # The year facet leaves out its own filter, so it counts the dated games that fit the players
+    assert sum(result.counts['year_published'].values()) == df.loc[plays.fillna(False), 'year_published'].notna().sum()
+    SimilarityIndex(df).similar(int(df['id'][0]))
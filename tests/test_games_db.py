@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event
+
+from app.cursors import InvalidCursor
+from app.dataset import SORT_KEYS, GameDataset
+from app.games_db import DatabaseGames
+from app.utils.load_games import bulk_load_games
+from tests.test_dataset import collect_pages, raw_cursor
+
+
+def make_games(rows=40):
+    rng = np.random.default_rng(0)
+    ratings = rng.choice([6.5, 7.0, 7.5, np.nan], rows)
+    return pd.DataFrame({
+        'id': rng.permutation(rows * 3)[:rows] + 1,
+        'name': [f'Game {i % 7}' for i in range(rows)],
+        'year_published': pd.array(rng.choice([1990, 2000, None], rows), dtype='Int32'),
+        'users_rated': rng.integers(0, 5, rows),
+        'rating_average': ratings,
+        'bgg_rank': pd.array(rng.choice([1, 2, None], rows), dtype='Int32'),
+        'complexity_average': rng.uniform(1, 5, rows),
+        'mechanics': ['Dice Rolling, Hand Management'] * rows,
+        'description': ['A game.'] * rows,
+    })
+
+
+def load(tmp_path, df):
+    engine = create_engine(f"sqlite:///{tmp_path / 'games.db'}")
+    bulk_load_games(engine, df)
+    return DatabaseGames(engine)
+
+
+def test_database_listing_matches_in_memory_listing(tmp_path):
+    df = make_games()
+    games = load(tmp_path, df)
+    memory = GameDataset(df)
+    for sort in SORT_KEYS:
+        for descending in (False, True):
+            expected = collect_pages(memory.listing, sort, descending, 7)
+            assert collect_pages(games.listing, sort, descending, 7) == expected, (sort, descending)
+
+
+def test_database_listing_rejects_cursors_of_the_wrong_type(tmp_path):
+    games = load(tmp_path, make_games())
+    for sort, cursor in (('name', raw_cursor(5, 1)), ('rating_average', raw_cursor('7', 1)),
+                         ('rating_average', raw_cursor(7.0, [1]))):
+        with pytest.raises(InvalidCursor):
+            games.listing.page(sort, cursor=cursor, limit=5)
+
+
+def test_database_detail_and_stats(tmp_path):
+    df = make_games()
+    games = load(tmp_path, df)
+    game_id = int(df['id'][0])
+    game = json.loads(games.index.get(game_id))
+    assert game['id'] == game_id
+    assert game['mechanics_list'] == ['Dice Rolling', 'Hand Management']
+    assert list(game)[-2:] == ['mechanics_list', 'description']
+    assert games.index.get(-1) is None
+
+    stats = games.home_stats
+    assert stats['total_games'] == len(df)
+    assert stats['avg_rating'] == f"{df['rating_average'].mean():.2f}"
+    # Cached until the TTL runs out
+    assert games.home_stats is stats
+
+
+def test_sort_keys_have_an_index_per_direction():
+    from app.models import LISTING_SORT_KEYS
+    assert set(LISTING_SORT_KEYS) == set(SORT_KEYS)
+
+
+def test_listing_pages_are_index_range_scans(tmp_path):
+    games = load(tmp_path, make_games())
+    statements = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    event.listen(games.engine, 'before_cursor_execute', record)
+    for sort in SORT_KEYS:
+        for descending in (False, True):
+            collect_pages(games.listing, sort, descending, 7)
+    event.remove(games.engine, 'before_cursor_execute', record)
+    with games.engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = ' '.join(row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters))
+            assert 'TEMP B-TREE' not in plan, (statement, plan)
+            assert 'USING INDEX' in plan or 'USING COVERING INDEX' in plan, plan
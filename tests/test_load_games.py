@@ -0,0 +1,81 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.models import BoardGame
+from app.utils.load_games import _copy_load, bulk_load_games, prepare_games_frame
+
+
+def games_frame(names):
+    return pd.DataFrame({
+        'id': list(range(1, len(names) + 1)),
+        'name': names,
+        'rating_average': [7.0] * len(names),
+        'bgg_rank': pd.array([1] + [None] * (len(names) - 1), dtype='Int32'),
+    })
+
+
+def test_bulk_load_replaces_then_upserts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'games.db'}")
+    assert bulk_load_games(engine, games_frame(['A', 'B', 'B again'])) == 3
+    assert bulk_load_games(engine, games_frame(['A', 'B'])) == 2
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE board_games SET note = 'keep me' WHERE bgg_id = 2"))
+
+    upsert = games_frame(['A', 'B renamed', 'C'])
+    bulk_load_games(engine, upsert, mode='upsert')
+    with engine.connect() as connection:
+        rows = connection.execute(text(
+            "SELECT bgg_id, name, note, bgg_rank FROM board_games ORDER BY bgg_id")).all()
+    assert [tuple(row) for row in rows] == [
+        (1, 'A', None, 1), (2, 'B renamed', 'keep me', None), (3, 'C', None, None)]
+
+
+class RecordingConnection:
+    """A DB-API connection that records statements, grouped by transaction."""
+
+    def __init__(self):
+        self.transactions = [[]]
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, statement, parameters=None):
+        self.transactions[-1].append(statement)
+
+    def copy_expert(self, statement, buffer):
+        self.transactions[-1].append(statement)
+
+    def fetchone(self):
+        return ('board_games_id_seq',)
+
+    def commit(self):
+        self.transactions.append([])
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_replace_builds_indexes_before_the_swap():
+    engine = create_engine('postgresql://games@localhost/games')
+    connection = RecordingConnection()
+    engine.raw_connection = lambda: connection
+    _copy_load(engine, prepare_games_frame(games_frame(['A', 'B'])), 'replace')
+    build, swap, after = connection.transactions
+    assert after == []
+    assert sum('CREATE' in statement and 'INDEX' in statement for statement in build) == \
+        len(BoardGame.__table__.indexes)
+    assert any('PRIMARY KEY' in statement for statement in build)
+    # The transaction holding board_games' exclusive lock only renames and drops
+    assert all(statement.startswith(('SELECT pg_get_serial_sequence', 'ALTER TABLE', 'ALTER SEQUENCE',
+                                     'ALTER INDEX', 'DROP TABLE')) for statement in swap)
+    assert 'ALTER INDEX ix_board_games_search_new RENAME TO ix_board_games_search' in swap
+    assert not any('ADD' in statement for statement in swap)
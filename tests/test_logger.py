@@ -0,0 +1,25 @@
+import logging
+import logging.handlers
+import os
+
+from app.utils.logger import setup_logger, stop_logger
+
+
+def queue_handlers(logger):
+    return [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]
+
+
+def test_setup_is_idempotent_and_writes_in_the_background(tmp_path):
+    stop_logger()
+    log_file = tmp_path / 'app.log'
+    try:
+        logger = setup_logger(level='DEBUG', log_file=str(log_file))
+        assert setup_logger(level='DEBUG') is logger
+        assert len(queue_handlers(logger)) == 1
+        logger.debug("Fetched game %s in %.1f ms", 174430, 1.25)
+        stop_logger()
+        assert not queue_handlers(logger)
+        assert 'DEBUG - Fetched game 174430 in 1.2 ms' in log_file.read_text()
+    finally:
+        stop_logger()
+        setup_logger(level=os.getenv('LOGGING_LEVEL', 'INFO'))
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.metrics import TimedRoute, instrument_engine, metrics_response
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_routes_record_latency_by_template_and_status():
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get('/things/{thing_id}')
+    async def get_thing(thing_id: int):
+        if thing_id == 0:
+            raise HTTPException(status_code=404, detail='Not found')
+        return {'id': thing_id}
+
+    @router.get('/metrics')
+    async def metrics():
+        return metrics_response()
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    labels = {'method': 'GET', 'route': '/things/{thing_id}'}
+    ok = sample('http_request_duration_seconds_count', status='200', **labels)
+    missing = sample('http_request_duration_seconds_count', status='404', **labels)
+    invalid = sample('http_request_duration_seconds_count', status='422', **labels)
+    failed = sample('http_request_duration_seconds_count', status='500', **labels)
+    client.get('/things/1')
+    client.get('/things/2')
+    client.get('/things/0')
+    assert client.get('/things/abc').status_code == 422
+    assert sample('http_request_duration_seconds_count', status='200', **labels) == ok + 2
+    assert sample('http_request_duration_seconds_count', status='404', **labels) == missing + 1
+    assert sample('http_request_duration_seconds_count', status='422', **labels) == invalid + 1
+    assert sample('http_request_duration_seconds_count', status='500', **labels) == failed
+    assert sample('http_requests_in_flight', **labels) == 0
+
+    response = client.get('/metrics')
+    assert response.headers['content-type'].startswith('text/plain')
+    assert 'http_request_duration_seconds_bucket{le="0.0005",method="GET",route="/things/{thing_id}"' in response.text
+
+
+def test_engine_connections_are_tracked(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    instrument_engine(engine, 'test')
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+        assert sample('db_connections_in_use', pool='test') == 1
+    assert sample('db_connections_in_use', pool='test') == 0
+    assert sample('db_connection_held_seconds_count', pool='test') == 1
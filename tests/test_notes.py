@@ -0,0 +1,39 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+
+from app.database import get_async_db, init_async_db
+from app.models import Base
+from app.routes import router
+
+
+def notes_app(tmp_path):
+    url = f"sqlite:///{tmp_path / 'notes.db'}"
+    Base.metadata.create_all(bind=create_engine(url))
+    async_engine, AsyncSessionLocal = init_async_db(url)
+
+    async def override():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_db] = override
+    return app, async_engine
+
+
+async def test_notes_round_trip_on_async_sessions(tmp_path):
+    app, async_engine = notes_app(tmp_path)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        assert (await client.get('/game/7/notes')).json() == {"note_text": ""}
+        created = (await client.post('/game/7/notes', json={"note_text": "first"})).json()
+        assert created['game_id'] == 7 and created['created_at']
+        # Concurrent requests each get their own session
+        responses = await asyncio.gather(*(client.get('/game/7/notes') for _ in range(10)))
+        assert {r.json()['note_text'] for r in responses} == {"first"}
+        updated = (await client.post('/game/7/notes', json={"note_text": "second"})).json()
+        assert updated['id'] == created['id']
+        assert (await client.get('/game/7/notes')).json()['note_text'] == "second"
+    await async_engine.dispose()
@@ -0,0 +1,60 @@
+import gzip
+import json
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app import responses
+from app.responses import CompressedPayloads, dumps, encoded_response, json_response, negotiate_encoding
+
+
+def test_dumps_handles_numpy_and_nan():
+    body = dumps({'id': np.int64(3), 'score': np.float32(0.5), 'rows': np.arange(2), 'rating': float('nan')})
+    assert json.loads(body) == {'id': 3, 'score': 0.5, 'rows': [0, 1], 'rating': None}
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding('identity') is None
+    assert negotiate_encoding('gzip, deflate') == 'gzip'
+    assert negotiate_encoding('gzip;q=0.5, br') == 'br'
+    assert negotiate_encoding('br;q=0, gzip') == 'gzip'
+    assert negotiate_encoding('*;q=0') is None
+    assert negotiate_encoding('*') == ('br' if responses.brotli is not None else 'gzip')
+
+
+def test_compressed_payloads_are_made_once():
+    cache = CompressedPayloads(max_entries=2)
+    body = b'{"name":"Game"}' * 100
+    first = cache.get(1, body, 'gzip')
+    assert gzip.decompress(first) == body
+    assert cache.get(1, body, 'gzip') is first
+    cache.get(2, body, 'gzip')
+    cache.get(3, body, 'gzip')
+    assert len(cache) == 2
+
+
+def test_responses_are_compressed_when_asked_for():
+    app = FastAPI()
+    payload = {'items': [{'id': i, 'name': f'Game {i}'} for i in range(100)]}
+
+    @app.get('/dynamic')
+    async def dynamic(request: Request):
+        return json_response(request, payload)
+
+    @app.get('/small')
+    async def small(request: Request):
+        return encoded_response(request, b'{}')
+
+    client = TestClient(app)
+    plain = client.get('/dynamic', headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in plain.headers
+    assert plain.headers['vary'] == 'Accept-Encoding'
+    assert plain.json() == payload
+    compressed = client.get('/dynamic', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['content-encoding'] == 'gzip'
+    assert int(compressed.headers['content-length']) < len(plain.content)
+    assert compressed.json() == payload
+    # Too small to be worth it
+    assert 'content-encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
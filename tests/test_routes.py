@@ -0,0 +1,122 @@
+import base64
+import json
+
+import pytest
+
+from app import routes
+from app.routes import datasets
+
+# A game in data/combined_2020.csv, the dataset the tests serve
+AEOLIS = 281257
+
+
+def test_home_page_has_an_etag(client):
+    response = client.get('/', headers={'Accept-Encoding': 'identity'})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/html')
+    etag = response.headers['etag']
+    assert etag.startswith('"') and etag.endswith('"')
+    assert 'content-encoding' not in response.headers
+
+
+@pytest.mark.parametrize('if_none_match', ['{etag}', 'W/{etag}', '"other", {etag}', '*'])
+def test_home_page_is_not_modified_when_the_etag_matches(client, if_none_match):
+    etag = client.get('/', headers={'Accept-Encoding': 'identity'}).headers['etag']
+    response = client.get('/', headers={'Accept-Encoding': 'identity',
+                                        'If-None-Match': if_none_match.format(etag=etag)})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == etag
+
+
+def test_each_encoding_of_the_home_page_has_its_own_etag(client):
+    etags = {}
+    for encoding in ('identity', 'gzip', 'br'):
+        response = client.get('/', headers={'Accept-Encoding': encoding})
+        assert response.status_code == 200
+        etags[encoding] = response.headers['etag']
+    assert etags['gzip'] == etags['identity'][:-1] + '-gzip"'
+    assert etags['br'] == etags['identity'][:-1] + '-br"'
+    # An encoded representation doesn't validate another one
+    response = client.get('/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etags['identity']})
+    assert response.status_code == 200
+    response = client.get('/', headers={'Accept-Encoding': 'identity', 'If-None-Match': etags['br']})
+    assert response.status_code == 200
+    response = client.get('/', headers={'Accept-Encoding': 'br', 'If-None-Match': etags['br']})
+    assert response.status_code == 304
+
+
+def test_games_listing_pages_with_cursors(client):
+    first = client.get('/games', params={'sort': 'name', 'order': 'asc', 'limit': 10})
+    assert first.status_code == 200
+    page = first.json()
+    assert len(page['items']) == 10
+    names = [game['name'] for game in page['items']]
+    assert names == sorted(names)
+    second = client.get('/games', params={'sort': 'name', 'order': 'asc', 'limit': 10,
+                                          'cursor': page['next_cursor']}).json()
+    assert second['items'][0]['name'] >= names[-1]
+    assert not {game['id'] for game in page['items']} & {game['id'] for game in second['items']}
+
+
+@pytest.mark.parametrize('params', [
+    {'sort': 'not_a_column'},
+    {'cursor': 'not a cursor'},
+    {'sort': 'name', 'cursor': base64.urlsafe_b64encode(json.dumps([5, 1]).encode()).decode()},
+])
+def test_games_listing_rejects_bad_sorts_and_cursors(client, params):
+    assert client.get('/games', params=params).status_code == 400
+
+
+def test_games_listing_validates_its_parameters(client):
+    assert client.get('/games', params={'limit': 0}).status_code == 422
+    assert client.get('/games', params={'order': 'sideways'}).status_code == 422
+
+
+def test_game_details(client):
+    response = client.get(f'/game/{AEOLIS}')
+    assert response.status_code == 200
+    assert response.json()['name'] == 'Aeolis'
+    assert client.get('/game/1').status_code == 404
+
+
+def test_search(client):
+    response = client.get('/search', params={'q': 'aeol'})
+    assert response.status_code == 200
+    assert response.json()['items'][0]['id'] == AEOLIS
+    assert client.get('/search', params={'q': ''}).status_code == 422
+
+
+def test_filter(client):
+    response = client.get('/games/filter', params={'mechanics': 'Dice Rolling', 'players': 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body['total'] == len(body['items'])
+    assert body['facets']['mechanics']['Dice Rolling'] == body['total']
+    assert client.get('/games/filter', params={'sort': 'not_a_column'}).status_code == 400
+    assert client.get('/games/filter', params={'cursor': 'not a cursor'}).status_code == 400
+
+
+def test_similar_games(client):
+    response = client.get(f'/game/{AEOLIS}/similar', params={'limit': 5})
+    assert response.status_code == 200
+    assert 0 < len(response.json()['items']) <= 5
+    assert AEOLIS not in [game['id'] for game in response.json()['items']]
+    assert client.get('/game/1/similar').status_code == 404
+
+
+def test_reload_is_off_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(routes, 'RELOAD_TOKEN', None)
+    assert client.post('/admin/reload', headers={'X-Reload-Token': 'anything'}).status_code == 404
+
+
+def test_reload_needs_the_token(client, monkeypatch):
+    monkeypatch.setattr(routes, 'RELOAD_TOKEN', 'secret')
+    assert client.post('/admin/reload').status_code == 403
+    assert client.post('/admin/reload', headers={'X-Reload-Token': 'wrong'}).status_code == 403
+    version = datasets.current.number
+    response = client.post('/admin/reload', headers={'X-Reload-Token': 'secret'})
+    assert response.status_code == 202
+    assert response.json() == {'version': version, 'started': True}
+    assert datasets.wait(60)
+    assert datasets.current.number == version + 1
@@ -0,0 +1,76 @@
+import pandas as pd
+from sqlalchemy import create_engine, select
+
+from app.dataset import GameDataset
+from app.games_db import DatabaseGames, games, name_starts_with
+from app.search import SearchIndex
+from app.utils.load_games import bulk_load_games
+
+
+def make_games():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'name': ['Catan', 'Carcassonne', 'Pandemic', 'Cat Lady'],
+        'users_rated': [100, 90, 80, 10],
+        'rating_average': [7.1, 7.4, 7.6, 6.8],
+        'year_published': [1995, 2000, 2008, 2017],
+        'bgg_rank': [400, 200, 100, 900],
+        'complexity_average': [2.3, 1.9, 2.4, 1.2],
+        'mechanics': ['Dice Rolling, Trading', 'Tile Placement', 'Cooperative Game', 'Card Drafting'],
+        'description': ['Settle an island.', 'Place tiles to build cities.', 'Cure diseases together.',
+                        'Collect cats and feed them.'],
+    })
+
+
+def ids(response):
+    return [item['id'] for item in response['items']]
+
+
+def test_prefix_queries_rank_name_matches_first():
+    index = SearchIndex(make_games())
+    result = index.search('cat')
+    # Name starts with the query beats a description-only match
+    assert list(index.ids[result.rows]) == [1, 4]
+    assert result.total == 2
+    assert index.search('ca').total == 3
+
+
+def test_all_tokens_must_match():
+    index = SearchIndex(make_games())
+    assert list(index.ids[index.search('tile pla').rows]) == [2]
+    assert index.search('tile cure').total == 0
+    assert index.search('  ').total == 0
+
+
+def test_dataset_and_table_search_agree(tmp_path):
+    df = make_games()
+    engine = create_engine(f"sqlite:///{tmp_path / 'games.db'}")
+    bulk_load_games(engine, df)
+    expected = GameDataset(df).search('ca', limit=2)
+    assert len(expected['items']) == 2 and expected['total'] == 3
+    assert all(item['score'] > 0 for item in expected['items'])
+    assert DatabaseGames(engine).search('ca', limit=2) == expected
+    assert ids(DatabaseGames(engine).search('cat')) == [1, 4]
+
+
+def test_name_prefix_bonus_treats_like_wildcards_literally(tmp_path):
+    df = make_games()
+    df['name'] = ['100% Orange Juice', '1000 Blank Cards', 'Cat_Lady', 'CatXLady']
+    engine = create_engine(f"sqlite:///{tmp_path / 'games.db'}")
+    bulk_load_games(engine, df)
+
+    def matching(query):
+        with engine.connect() as connection:
+            return sorted(connection.execute(select(games.c.bgg_id).where(name_starts_with(query))).scalars())
+
+    assert matching('100%') == [1]
+    assert matching('cat_') == [3]
+    assert matching('CAT') == [3, 4]
+
+
+def test_search_index_is_built_with_the_dataset(tmp_path):
+    # Not on the first search, which would make that request pay for it
+    assert isinstance(vars(GameDataset(make_games()))['search_index'], SearchIndex)
+    engine = create_engine(f"sqlite:///{tmp_path / 'games.db'}")
+    bulk_load_games(engine, make_games())
+    assert isinstance(vars(DatabaseGames(engine)._search)['_index'], SearchIndex)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from app.dataset import GameDataset
+from app.games_db import DatabaseGames
+from app.similar import SimilarityIndex
+from app.utils.load_games import bulk_load_games
+
+
+def make_games():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'name': ['Dice A', 'Dice B', 'Tiles', 'Dice Tiles', 'Nothing'],
+        'users_rated': [10, 20, 30, 40, 50],
+        'rating_average': [7.0, 7.5, 6.0, 8.0, 5.0],
+        'year_published': [2000, 2001, 2010, 2005, None],
+        'bgg_rank': [5, 4, 3, 2, 1],
+        'complexity_average': [2.0, 2.1, 3.5, 2.5, None],
+        'min_players': [2, 2, 1, 2, None],
+        'max_players': [4, 4, 2, 5, None],
+        'play_time': [30, 45, 120, 60, None],
+        'mechanics': ['Dice Rolling', 'Dice Rolling', 'Tile Placement', 'Dice Rolling, Tile Placement', None],
+        'domains': ['Family Games', 'Family Games', 'Strategy Games', None, None],
+    })
+
+
+def dense_features(index: SimilarityIndex) -> np.ndarray:
+    """The feature matrix the index works on, built out in full."""
+    blocks = [terms.to_dense() * np.sqrt(weights) for terms, _, _, weights in index._blocks]
+    return np.hstack(blocks + [index._numeric])
+
+
+def test_scores_are_cosine_similarities():
+    index = SimilarityIndex(make_games())
+    features = dense_features(index)
+    norms = np.linalg.norm(features, axis=1)
+    for row in range(4):
+        with np.errstate(invalid='ignore'):
+            expected = np.nan_to_num(features @ features[row] / (norms * norms[row]))
+        assert np.allclose(index.scores(row), expected, atol=1e-5)
+
+
+def test_similar_games_best_first_without_itself():
+    index = SimilarityIndex(make_games())
+    neighbours = index.similar(1)
+    ids = make_games()['id'].to_numpy()[neighbours.rows].tolist()
+    assert ids[0] == 2 and 1 not in ids
+    assert list(neighbours.scores) == sorted(neighbours.scores, reverse=True)
+    # A game with no features is similar to nothing
+    assert len(index.similar(5).rows) == 0
+    assert index.similar(99) is None
+
+
+def test_neighbour_lists_are_cached():
+    index = SimilarityIndex(make_games())
+    index.similar(1, limit=1)
+    index.similar(1, limit=3)
+    assert index._table.cache_info().hits == 1
+
+
+def test_dataset_and_database_agree(tmp_path):
+    df = make_games()
+    engine = create_engine(f"sqlite:///{tmp_path / 'games.db'}")
+    bulk_load_games(engine, df)
+    expected = GameDataset(df).similar(4, limit=3)
+    assert expected['items'] and all(game['similarity'] > 0 for game in expected['items'])
+    assert DatabaseGames(engine).similar(4, limit=3) == expected
+    assert DatabaseGames(engine).similar(99) is None
+
+
+def test_games_without_data_are_not_similar_to_each_other():
+    df = make_games()
+    df['domains'] = df['domains'].fillna('missing')
+    df.loc[4, 'mechanics'] = 'missing'
+    extra = df.iloc[[4]].assign(id=6, name='Also nothing')
+    index = SimilarityIndex(pd.concat([df, extra], ignore_index=True))
+    assert len(index.similar(5).rows) == 0
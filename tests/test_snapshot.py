@@ -0,0 +1,81 @@
+import json
+import os
+
+import pandas as pd
+
+from app.dataset import GameDataset
+
+from app.utils import snapshot
+from app.utils.snapshot import parse_mechanics_list, read_games_frame, write_snapshot
+
+
+def test_parse_mechanics_list_strips_items():
+    assert parse_mechanics_list("['Action Queue', ' Action Retrieval']") == ['Action Queue', 'Action Retrieval']
+    assert parse_mechanics_list(float('nan')) == []
+
+
+def test_snapshot_round_trip_with_projection(tmp_path):
+    csv_path = tmp_path / 'games.csv'
+    pd.DataFrame({
+        'Unnamed: 0': [0, 1],
+        'id': [10, 20],
+        'name': ['Alpha', 'Beta'],
+        'rating_average': [7.5, 6.0],
+        'mechanics_list': ["['Dice Rolling', ' Tile Placement']", "[]"],
+    }).to_csv(csv_path)
+    write_snapshot(str(csv_path))
+
+    df = read_games_frame(str(csv_path), columns=['id', 'mechanics_list', 'not_a_column'])
+    assert list(df.columns) == ['id', 'mechanics_list']
+    assert str(df['id'].dtype) == 'int32'
+    assert list(df['mechanics_list'][0]) == ['Dice Rolling', 'Tile Placement']
+
+
+def test_mapped_arrow_snapshot_serves_same_games_as_csv(tmp_path):
+    csv_path = tmp_path / 'games.csv'
+    pd.DataFrame({
+        'id': [10, 20],
+        'name': ['Alpha', 'Beta'],
+        'rating_average': [7.5, None],
+        'users_rated': [5, 9],
+        'complexity_average': [2.0, 3.0],
+        'year_published': [2001, 2010],
+        'mechanics_list': ["['Dice Rolling']", "[]"],
+    }).to_csv(csv_path, index=False)
+    arrow_path = write_snapshot(str(csv_path), str(tmp_path / 'games.arrow'))
+
+    from_csv = GameDataset.from_path(str(csv_path))
+    mapped = GameDataset.from_path(arrow_path)
+    assert mapped.table is not None
+    assert 'mechanics_list' not in mapped.df.columns
+    for game_id in (10, 20):
+        assert json.loads(mapped.index.get(game_id)) == json.loads(from_csv.index.get(game_id))
+
+
+def test_first_csv_load_writes_the_snapshot_later_loads_read(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'games.csv'
+    pd.DataFrame({'id': [10, 20], 'name': ['Alpha', 'Beta'], 'year_published': [2001, None]}).to_csv(
+        csv_path, index=False)
+    monkeypatch.setattr(snapshot, 'DATASET_AUTO_SNAPSHOT', True)
+    first = read_games_frame(str(csv_path), columns=['id', 'year_published'])
+    assert (tmp_path / 'games.parquet').exists()
+    # Reading the CSV again now means reading its snapshot
+    csv_path.write_text('not a dataset')
+    os.utime(csv_path, (0, 0))
+    pd.testing.assert_frame_equal(read_games_frame(str(csv_path), columns=['id', 'year_published']), first)
+
+    monkeypatch.setattr(snapshot, 'DATASET_AUTO_SNAPSHOT', False)
+    other = tmp_path / 'other.csv'
+    other.write_text('id,name\n1,One\n')
+    read_games_frame(str(other))
+    assert not (tmp_path / 'other.parquet').exists()
+
+
+def test_arrow_path_is_read_even_with_a_newer_parquet_sibling(tmp_path):
+    csv_path = tmp_path / 'games.csv'
+    pd.DataFrame({'id': [10, 20], 'name': ['Alpha', 'Beta']}).to_csv(csv_path, index=False)
+    arrow_path = write_snapshot(str(csv_path), str(tmp_path / 'games.arrow'))
+    pd.DataFrame({'id': [30], 'name': ['Gamma']}).to_csv(csv_path, index=False)
+    write_snapshot(str(csv_path), str(tmp_path / 'games.parquet'))
+    os.utime(arrow_path, (0, 0))
+    assert read_games_frame(arrow_path)['id'].tolist() == [10, 20]
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.routes import datasets
+
+
+def test_importing_the_app_does_no_heavy_work(tmp_path):
+    # A fresh interpreter, so modules imported by other tests don't count
+    code = ("import sys, app.main; "
+            "print(','.join(m for m in ('pandas', 'numpy', 'pyarrow', 'matplotlib') if m in sys.modules))")
+    env = {**os.environ, 'DATABASE_URL': 'postgresql://nobody@unreachable.invalid/none',
+           'DATASET_PATH': str(tmp_path / 'missing.csv'), 'LOG_FILE': str(tmp_path / 'app.log')}
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+    assert result.stdout.strip() == ''
+
+
+def test_healthz_answers_while_the_dataset_loads(monkeypatch):
+    release = threading.Event()
+    build = datasets._build
+
+    def slow_build(path):
+        release.wait(10)
+        return build(path)
+
+    monkeypatch.setattr(datasets, '_build', slow_build)
+    monkeypatch.setattr(datasets, '_current', None)
+    with TestClient(create_app()) as client:
+        assert client.get('/healthz').status_code == 200
+        response = client.get('/readyz')
+        assert response.status_code == 503
+        assert response.json()['status'] == 'loading'
+        assert client.get('/games').status_code == 503
+        release.set()
+        assert datasets.wait(60)
+        response = client.get('/readyz')
+        assert response.status_code == 200
+        assert response.json()['version'] == datasets.current.number
+        assert client.get('/games').status_code == 200
+
+
+def test_readyz_reports_a_failed_first_load(monkeypatch):
+    def broken_build(path):
+        raise ValueError('broken file')
+
+    monkeypatch.setattr(datasets, '_build', broken_build)
+    monkeypatch.setattr(datasets, '_current', None)
+    with TestClient(create_app()) as client:
+        assert datasets.wait(10)
+        response = client.get('/readyz')
+        assert response.status_code == 503
+        assert response.json() == {'status': 'failed', 'error': 'broken file'}
+        assert client.get('/healthz').status_code == 200
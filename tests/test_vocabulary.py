@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from app.utils.snapshot import clean_games_frame, parse_mechanics_list
+from app.utils.vocabulary import MultiHot, mechanics_multi_hot
+
+
+def make_games():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'rating_average': [7.0, 8.0, np.nan, 6.0],
+        'mechanics': ['Dice Rolling, Tile Placement', 'Tile Placement', None, 'Dice Rolling, Dice Rolling'],
+        'domains': ['Family Games', 'Family Games', None, 'Strategy Games'],
+        'mechanics_list': ["['Dice Rolling', ' Tile Placement']", "['Tile Placement']", "[]",
+                           "['Dice Rolling', ' Dice Rolling']"],
+    })
+
+
+def test_joined_and_list_columns_give_the_same_matrix():
+    df = clean_games_frame(make_games())
+    from_joined = MultiHot.from_joined(df['mechanics'])
+    from_lists = mechanics_multi_hot(df)
+    assert from_joined.vocabulary.tolist() == ['Dice Rolling', 'Tile Placement']
+    assert (from_joined.to_dense() == from_lists.to_dense()).all()
+    assert from_joined.to_dense().tolist() == [[True, True], [False, True], [False, False], [True, False]]
+    assert from_joined.row_terms(0) == ['Dice Rolling', 'Tile Placement']
+
+
+def test_mechanic_aggregations():
+    df = clean_games_frame(make_games())
+    mechanics = MultiHot.from_joined(df['mechanics'])
+    assert mechanics.counts().tolist() == [2, 2]
+    assert mechanics.counts(np.array([True, False, False, False])).tolist() == [1, 1]
+    summary = mechanics.summarize(df, ['rating_average'])
+    assert summary.loc['Tile Placement', 'rating_average'] == 7.5
+    assert summary.loc['Dice Rolling', 'games'] == 2
+    assert mechanics.column('Tile Placement').tolist() == [True, True, False, False]
+    assert mechanics.term('Unknown') is None
+
+
+def test_repeated_strings_are_categorical_and_interned():
+    df = clean_games_frame(make_games())
+    assert isinstance(df['domains'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['mechanics'].dtype, pd.CategoricalDtype)
+    # Parsed separately, the same mechanic is one string object
+    assert df['mechanics_list'][0][1] is df['mechanics_list'][1][0]
+    assert parse_mechanics_list("['Tile ' 'Placement']")[0] is df['mechanics_list'][1][0]
+
+
+def test_means_skip_gaps_in_nullable_integer_columns():
+    df = make_games()
+    df['year_published'] = [2000, None, 2010, None]
+    df = clean_games_frame(df)
+    assert str(df['year_published'].dtype) == 'Int32'
+    summary = MultiHot.from_joined(df['mechanics']).summarize(df, ['year_published'])
+    assert summary.loc['Dice Rolling', 'year_published'] == 2000
+    assert summary.loc['Tile Placement', 'year_published'] == 2000
+
+
+def test_missing_placeholder_means_no_values():
+    df = make_games()
+    df.loc[2, ['mechanics', 'domains']] = 'missing'
+    df.loc[3, 'domains'] = 'Missing'
+    df.loc[2, 'mechanics_list'] = "['missing']"
+    mechanics = MultiHot.from_joined(df['mechanics'])
+    assert mechanics.vocabulary.tolist() == ['Dice Rolling', 'Tile Placement']
+    assert mechanics.row_terms(2) == []
+    assert MultiHot.from_joined(df['domains']).vocabulary.tolist() == ['Family Games']
+    cleaned = clean_games_frame(df)
+    assert cleaned['mechanics'].isna().tolist() == [False, False, True, False]
+    assert cleaned['domains'].isna().tolist() == [False, False, True, True]
+    assert cleaned['mechanics_list'][2] == []
+    assert MultiHot.from_lists(cleaned['mechanics_list']).vocabulary.tolist() == ['Dice Rolling', 'Tile Placement']